@@ -1,4 +1,13 @@
 // Filename: homeassistant.cpp
+// V2.3 Kompakter Status (GetStatusCompact, status_layout) entfernt - HA dekodierte ihn nicht schneller als JSON
+// V2.2 Push: Sensoren im Messintervall, Deadbands pro Feld, Versand im eigenen Task (Loop blockiert nicht)
+// V2.1 ETag = Hash ueber das komplette /mada Dokument (neue Faehigkeiten ohne Versionssprung)
+// V2.0 Befehls-Endpoint pro Aktor ("command") in den Entity-Metadaten
+// V1.9 Kompakter Status: GET /rpc/mada.GetStatusCompact liefert nur Werte, Layout in /mada
+// V1.8 Batch-RPC: mehrere Befehle + GetStatus in einem Request
+// V1.7 ETag fuer /mada (HA cached Metadaten), MAC im mDNS TXT-Record
+// V1.6 Push-Modus: Status-Deltas per Webhook (POST /rpc/mada.SetPush)
+// V1.5 Optionale deadband in Entity-Metadaten (Change-Detection in HA)
 // V1.4 ESP32 sendet data_path in Entity-Metadaten für automatisches Mapping
 // V1.3 ESP32 sendet Entity-Metadaten (type, device_class, unit) an HA
 // V1.2 Home Assistant Integration Implementation
@@ -6,12 +15,62 @@
 
 #include "homeassistant.h"
 
+// Push-Deadbands: kleinere Aenderungen gelten nicht als Delta (wie ValueWatch in HA)
+struct PushDeadband {
+    const char* section;
+    const char* key;
+    float deadband;
+};
+
+static const PushDeadband PUSH_DEADBANDS[] = {
+    {"soil", "moisture", 0.5},     // wie deadband in /mada
+    {"soil", "salt", 1},
+    {"battery", "voltage", 20},    // mV
+    {"battery", "percent", 1},
+    {"temperature", "value", 0.2},
+    {"humidity", "value", 1},
+    {"light", "lux", 5},
+    {"bme280", "temperature", 0.2},
+    {"bme280", "humidity", 1},
+    {"bme280", "pressure", 0.5},
+    {"bme280", "altitude", 1},
+};
+
+// Push-Task: Zustand des Versands
+#define PUSH_IDLE 0
+#define PUSH_SENDING 1
+#define PUSH_DONE 2
+
+static float getPushDeadband(const char* section, const char* key) {
+    for (const PushDeadband& entry : PUSH_DEADBANDS) {
+        if (strcmp(entry.section, section) == 0 && strcmp(entry.key, key) == 0) {
+            return entry.deadband;
+        }
+    }
+    return 0;  // exakter Vergleich (Pumpe, Quelle)
+}
+
 HomeAssistantIntegration::HomeAssistantIntegration(AsyncWebServer* srv, SensorManager* sensors, PWMControl* pump) {
     server = srv;
     sensorMgr = sensors;
     pumpControl = pump;
     mac_address = getMacAddress();
     device_id = getDeviceId();
+    
+    pushHeartbeatMs = PUSH_DEFAULT_HEARTBEAT_S * 1000;
+    pushSeq = 0;
+    lastPushCheck = 0;
+    lastPushSent = 0;
+    lastPushMeasure = 0;
+    pushFailures = 0;
+    pushFull = false;
+    
+    pushTask = NULL;
+    pushState = PUSH_IDLE;
+    pushResult = 0;
+    pushSubscription = 0;
+    pendingSubscription = 0;
+    pendingFull = false;
 }
 
 //*********************************
@@ -29,6 +88,9 @@ bool HomeAssistantIntegration::init() {
     // 2. Setup REST API Endpoints
     setupRestAPI();
     
+    // 3. Push-Versand im eigenen Task - ein haengender POST blockiert den Loop nicht
+    xTaskCreate(pushTaskMain, "ha_push", PUSH_TASK_STACK, this, 1, &pushTask);
+    
     Serial.println("HA Integration ready!");
     Serial.print("Access via: http://");
     Serial.print(MDNS_HOSTNAME);
@@ -55,6 +117,7 @@ bool HomeAssistantIntegration::setupMDNS() {
     MDNS.addServiceTxt("http", "tcp", "model", DEVICE_MODEL);
     MDNS.addServiceTxt("http", "tcp", "version", FIRMWARE_VERSION);
     MDNS.addServiceTxt("http", "tcp", "type", "irrigation");
+    MDNS.addServiceTxt("http", "tcp", "mac", mac_address);
     
     return true;
 }
@@ -65,6 +128,10 @@ bool HomeAssistantIntegration::setupMDNS() {
 void HomeAssistantIntegration::setupRestAPI() {
     server->on("/mada", HTTP_GET, [this](AsyncWebServerRequest *request) {
         this->handleDeviceInfo(request);
+    }).setFilter([](AsyncWebServerRequest *request) {
+        // Header fuer die ETag-Revalidierung nicht verwerfen
+        request->addInterestingHeader("If-None-Match");
+        return true;
     });
     
     server->on("/rpc/mada.GetStatus", HTTP_GET, [this](AsyncWebServerRequest *request) {
@@ -93,11 +160,35 @@ void HomeAssistantIntegration::setupRestAPI() {
         }
     });
     
+    server->on("/rpc/mada.Batch", HTTP_POST, [this](AsyncWebServerRequest *request) {
+        this->handleBatch(request, this->batchBody);
+        this->batchBody = ""; // Clear buffer
+    }, NULL,
+    [this](AsyncWebServerRequest *request, uint8_t *data, size_t len, size_t index, size_t total) {
+        // Collect body data
+        for (size_t i = 0; i < len; i++) {
+            this->batchBody += (char)data[i];
+        }
+    });
+    
+    server->on("/rpc/mada.SetPush", HTTP_POST, [this](AsyncWebServerRequest *request) {
+        this->handlePushSet(request, this->pushSetBody);
+        this->pushSetBody = ""; // Clear buffer
+    }, NULL,
+    [this](AsyncWebServerRequest *request, uint8_t *data, size_t len, size_t index, size_t total) {
+        // Collect body data
+        for (size_t i = 0; i < len; i++) {
+            this->pushSetBody += (char)data[i];
+        }
+    });
+    
     Serial.println("REST API endpoints registered:");
     Serial.println("  GET  /mada");
     Serial.println("  GET  /rpc/mada.GetStatus");
     Serial.println("  POST /rpc/Pump.Set");
     Serial.println("  POST /rpc/Pump.SetPWM");
+    Serial.println("  POST /rpc/mada.Batch");
+    Serial.println("  POST /rpc/mada.SetPush");
 }
 
 //*********************************
@@ -105,7 +196,25 @@ void HomeAssistantIntegration::setupRestAPI() {
 // ESP32 sagt HA was was ist UND wo die Daten liegen!
 //*********************************
 void HomeAssistantIntegration::handleDeviceInfo(AsyncWebServerRequest *request) {
-    StaticJsonDocument<2560> doc;
+    // ETag aus dem fertigen Dokument - jede Aenderung (Faehigkeit, Entity, Sensor) invalidiert den HA-Cache
+    String json;
+    createDeviceInfoJSON(json);
+    String etag = getMetadataETag(json);
+    
+    if (request->hasHeader("If-None-Match") && request->header("If-None-Match") == etag) {
+        AsyncWebServerResponse *notModified = request->beginResponse(304);
+        notModified->addHeader("ETag", etag);
+        request->send(notModified);
+        return;
+    }
+    
+    AsyncWebServerResponse *response = request->beginResponse(200, "application/json", json);
+    response->addHeader("ETag", etag);
+    request->send(response);
+}
+
+void HomeAssistantIntegration::createDeviceInfoJSON(String& output) {
+    StaticJsonDocument<4096> doc;
     
     // Device Information
     doc["name"] = DEVICE_NAME;
@@ -115,6 +224,7 @@ void HomeAssistantIntegration::handleDeviceInfo(AsyncWebServerRequest *request)
     doc["id"] = device_id;
     doc["type"] = "irrigation_controller";
     doc["hostname"] = String(MDNS_HOSTNAME) + ".local";
+    doc["batch"] = true;  // POST /rpc/mada.Batch verfuegbar
     
     // Entity Definitions mit data_path für automatisches Mapping
     JsonArray entities = doc.createNestedArray("entities");
@@ -127,6 +237,7 @@ void HomeAssistantIntegration::handleDeviceInfo(AsyncWebServerRequest *request)
     soil_moisture["device_class"] = "moisture";
     soil_moisture["unit"] = "%";
     soil_moisture["state_class"] = "measurement";
+    soil_moisture["deadband"] = 0.5;  // HA meldet erst ab 0.5 % Aenderung
     JsonArray sm_path = soil_moisture.createNestedArray("data_path");
     sm_path.add("soil");
     sm_path.add("moisture");
@@ -206,6 +317,9 @@ void HomeAssistantIntegration::handleDeviceInfo(AsyncWebServerRequest *request)
     JsonArray pump_path = pump_switch.createNestedArray("data_path");
     pump_path.add("pump");
     pump_path.add("running");
+    JsonObject pump_cmd = pump_switch.createNestedObject("command");
+    pump_cmd["method"] = "Pump.Set";  // POST /rpc/Pump.Set {"on": true/false}
+    pump_cmd["param"] = "on";
     
     // Number: Pumpenleistung
     JsonObject pump_pwm = entities.createNestedObject();
@@ -220,11 +334,23 @@ void HomeAssistantIntegration::handleDeviceInfo(AsyncWebServerRequest *request)
     JsonArray pwm_path = pump_pwm.createNestedArray("data_path");
     pwm_path.add("pump");
     pwm_path.add("pwm_target");
+    JsonObject pwm_cmd = pump_pwm.createNestedObject("command");
+    pwm_cmd["method"] = "Pump.SetPWM";  // POST /rpc/Pump.SetPWM {"pwm": 0-100}
+    pwm_cmd["param"] = "pwm";
     
-    String response;
-    serializeJson(doc, response);
-    
-    request->send(200, "application/json", response);
+    serializeJson(doc, output);
+}
+
+String HomeAssistantIntegration::getMetadataETag(const String& json) {
+    // FNV-1a 32 Bit ueber das serialisierte Dokument
+    uint32_t hash = 2166136261u;
+    for (size_t i = 0; i < json.length(); i++) {
+        hash ^= (uint8_t)json[i];
+        hash *= 16777619u;
+    }
+    char etag[12];
+    snprintf(etag, sizeof(etag), "\"%08x\"", hash);
+    return String(etag);
 }
 
 //*********************************
@@ -241,6 +367,11 @@ void HomeAssistantIntegration::handleGetStatus(AsyncWebServerRequest *request) {
 //*********************************
 void HomeAssistantIntegration::createStatusJSON(String& output) {
     StaticJsonDocument<2048> doc;
+    fillStatus(doc.to<JsonObject>());
+    serializeJson(doc, output);
+}
+
+void HomeAssistantIntegration::fillStatus(JsonObject doc) {
     higrow_sensors_event_t val = {0};
     
     // Soil Moisture
@@ -301,71 +432,84 @@ void HomeAssistantIntegration::createStatusJSON(String& output) {
     doc["system"]["uptime"] = millis() / 1000;
     doc["system"]["wifi_rssi"] = WiFi.RSSI();
     doc["system"]["free_heap"] = ESP.getFreeHeap();
-    
-    serializeJson(doc, output);
 }
 
 //*********************************
 // Endpoint 3: Pump Control
 //*********************************
 void HomeAssistantIntegration::handlePumpSet(AsyncWebServerRequest *request, String body) {
-    if (!pumpControl) {
-        request->send(503, "application/json", "{\"error\":\"Pump not available\"}");
-        return;
-    }
-    
     Serial.print("Pump.Set received body: ");
     Serial.println(body);
-    
-    if (body.length() == 0) {
-        request->send(400, "application/json", "{\"error\":\"Empty body\"}");
-        return;
-    }
-    
-    StaticJsonDocument<256> doc;
-    DeserializationError error = deserializeJson(doc, body);
-    
-    if (error) {
-        Serial.print("JSON parse error: ");
-        Serial.println(error.c_str());
-        request->send(400, "application/json", "{\"error\":\"Invalid JSON\"}");
-        return;
+    handleRpc(request, body, &HomeAssistantIntegration::rpcPumpSet);
+}
+
+int HomeAssistantIntegration::rpcPumpSet(JsonObject params, JsonObject result) {
+    if (!pumpControl) {
+        result["error"] = "Pump not available";
+        return 503;
     }
     
-    if (!doc["on"].is<bool>()) {
-        request->send(400, "application/json", "{\"error\":\"Missing 'on' parameter\"}");
-        return;
+    if (!params["on"].is<bool>()) {
+        result["error"] = "Missing 'on' parameter";
+        return 400;
     }
     
-    bool turnOn = doc["on"].as<bool>();
+    bool turnOn = params["on"].as<bool>();
     pumpControl->setPumpState(turnOn);
     
-    StaticJsonDocument<256> response;
-    response["success"] = true;
-    response["running"] = pumpControl->isPumpRunning();
-    response["pwm_active"] = pumpControl->getActivePWM();
-    
-    String responseStr;
-    serializeJson(response, responseStr);
+    result["success"] = true;
+    result["running"] = pumpControl->isPumpRunning();
+    result["pwm_active"] = pumpControl->getActivePWM();
     
     Serial.print("Pump ");
     Serial.println(turnOn ? "ON" : "OFF");
     
-    request->send(200, "application/json", responseStr);
+    return 200;
 }
 
 //*********************************
 // Endpoint 4: Set PWM
 //*********************************
 void HomeAssistantIntegration::handlePumpSetPWM(AsyncWebServerRequest *request, String body) {
+    Serial.print("Pump.SetPWM received body: ");
+    Serial.println(body);
+    handleRpc(request, body, &HomeAssistantIntegration::rpcPumpSetPWM);
+}
+
+int HomeAssistantIntegration::rpcPumpSetPWM(JsonObject params, JsonObject result) {
     if (!pumpControl) {
-        request->send(503, "application/json", "{\"error\":\"Pump not available\"}");
-        return;
+        result["error"] = "Pump not available";
+        return 503;
     }
     
-    Serial.print("Pump.SetPWM received body: ");
-    Serial.println(body);
+    if (!params["pwm"].is<int>()) {
+        result["error"] = "Missing 'pwm' parameter";
+        return 400;
+    }
+    
+    int pwmValue = params["pwm"].as<int>();
+    
+    if (pwmValue < 0 || pwmValue > 100) {
+        result["error"] = "PWM must be 0-100";
+        return 400;
+    }
+    
+    pumpControl->setTargetPWM(pwmValue);
     
+    result["success"] = true;
+    result["pwm"] = pumpControl->getTargetPWM();
+    
+    Serial.print("PWM set to: ");
+    Serial.print(pwmValue);
+    Serial.println("%");
+    
+    return 200;
+}
+
+//*********************************
+// Gemeinsames Parsing fuer Einzel-RPCs
+//*********************************
+void HomeAssistantIntegration::handleRpc(AsyncWebServerRequest *request, String body, RpcMethod method) {
     if (body.length() == 0) {
         request->send(400, "application/json", "{\"error\":\"Empty body\"}");
         return;
@@ -381,31 +525,50 @@ void HomeAssistantIntegration::handlePumpSetPWM(AsyncWebServerRequest *request,
         return;
     }
     
-    if (!doc["pwm"].is<int>()) {
-        request->send(400, "application/json", "{\"error\":\"Missing 'pwm' parameter\"}");
-        return;
-    }
+    StaticJsonDocument<256> response;
+    int code = (this->*method)(doc.as<JsonObject>(), response.to<JsonObject>());
     
-    int pwmValue = doc["pwm"].as<int>();
+    String responseStr;
+    serializeJson(response, responseStr);
+    request->send(code, "application/json", responseStr);
+}
+
+//*********************************
+// Endpoint 6: Batch
+// {"calls": [{"method": "Pump.Set", "params": {...}}, {"method": "mada.GetStatus"}]}
+// -> {"results": [{...}, {...}]} in derselben Reihenfolge
+//*********************************
+void HomeAssistantIntegration::handleBatch(AsyncWebServerRequest *request, String body) {
+    DynamicJsonDocument doc(1024);
+    DeserializationError error = deserializeJson(doc, body);
     
-    if (pwmValue < 0 || pwmValue > 100) {
-        request->send(400, "application/json", "{\"error\":\"PWM must be 0-100\"}");
+    if (error || !doc["calls"].is<JsonArray>()) {
+        request->send(400, "application/json", "{\"error\":\"Missing 'calls' parameter\"}");
         return;
     }
     
-    pumpControl->setTargetPWM(pwmValue);
-    
-    StaticJsonDocument<256> response;
-    response["success"] = true;
-    response["pwm"] = pumpControl->getTargetPWM();
+    DynamicJsonDocument response(3072);
+    JsonArray results = response.createNestedArray("results");
+    
+    for (JsonVariant item : doc["calls"].as<JsonArray>()) {
+        JsonObject call = item.as<JsonObject>();
+        const char* method = call["method"] | "";
+        JsonObject params = call["params"].as<JsonObject>();
+        JsonObject result = results.createNestedObject();
+        
+        if (strcmp(method, "Pump.Set") == 0) {
+            rpcPumpSet(params, result);
+        } else if (strcmp(method, "Pump.SetPWM") == 0) {
+            rpcPumpSetPWM(params, result);
+        } else if (strcmp(method, "mada.GetStatus") == 0) {
+            fillStatus(result);
+        } else {
+            result["error"] = "Unknown method";
+        }
+    }
     
     String responseStr;
     serializeJson(response, responseStr);
-    
-    Serial.print("PWM set to: ");
-    Serial.print(pwmValue);
-    Serial.println("%");
-    
     request->send(200, "application/json", responseStr);
 }
 
@@ -427,8 +590,198 @@ String HomeAssistantIntegration::getDeviceId() {
     return String(idStr);
 }
 
+//*********************************
+// Endpoint 5: Push abonnieren
+// HA sendet {"url": "...", "heartbeat": 60}
+//*********************************
+void HomeAssistantIntegration::handlePushSet(AsyncWebServerRequest *request, String body) {
+    StaticJsonDocument<512> doc;
+    DeserializationError error = deserializeJson(doc, body);
+    
+    if (error || !doc["url"].is<const char*>()) {
+        request->send(400, "application/json", "{\"error\":\"Missing 'url' parameter\"}");
+        return;
+    }
+    
+    pushUrl = doc["url"].as<const char*>();
+    int heartbeat = doc["heartbeat"] | PUSH_DEFAULT_HEARTBEAT_S;
+    pushHeartbeatMs = (uint32_t)heartbeat * 1000;
+    pushSeq = 0;
+    pushFailures = 0;
+    pushFull = true;  // Erste Nachricht enthaelt den vollen Status
+    pushSubscription++;  // Ergebnis eines laufenden Versands gehoert zum alten Abo
+    
+    Serial.print("Push subscribed: ");
+    Serial.println(pushUrl);
+    
+    request->send(200, "application/json", "{\"success\":true}");
+}
+
+//*********************************
+// Push: Deltas gegenueber dem zuletzt gesendeten Status
+//*********************************
+bool HomeAssistantIntegration::pushDue() {
+    uint32_t now = millis();
+    
+    if (pushFull || now - lastPushSent >= pushHeartbeatMs || now - lastPushMeasure >= PUSH_MEASURE_INTERVAL_MS) {
+        return true;
+    }
+    
+    // Pumpe sofort melden - ohne die Sensoren zu lesen
+    if (pumpControl) {
+        JsonObject pump = lastPushed["pump"].as<JsonObject>();
+        return !(pump["running"] == pumpControl->isPumpRunning())
+            || !(pump["pwm_target"] == pumpControl->getTargetPWM())
+            || !(pump["pwm_active"] == pumpControl->getActivePWM());
+    }
+    return false;
+}
+
+void HomeAssistantIntegration::pushStatus() {
+    StaticJsonDocument<2048> status;
+    fillStatus(status.to<JsonObject>());
+    lastPushMeasure = millis();
+    
+    bool heartbeat = millis() - lastPushSent >= pushHeartbeatMs;
+    
+    DynamicJsonDocument message(2560);
+    message["seq"] = pushSeq;
+    JsonObject delta = message.createNestedObject("delta");
+    
+    if (pushFull) {
+        message["full"] = true;
+        delta.set(status.as<JsonObject>());
+    } else {
+        JsonObject last = lastPushed.as<JsonObject>();
+        bool changed = false;
+        
+        for (JsonPair section : status.as<JsonObject>()) {
+            const char* sectionKey = section.key().c_str();
+            
+            // Systemwerte (uptime, rssi) nur mit dem Heartbeat senden
+            if (strcmp(sectionKey, "system") == 0) {
+                if (heartbeat) {
+                    delta[sectionKey] = section.value();
+                }
+                continue;
+            }
+            
+            JsonObject lastSection = last.get(sectionKey).as<JsonObject>();
+            for (JsonPair kv : section.value().as<JsonObject>()) {
+                const char* key = kv.key().c_str();
+                JsonVariant value = kv.value();
+                JsonVariant lastValue = lastSection.get(key);
+                float deadband = getPushDeadband(sectionKey, key);
+                
+                bool moved;
+                if (lastValue.isNull()) {
+                    moved = true;
+                } else if (deadband > 0 && value.is<float>() && lastValue.is<float>()) {
+                    // Rauschen (Temperatur, Lux) nicht jede Sekunde senden
+                    moved = fabs(value.as<float>() - lastValue.as<float>()) >= deadband;
+                } else {
+                    moved = !(value == lastValue);
+                }
+                
+                if (moved) {
+                    delta[sectionKey][key] = value;
+                    changed = true;
+                }
+            }
+        }
+        
+        if (!changed && !heartbeat) {
+            return;
+        }
+    }
+    
+    // Uebergabe an den Task; gesendete Werte merken bis das Ergebnis da ist
+    pushBody = "";
+    serializeJson(message, pushBody);
+    pushTarget = pushUrl;
+    pendingDelta.set(delta);
+    pendingFull = pushFull;
+    pendingSubscription = pushSubscription;
+    pushState = PUSH_SENDING;
+    xTaskNotifyGive(pushTask);
+}
+
+void HomeAssistantIntegration::pushFinished() {
+    pushState = PUSH_IDLE;
+    
+    // Inzwischen neu abonniert -> Ergebnis verwerfen, neues Abo startet mit vollem Status
+    if (pendingSubscription != pushSubscription) {
+        return;
+    }
+    
+    if (pushResult != 200) {
+        Serial.print("Push failed: ");
+        Serial.println(pushResult);
+        
+        // HA abonniert neu, sobald der Kanal still wird
+        if (++pushFailures >= PUSH_MAX_FAILURES) {
+            Serial.println("Push disabled after repeated failures");
+            pushUrl = "";
+        }
+        return;
+    }
+    
+    pushFailures = 0;
+    pushSeq++;
+    lastPushSent = millis();
+    
+    // Nur gesendete Werte merken - langsames Driften ueber die Deadband wird so gemeldet
+    if (pendingFull) {
+        lastPushed.set(pendingDelta);
+        pushFull = false;
+    } else {
+        for (JsonPair section : pendingDelta.as<JsonObject>()) {
+            for (JsonPair kv : section.value().as<JsonObject>()) {
+                lastPushed[section.key()][kv.key()] = kv.value();
+            }
+        }
+    }
+}
+
+void HomeAssistantIntegration::pushTaskMain(void* arg) {
+    HomeAssistantIntegration* self = static_cast<HomeAssistantIntegration*>(arg);
+    
+    for (;;) {
+        ulTaskNotifyTake(pdTRUE, portMAX_DELAY);
+        
+        HTTPClient http;
+        http.setTimeout(PUSH_HTTP_TIMEOUT_MS);
+        http.setConnectTimeout(PUSH_HTTP_TIMEOUT_MS);
+        http.begin(self->pushTarget);
+        http.addHeader("Content-Type", "application/json");
+        self->pushResult = http.POST(self->pushBody);
+        http.end();
+        
+        self->pushState = PUSH_DONE;
+    }
+}
+
 void HomeAssistantIntegration::loop() {
     // mDNS wird automatisch von ESP32 Framework verwaltet
+    
+    // Versand laeuft noch - Body und Puffer gehoeren dem Task
+    if (pushState == PUSH_SENDING) {
+        return;
+    }
+    if (pushState == PUSH_DONE) {
+        pushFinished();
+    }
+    
+    if (pushUrl.length() == 0 || pushTask == NULL || WiFi.status() != WL_CONNECTED) {
+        return;
+    }
+    
+    if (millis() - lastPushCheck >= PUSH_CHECK_INTERVAL_MS) {
+        lastPushCheck = millis();
+        if (pushDue()) {
+            pushStatus();
+        }
+    }
 }
 
 // EOF
@@ -10,6 +10,7 @@
 #include <ESPmDNS.h>
 #include <AsyncTCP.h>
 #include <ESPAsyncWebServer.h>
+#include <HTTPClient.h>
 #include <ArduinoJson.h>
 #include "sensor_manager.h"
 #include "pwm_control.h"
@@ -20,7 +21,20 @@
 // Device Information
 #define DEVICE_NAME "HiGrow"
 #define DEVICE_MODEL "LilyGo-HiGrow-v1.1"
-#define FIRMWARE_VERSION "1.4-HA"
+#define FIRMWARE_VERSION "1.6-HA"
+
+// Push-Modus: Status-Deltas per Webhook an HA
+#define PUSH_CHECK_INTERVAL_MS 1000      // Pumpe pruefen (ohne Sensoren)
+#define PUSH_MEASURE_INTERVAL_MS 10000   // Sensoren fuer den Push lesen
+#define PUSH_TASK_STACK 6144             // Versand im eigenen Task
+#define PUSH_DEFAULT_HEARTBEAT_S 60
+#define PUSH_HTTP_TIMEOUT_MS 2000
+#define PUSH_MAX_FAILURES 3
+
+class HomeAssistantIntegration;
+
+// RPC-Implementierung: params rein, result raus, HTTP-Status als Rueckgabe
+typedef int (HomeAssistantIntegration::*RpcMethod)(JsonObject params, JsonObject result);
 
 class HomeAssistantIntegration {
 private:
@@ -34,17 +48,55 @@ private:
     // Body buffers for POST requests
     String pumpSetBody;
     String pumpSetPWMBody;
+    String pushSetBody;
+    String batchBody;
+    
+    // Push-Modus
+    String pushUrl;
+    uint32_t pushHeartbeatMs;
+    uint32_t pushSeq;
+    uint32_t lastPushCheck;
+    uint32_t lastPushSent;
+    uint32_t lastPushMeasure;
+    uint8_t pushFailures;
+    bool pushFull;
+    StaticJsonDocument<2048> lastPushed;
+    
+    // Versand-Task: Loop uebergibt Body, Task meldet den HTTP-Code zurueck
+    TaskHandle_t pushTask;
+    volatile uint8_t pushState;
+    volatile int pushResult;
+    volatile uint32_t pushSubscription;
+    String pushBody;
+    String pushTarget;
+    uint32_t pendingSubscription;
+    bool pendingFull;
+    StaticJsonDocument<2560> pendingDelta;
     
     // Endpoint Handlers
     void handleDeviceInfo(AsyncWebServerRequest *request);
     void handleGetStatus(AsyncWebServerRequest *request);
     void handlePumpSet(AsyncWebServerRequest *request, String body);
     void handlePumpSetPWM(AsyncWebServerRequest *request, String body);
+    void handlePushSet(AsyncWebServerRequest *request, String body);
+    void handleBatch(AsyncWebServerRequest *request, String body);
+    void handleRpc(AsyncWebServerRequest *request, String body, RpcMethod method);
+    
+    // RPC Methoden (Einzel-Endpoints und Batch)
+    int rpcPumpSet(JsonObject params, JsonObject result);
+    int rpcPumpSetPWM(JsonObject params, JsonObject result);
     
     // Helper Functions
     String getMacAddress();
     String getDeviceId();
+    String getMetadataETag(const String& json);
+    void createDeviceInfoJSON(String& output);
     void createStatusJSON(String& output);
+    void fillStatus(JsonObject doc);
+    bool pushDue();
+    void pushStatus();
+    void pushFinished();
+    static void pushTaskMain(void* arg);
     
 public:
     HomeAssistantIntegration(AsyncWebServer* srv, SensorManager* sensors, PWMControl* pump);
@@ -58,7 +110,7 @@ public:
     // REST API Endpoints Setup
     void setupRestAPI();
     
-    // Loop (for mDNS updates if needed)
+    // Loop (mDNS, Push-Deltas)
     void loop();
 };
 
@@ -0,0 +1,68 @@
+"""Shared helpers for the MADA benchmark scripts."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+COMPONENT_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "mada"
+
+# Realistischer mada.GetStatus Payload (LilyGo-HiGrow mit SHT3x und BH1750)
+SAMPLE_STATUS = {
+    "soil": {"moisture": 42, "salt": 310},
+    "battery": {"voltage": 4012, "percent": 79},
+    "temperature": {"value": 21.4, "source": "SHT3x"},
+    "humidity": {"value": 55.2, "source": "SHT3x"},
+    "light": {"lux": 1234.5},
+    "pump": {"running": False, "pwm_target": 0, "pwm_active": 0},
+    "system": {"uptime": 86400, "wifi_rssi": -61, "free_heap": 182340},
+}
+
+# data_path Eintraege wie sie /mada liefert
+SAMPLE_PATHS = {
+    "bodenfeuchte": ["soil", "moisture"],
+    "salzgehalt": ["soil", "salt"],
+    "batterie": ["battery", "percent"],
+    "temperatur": ["temperature", "value"],
+    "luftfeuchtigkeit": ["humidity", "value"],
+    "helligkeit": ["light", "lux"],
+    "pumpe": ["pump", "running"],
+    "pumpenleistung": ["pump", "pwm_target"],
+}
+
+
+# Entity-Definitionen wie sie /mada liefert (Firmware mit SHT3x und BH1750)
+SAMPLE_ENTITIES = [
+    {"id": "bodenfeuchte", "name": "Bodenfeuchte", "type": "sensor", "device_class": "moisture",
+     "unit": "%", "state_class": "measurement", "deadband": 0.5, "data_path": ["soil", "moisture"]},
+    {"id": "salzgehalt", "name": "Salzgehalt", "type": "sensor", "device_class": "voltage",
+     "unit": "mV", "state_class": "measurement", "data_path": ["soil", "salt"]},
+    {"id": "batterie", "name": "Batterie", "type": "sensor", "device_class": "battery",
+     "unit": "%", "state_class": "measurement", "data_path": ["battery", "percent"]},
+    {"id": "temperatur", "name": "Temperatur", "type": "sensor", "device_class": "temperature",
+     "unit": "°C", "state_class": "measurement", "data_path": ["temperature", "value"]},
+    {"id": "luftfeuchtigkeit", "name": "Luftfeuchtigkeit", "type": "sensor", "device_class": "humidity",
+     "unit": "%", "state_class": "measurement", "data_path": ["humidity", "value"]},
+    {"id": "helligkeit", "name": "Helligkeit", "type": "sensor", "device_class": "illuminance",
+     "unit": "lx", "state_class": "measurement", "data_path": ["light", "lux"]},
+    {"id": "pumpe", "name": "Pumpe", "type": "switch", "device_class": "switch",
+     "data_path": ["pump", "running"], "command": {"method": "Pump.Set", "param": "on"}},
+    {"id": "pumpenleistung", "name": "Pumpenleistung", "type": "number", "device_class": "power_factor",
+     "unit": "%", "min": 0, "max": 100, "step": 1, "data_path": ["pump", "pwm_target"],
+     "command": {"method": "Pump.SetPWM", "param": "pwm"}},
+]
+
+
+def load_component_module(name: str) -> types.ModuleType:
+    """Import a helper module of the integration without running its __init__.
+
+    The helper modules only depend on the standard library (and aiohttp), so
+    they can be benchmarked without a Home Assistant installation.
+    """
+    if "mada" not in sys.modules:
+        package = types.ModuleType("mada")
+        package.__path__ = [str(COMPONENT_DIR)]
+        sys.modules["mada"] = package
+    return importlib.import_module(f"mada.{name}")
@@ -0,0 +1,591 @@
+"""Minimal Home Assistant stand-in to run the real integration in benchmarks.
+
+Home Assistant is not needed to benchmark the integration, but its
+coordinator, platforms and config flow import it. install() puts stub
+modules for homeassistant (plus async_timeout and voluptuous) into
+sys.modules and load_integration() imports custom_components/mada as
+the package "mada", so benchmarks run the code that ships.
+
+Only what the integration uses on its hot paths behaves like Home
+Assistant: DataUpdateCoordinator refreshes and listeners, entity state
+writes, config flow results, Store with delayed saves, forwarding of
+platforms. Everything else (voluptuous schemas, registries, webhook,
+recorder) is an inert placeholder.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import importlib
+import importlib.util
+import json
+import logging
+import sys
+import types
+from datetime import datetime, timezone
+from typing import Any
+
+import aiohttp
+
+from _common import COMPONENT_DIR
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Placeholder:
+    """Inert stand-in for constants, helpers and types the benchmarks do not exercise."""
+
+    def __init__(self, name: str = "placeholder") -> None:
+        self._name = name
+
+    def __call__(self, *args, **kwargs) -> Placeholder:
+        return Placeholder(self._name)
+
+    def __getattr__(self, name: str) -> Placeholder:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Placeholder(f"{self._name}.{name}")
+
+    def __getitem__(self, key) -> Placeholder:
+        return self
+
+    def __or__(self, other) -> Placeholder:
+        return self
+
+    __ror__ = __or__
+
+    def __repr__(self) -> str:
+        return self._name
+
+
+def _module(name: str, **attributes: Any) -> types.ModuleType:
+    """Register a stub module; unknown names resolve to placeholders."""
+    module = types.ModuleType(name)
+    module.__path__ = []
+
+    def __getattr__(attribute: str) -> Placeholder:
+        if attribute.startswith("__"):
+            raise AttributeError(attribute)
+        return Placeholder(f"{name}.{attribute}")
+
+    module.__getattr__ = __getattr__
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    parent, _, child = name.rpartition(".")
+    if parent in sys.modules:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def callback(func):
+    """Mark a function as event loop safe (no-op like in HA)."""
+    return func
+
+
+class HomeAssistantError(Exception):
+    """Base error of Home Assistant."""
+
+
+class ConfigEntryNotReady(HomeAssistantError):
+    """Setup should be retried later."""
+
+
+class UpdateFailed(Exception):
+    """A coordinator update failed."""
+
+
+class AbortFlow(Exception):
+    """A config flow step aborted."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class FlowResultType(enum.StrEnum):
+    """Result types of a data entry flow step."""
+
+    FORM = "form"
+    MENU = "menu"
+    CREATE_ENTRY = "create_entry"
+    ABORT = "abort"
+
+
+class Platform(enum.StrEnum):
+    """Entity platforms the integration forwards."""
+
+    SENSOR = "sensor"
+    SWITCH = "switch"
+    NUMBER = "number"
+
+
+# --- Entities -----------------------------------------------------------------
+
+
+class Entity:
+    """State and attributes of one entity, written into hass.states."""
+
+    hass = None
+    entity_id: str | None = None
+    _attr_name: str | None = None
+    _attr_available = True
+    _attr_extra_state_attributes: dict | None = None
+    _attr_entity_registry_enabled_default = True
+
+    @property
+    def name(self) -> str | None:
+        return self._attr_name
+
+    @property
+    def available(self) -> bool:
+        return self._attr_available
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        return self._attr_extra_state_attributes
+
+    @property
+    def entity_registry_enabled_default(self) -> bool:
+        return self._attr_entity_registry_enabled_default
+
+    @property
+    def state(self) -> Any:
+        return None
+
+    def async_on_remove(self, func) -> None:
+        self.__dict__.setdefault("_on_remove", []).append(func)
+
+    async def async_added_to_hass(self) -> None:
+        """Run when the entity has been added."""
+
+    def async_write_ha_state(self) -> None:
+        """Store state and attributes like the state machine."""
+        state = self.state if self.available else "unavailable"
+        self.hass.states[self.entity_id] = (state, self.extra_state_attributes)
+
+
+class SensorEntity(Entity):
+    """Sensor: the state is the native value."""
+
+    @property
+    def native_value(self) -> Any:
+        return getattr(self, "_attr_native_value", None)
+
+    @property
+    def state(self) -> Any:
+        return self.native_value
+
+
+class SwitchEntity(Entity):
+    """Switch: on/off from is_on."""
+
+    @property
+    def is_on(self) -> bool | None:
+        return getattr(self, "_attr_is_on", None)
+
+    @property
+    def state(self) -> str | None:
+        is_on = self.is_on
+        return None if is_on is None else ("on" if is_on else "off")
+
+
+class NumberEntity(Entity):
+    """Number: the state is the native value."""
+
+    @property
+    def native_value(self) -> Any:
+        return getattr(self, "_attr_native_value", None)
+
+    @property
+    def state(self) -> Any:
+        return self.native_value
+
+
+class DataUpdateCoordinator:
+    """Refresh, error state and listener fan-out of HA's coordinator."""
+
+    def __init__(self, hass, logger, *, name: str, update_interval=None, **kwargs) -> None:
+        self.hass = hass
+        self.logger = logger
+        self.name = name
+        self.update_interval = update_interval
+        self.data = None
+        self.last_update_success = True
+        self.last_exception: Exception | None = None
+        self._listeners: dict[object, Any] = {}
+
+    def async_add_listener(self, update_callback, context=None):
+        key = object()
+        self._listeners[key] = update_callback
+        return lambda: self._listeners.pop(key, None)
+
+    def async_update_listeners(self) -> None:
+        for update_callback in list(self._listeners.values()):
+            update_callback()
+
+    async def _async_update_data(self):
+        raise NotImplementedError
+
+    async def _async_refresh(self) -> None:
+        try:
+            self.data = await self._async_update_data()
+        except UpdateFailed as err:
+            self.last_exception = err
+            self.last_update_success = False
+        else:
+            self.last_update_success = True
+        self.async_update_listeners()
+
+    async def async_refresh(self) -> None:
+        await self._async_refresh()
+
+    async def async_request_refresh(self) -> None:
+        # HA entprellt hier (Cooldown) - fuer die Last reicht ein direkter Refresh
+        await self._async_refresh()
+
+    async def async_config_entry_first_refresh(self) -> None:
+        await self._async_refresh()
+        if not self.last_update_success:
+            raise ConfigEntryNotReady(str(self.last_exception))
+
+    def async_set_updated_data(self, data) -> None:
+        self.data = data
+        self.last_update_success = True
+        self.async_update_listeners()
+
+
+class CoordinatorEntity(Entity):
+    """Entity updated by a coordinator."""
+
+    def __init__(self, coordinator, context=None) -> None:
+        self.coordinator = coordinator
+
+    def __class_getitem__(cls, item):
+        return cls
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.last_update_success
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self.coordinator.async_add_listener(self._handle_coordinator_update))
+
+    def _handle_coordinator_update(self) -> None:
+        self.async_write_ha_state()
+
+
+# --- Config entries and flows -------------------------------------------------
+
+
+class ConfigEntry:
+    """Config entry with the parts async_setup_entry uses."""
+
+    def __init__(self, entry_id: str, title: str, data: dict, options: dict, unique_id: str) -> None:
+        self.entry_id = entry_id
+        self.title = title
+        self.data = data
+        self.options = options
+        self.unique_id = unique_id
+        self._on_unload: list = []
+        self._tasks: set[asyncio.Task] = set()
+
+    def async_on_unload(self, func) -> None:
+        self._on_unload.append(func)
+
+    def add_update_listener(self, listener):
+        return lambda: None
+
+    def async_create_background_task(self, hass, target, name: str, eager_start: bool = True):
+        task = asyncio.get_running_loop().create_task(target, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def async_wait_tasks(self) -> None:
+        """Wait for the background tasks started during setup."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def async_process_on_unload(self) -> None:
+        """Run the unload callbacks like HA after unload or failed setup."""
+        while self._on_unload:
+            result = self._on_unload.pop()()
+            if asyncio.iscoroutine(result):
+                await result
+
+
+class ConfigFlow:
+    """Base of the integration's config flow."""
+
+    VERSION = 1
+    hass = None
+
+    def __init_subclass__(cls, domain: str | None = None, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # HA findet den Flow nur unter der Domain aus manifest.json (sonst UnknownHandler)
+        manifest = json.loads((COMPONENT_DIR / "manifest.json").read_text())
+        if domain is not None and domain != manifest["domain"]:
+            raise ValueError(f"Config flow domain {domain!r} is not {manifest['domain']!r}")
+        cls.domain = domain
+
+    @property
+    def context(self) -> dict:
+        return self.__dict__.setdefault("_context", {"source": "user"})
+
+    @property
+    def unique_id(self) -> str | None:
+        return self.context.get("unique_id")
+
+    async def async_set_unique_id(self, unique_id: str | None = None, **kwargs):
+        self.context["unique_id"] = unique_id
+
+    def _abort_if_unique_id_configured(self, **kwargs) -> None:
+        if any(entry.unique_id == self.unique_id for entry in self.hass.config_entries.entries):
+            raise AbortFlow("already_configured")
+
+    def _async_current_entries(self, include_ignore: bool | None = None) -> list:
+        return list(self.hass.config_entries.entries)
+
+    def async_create_entry(self, *, title: str, data: dict, **kwargs) -> dict:
+        return {"type": FlowResultType.CREATE_ENTRY, "title": title, "data": data, "unique_id": self.unique_id}
+
+    def async_show_form(self, *, step_id: str, errors: dict | None = None, **kwargs) -> dict:
+        return {"type": FlowResultType.FORM, "step_id": step_id, "errors": errors}
+
+    def async_show_menu(self, *, step_id: str, menu_options, **kwargs) -> dict:
+        return {"type": FlowResultType.MENU, "step_id": step_id, "menu_options": menu_options}
+
+    def async_abort(self, *, reason: str, **kwargs) -> dict:
+        return {"type": FlowResultType.ABORT, "reason": reason}
+
+
+class OptionsFlow(ConfigFlow):
+    """Base of the options flow."""
+
+
+class ConfigEntries:
+    """hass.config_entries: entries and platform forwarding."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.entries: list[ConfigEntry] = []
+        self._platforms: dict[str, list] = {}
+
+    def async_entries(self, domain: str | None = None) -> list[ConfigEntry]:
+        return list(self.entries)
+
+    def async_update_entry(self, entry: ConfigEntry, **changes) -> bool:
+        for key, value in changes.items():
+            setattr(entry, key, value)
+        return True
+
+    async def async_forward_entry_setups(self, entry: ConfigEntry, platforms) -> None:
+        """Set up the platform modules and add their entities."""
+        added = []
+        for platform in platforms:
+            module = importlib.import_module(f"mada.{platform}")
+            new: list = []
+            await module.async_setup_entry(
+                self.hass, entry, lambda entities, update_before_add=False: new.extend(entities)
+            )
+            for entity in new:
+                # Standardmaessig deaktivierte Entities legt HA nicht an
+                if not entity.entity_registry_enabled_default:
+                    continue
+                entity.hass = self.hass
+                entity.entity_id = f"{platform}.{entry.entry_id}_{len(added)}"
+                await entity.async_added_to_hass()
+                entity.async_write_ha_state()
+                added.append(entity)
+        self._platforms[entry.entry_id] = added
+
+    async def async_unload_platforms(self, entry: ConfigEntry, platforms) -> bool:
+        for entity in self._platforms.pop(entry.entry_id, []):
+            for func in entity.__dict__.get("_on_remove", []):
+                func()
+            self.hass.states.pop(entity.entity_id, None)
+        return True
+
+    async def async_reload(self, entry_id: str) -> None:
+        """Not exercised by the benchmarks."""
+
+
+# --- hass ---------------------------------------------------------------------
+
+
+class Services:
+    """hass.services: registry only."""
+
+    def __init__(self) -> None:
+        self._services: dict[tuple[str, str], Any] = {}
+
+    def has_service(self, domain: str, service: str) -> bool:
+        return (domain, service) in self._services
+
+    def async_register(self, domain: str, service: str, handler, **kwargs) -> None:
+        self._services[domain, service] = handler
+
+    def async_remove(self, domain: str, service: str) -> None:
+        self._services.pop((domain, service), None)
+
+
+class Bus:
+    """hass.bus: listeners are kept but events never fire."""
+
+    def async_listen_once(self, event_type: str, listener):
+        return lambda: None
+
+    def async_listen(self, event_type: str, listener):
+        return lambda: None
+
+
+class HomeAssistant:
+    """The parts of hass the integration touches."""
+
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        self.data: dict = {}
+        self.states: dict[str, tuple] = {}
+        self.storage: dict[str, Any] = {}
+        self.session = session
+        self.services = Services()
+        self.bus = Bus()
+        self.config = types.SimpleNamespace(components=set())
+        self.config_entries = ConfigEntries(self)
+        self.loop = asyncio.get_running_loop()
+        self._tasks: set[asyncio.Task] = set()
+
+    def async_create_task(self, target, name: str | None = None, eager_start: bool = True):
+        return self.async_create_background_task(target, name)
+
+    def async_create_background_task(self, target, name: str | None = None, eager_start: bool = True):
+        task = self.loop.create_task(target, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+
+class Store:
+    """Storage with HA's delayed save: a new request restarts the delay."""
+
+    def __init__(self, hass: HomeAssistant, version: int, key: str, **kwargs) -> None:
+        self.hass = hass
+        self.key = key
+        self.saves = 0
+        self._handle: asyncio.TimerHandle | None = None
+
+    async def async_load(self):
+        return self.hass.storage.get(self.key)
+
+    async def async_save(self, data) -> None:
+        self.hass.storage[self.key] = data
+        self.saves += 1
+
+    def async_delay_save(self, data_func, delay: float = 0) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = self.hass.loop.call_later(delay, self._write, data_func)
+
+    def _write(self, data_func) -> None:
+        self._handle = None
+        self.hass.storage[self.key] = data_func()
+        self.saves += 1
+
+    async def async_remove(self) -> None:
+        self.hass.storage.pop(self.key, None)
+
+
+def _utc_from_timestamp(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _as_timestamp(value) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value)).timestamp()
+
+
+def install() -> None:
+    """Put the stub modules into sys.modules (idempotent)."""
+    if "homeassistant" in sys.modules:
+        return
+
+    _module("async_timeout", timeout=asyncio.timeout)
+    _module("voluptuous")
+
+    _module("homeassistant")
+    _module(
+        "homeassistant.const",
+        Platform=Platform,
+        CONF_HOST="host",
+        CONF_PORT="port",
+        CONF_WEBHOOK_ID="webhook_id",
+        ATTR_DEVICE_ID="device_id",
+        PERCENTAGE="%",
+        EVENT_HOMEASSISTANT_CLOSE="homeassistant_close",
+    )
+    _module(
+        "homeassistant.core",
+        HomeAssistant=HomeAssistant,
+        callback=callback,
+    )
+    _module(
+        "homeassistant.exceptions",
+        HomeAssistantError=HomeAssistantError,
+        ConfigEntryNotReady=ConfigEntryNotReady,
+    )
+    _module(
+        "homeassistant.config_entries",
+        ConfigEntry=ConfigEntry,
+        ConfigFlow=ConfigFlow,
+        OptionsFlow=OptionsFlow,
+        SOURCE_INTEGRATION_DISCOVERY="integration_discovery",
+    )
+    _module("homeassistant.data_entry_flow", AbortFlow=AbortFlow, FlowResultType=FlowResultType)
+    _module("homeassistant.components")
+    for platform, entity_class in (
+        ("sensor", SensorEntity),
+        ("switch", SwitchEntity),
+        ("number", NumberEntity),
+    ):
+        _module(f"homeassistant.components.{platform}", **{entity_class.__name__: entity_class})
+    for name in ("webhook", "zeroconf", "diagnostics", "recorder", "recorder.models", "recorder.statistics"):
+        _module(f"homeassistant.components.{name}")
+    _module("homeassistant.helpers")
+    for name in ("config_validation", "device_registry", "entity_platform", "event", "network"):
+        _module(f"homeassistant.helpers.{name}")
+    _module(
+        "homeassistant.helpers.aiohttp_client",
+        async_get_clientsession=lambda hass, verify_ssl=True: hass.session,
+    )
+    _module("homeassistant.helpers.storage", Store=Store)
+    _module(
+        "homeassistant.helpers.update_coordinator",
+        DataUpdateCoordinator=DataUpdateCoordinator,
+        CoordinatorEntity=CoordinatorEntity,
+        UpdateFailed=UpdateFailed,
+    )
+    _module("homeassistant.util")
+    _module(
+        "homeassistant.util.dt",
+        utc_from_timestamp=_utc_from_timestamp,
+        as_timestamp=_as_timestamp,
+        utcnow=lambda: datetime.now(timezone.utc),
+    )
+
+
+def load_integration() -> types.ModuleType:
+    """Import custom_components/mada with its __init__ as the package "mada"."""
+    install()
+    package = sys.modules.get("mada")
+    if package is not None and getattr(package, "__file__", None):
+        return package
+
+    # Helfer-Module, die load_component_module schon geladen hat, bleiben gueltig
+    spec = importlib.util.spec_from_file_location(
+        "mada", COMPONENT_DIR / "__init__.py", submodule_search_locations=[str(COMPONENT_DIR)]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["mada"] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,144 @@
+"""Healthy-device poll latency with dead controllers in the fleet, with and without breaker.
+
+Dead controllers are sockets that accept connections but never answer, so
+every poll runs into the timeout while holding a slot of the fleet
+semaphore. Times are scaled down (1 s interval, 1 s timeout, 0.3 s probe
+timeout) to keep the run short. Reported numbers cover the second half of
+the run, after the breakers had time to open.
+
+Usage: python benchmarks/bench_breaker.py [--healthy 20] [--dead 10] [--duration 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import statistics
+import time
+from datetime import timedelta
+
+import aiohttp
+
+from _common import load_component_module
+from simulator import DeviceSimulator
+
+breaker_module = load_component_module("breaker")
+fleet_module = load_component_module("fleet")
+
+INTERVAL = timedelta(seconds=1)
+REQUEST_TIMEOUT = 1.0
+PROBE_TIMEOUT = 0.3
+
+
+class Member:
+    """Poll like MadaDataUpdateCoordinator, optionally behind a CircuitBreaker."""
+
+    def __init__(self, host, session, fleet, use_breaker: bool, latencies) -> None:
+        self.host = host
+        self.session = session
+        self.fleet = fleet
+        self.latencies = latencies
+        self.attempts = 0
+        self.breaker = (
+            breaker_module.CircuitBreaker(
+                # Verhaeltnis zum Intervall wie in der Integration (2 min zu 30 s)
+                backoff_min=INTERVAL * 4, backoff_max=timedelta(seconds=30)
+            )
+            if use_breaker
+            else None
+        )
+
+    @property
+    def poll_interval(self) -> timedelta:
+        if self.breaker is not None and self.breaker.is_open:
+            return self.breaker.retry_delay
+        return INTERVAL
+
+    async def async_refresh(self) -> None:
+        self.attempts += 1
+        timeout = REQUEST_TIMEOUT
+        if self.breaker is not None and self.breaker.is_open:
+            timeout = PROBE_TIMEOUT
+
+        start = time.perf_counter()
+        try:
+            async with self.fleet.semaphore, asyncio.timeout(timeout):
+                async with self.session.get(f"http://{self.host}/rpc/mada.GetStatus") as response:
+                    await response.read()
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            return
+
+        if self.breaker is not None:
+            self.breaker.record_success()
+        self.latencies.append((start, time.perf_counter() - start))
+
+
+def _dead_sockets(count: int) -> list[socket.socket]:
+    """Listening sockets that never accept - requests hang until the timeout."""
+    sockets = []
+    for _ in range(count):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(64)
+        sockets.append(sock)
+    return sockets
+
+
+async def run(healthy: int, dead: int, duration: float, use_breaker: bool) -> None:
+    """Run one fleet and print the healthy latency and dead-device attempts."""
+    simulator = DeviceSimulator(healthy)
+    await simulator.start()
+    dead_sockets = _dead_sockets(dead)
+    dead_hosts = [f"127.0.0.1:{sock.getsockname()[1]}" for sock in dead_sockets]
+
+    fleet = fleet_module.MadaFleetScheduler(INTERVAL, max_concurrent=4)
+    latencies: list[tuple[float, float]] = []
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0))
+    members = [
+        Member(host, session, fleet, use_breaker, latencies)
+        for host in simulator.hosts + dead_hosts
+    ]
+
+    runner = asyncio.create_task(fleet.async_run())
+    for member in members:
+        fleet.register(member)
+    await asyncio.sleep(duration / 2)
+    # Zweite Haelfte: eingeschwungener Zustand (Breaker offen)
+    steady = time.perf_counter()
+    attempts_before = sum(member.attempts for member in members[healthy:])
+    await asyncio.sleep(duration / 2)
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+
+    await session.close()
+    await simulator.stop()
+    for sock in dead_sockets:
+        sock.close()
+
+    steady_latencies = [latency for start, latency in latencies if start >= steady]
+    cuts = statistics.quantiles(steady_latencies, n=100)
+    dead_attempts = sum(member.attempts for member in members[healthy:]) - attempts_before
+    label = "with breaker   " if use_breaker else "without breaker"
+    print(
+        f"{label}: healthy polls={len(steady_latencies):5d} p50={cuts[49] * 1000:7.1f} ms "
+        f"p95={cuts[94] * 1000:7.1f} ms | dead-device attempts={dead_attempts}"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run both variants."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--healthy", type=int, default=20)
+    parser.add_argument("--dead", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30)
+    args = parser.parse_args()
+
+    for use_breaker in (False, True):
+        asyncio.run(run(args.healthy, args.dead, args.duration, use_breaker))
+
+
+if __name__ == "__main__":
+    main()
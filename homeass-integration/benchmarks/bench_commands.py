@@ -0,0 +1,100 @@
+"""Command queue against a stand-in device that counts received requests.
+
+Simulates dragging the pump power slider (many SetPWM writes within a
+second) plus toggling the pump switch, then checks that the device saw
+one request per RPC method, one GetStatus refresh, and the final values. With --batch the burst goes
+out as a single mada.Batch request that also carries the status read.
+
+Usage: python benchmarks/bench_commands.py [--moves 50] [--batch]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import aiohttp
+
+from _common import load_component_module
+from simulator import DeviceSimulator
+
+commands = load_component_module("commands")
+
+
+async def run(moves: int, batch: bool) -> None:
+    """Run the scenario."""
+    simulator = DeviceSimulator(1)
+    await simulator.start()
+    host = simulator.hosts[0]
+    device = simulator.devices[0]
+    refreshed = asyncio.Event()
+
+    async with aiohttp.ClientSession() as session:
+
+        async def send(method, params):
+            async with session.post(f"http://{host}/rpc/{method}", json=params) as response:
+                return response.status == 200
+
+        async def refresh():
+            async with session.get(f"http://{host}/rpc/mada.GetStatus") as response:
+                await response.json()
+            refreshed.set()
+
+        async def send_batch(calls):
+            payload = {
+                "calls": [{"method": m, "params": p} for m, p in calls]
+                + [{"method": "mada.GetStatus"}]
+            }
+            async with session.post(
+                f"http://{host}/rpc/mada.Batch", json=payload
+            ) as response:
+                await response.json()
+            refreshed.set()
+            return response.status == 200
+
+        queue = commands.MadaCommandQueue(
+            send, refresh, send_batch if batch else None
+        )
+        start = time.perf_counter()
+
+        # Slider ziehen: alle 15 ms ein neuer Wert, dazwischen Pumpe an/aus/an
+        for step in range(moves):
+            queue.submit("Pump.SetPWM", {"pwm": step * 100 // max(moves - 1, 1)})
+            if step in (moves // 4, moves // 2, 3 * moves // 4):
+                queue.submit("Pump.Set", {"on": step != moves // 2})
+            await asyncio.sleep(0.015)
+
+        await refreshed.wait()
+        # Batch: jeder Burst liefert Status mit - bis zum letzten warten
+        while queue.busy:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+    await simulator.stop()
+
+    print(f"writes submitted:  {queue.stats['submitted']}")
+    print(f"coalesced:         {queue.stats['coalesced']}")
+    print(f"requests received: {dict(device.requests)}")
+    print(f"burst settled in:  {elapsed:.2f} s")
+
+    assert device.status["pump"]["pwm_target"] == 100
+    assert device.status["pump"]["running"] is True
+    if batch:
+        assert device.requests["/rpc/mada.GetStatus"] == 0
+    else:
+        assert device.requests["/rpc/mada.GetStatus"] == 1
+    assert sum(device.requests.values()) < queue.stats["submitted"]
+
+
+def main() -> None:
+    """Parse arguments and run."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--moves", type=int, default=50)
+    parser.add_argument("--batch", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.moves, args.batch))
+
+
+if __name__ == "__main__":
+    main()
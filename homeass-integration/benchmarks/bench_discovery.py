@@ -0,0 +1,177 @@
+"""Zeroconf discovery on a busy LAN: probe every _http._tcp announcement vs. DiscoveryFilter.
+
+The LAN consists of simulated MADA controllers, HTTP devices answering
+/mada with 404 (printers, NAS), HTTP devices that never answer, and stale
+MADA announcements of controllers that are switched off. Every device
+announces itself several times, as zeroconf does at startup. Timeouts are
+scaled down (validation 1 s -> 0.3 s) to keep the run short.
+
+Usage: python benchmarks/bench_discovery.py [--mada 5] [--foreign 60] [--hanging 20] [--stale 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import time
+
+import aiohttp
+from aiohttp import web
+
+from _common import load_component_module
+from simulator import DeviceSimulator
+
+discovery = load_component_module("discovery")
+
+# Skaliert: 10 s bisher, 3 s DISCOVERY_TIMEOUT
+LEGACY_TIMEOUT = 1.0
+FILTER_TIMEOUT = 0.3
+ANNOUNCEMENTS = 3
+
+
+class Lan:
+    """Hosts with their zeroconf service name and TXT properties."""
+
+    def __init__(self) -> None:
+        self.announcements: list[tuple[str, str, dict]] = []
+        self.mada_hosts: set[str] = set()
+        self._sockets: list[socket.socket] = []
+        self._runner: web.AppRunner | None = None
+        self._simulator: DeviceSimulator | None = None
+
+    async def start(self, mada: int, foreign: int, hanging: int, stale: int) -> None:
+        self._simulator = DeviceSimulator(mada)
+        await self._simulator.start()
+        for index, host in enumerate(self._simulator.hosts):
+            self.mada_hosts.add(host)
+            self._announce(host, f"higrow-{index}._http._tcp.local.", {"type": "irrigation"})
+
+        # Drucker/NAS: antworten langsam mit 404
+        async def not_found(request: web.Request) -> web.Response:
+            await asyncio.sleep(0.05)
+            return web.Response(status=404)
+
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", not_found)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        for index in range(foreign):
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self._announce(f"127.0.0.1:{port}", f"printer-{index}._http._tcp.local.", {"ty": "LaserJet"})
+
+        for index in range(hanging):
+            self._announce(self._dead_host(), f"nas-{index}._http._tcp.local.", {"path": "/"})
+        for index in range(stale):
+            self._announce(self._dead_host(), f"higrow-old-{index}._http._tcp.local.", {"type": "irrigation"})
+
+    def _announce(self, host: str, name: str, properties: dict) -> None:
+        self.announcements.append((host, name, properties))
+
+    def _dead_host(self) -> str:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(64)
+        self._sockets.append(sock)
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+    async def stop(self) -> None:
+        await self._simulator.stop()
+        await self._runner.cleanup()
+        for sock in self._sockets:
+            sock.close()
+
+
+class Probe:
+    """validate_host of the config flow, counting requests."""
+
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        self.session = session
+        self.requests = 0
+        self.open = 0
+        self.peak = 0
+
+    async def validate(self, host: str, timeout: float) -> dict:
+        self.requests += 1
+        self.open += 1
+        self.peak = max(self.peak, self.open)
+        try:
+            async with asyncio.timeout(timeout):
+                async with self.session.get(f"http://{host}/mada") as response:
+                    if response.status != 200:
+                        raise ValueError(f"HTTP {response.status}")
+                    data = await response.json()
+                    if data.get("type") != "irrigation_controller":
+                        raise ValueError("Not a HiGrow device")
+                    return data
+        finally:
+            self.open -= 1
+
+
+async def run(lan: Lan, use_filter: bool) -> None:
+    """Start one flow per announcement and wait for all of them."""
+    found: dict[str, float] = {}
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        probe = Probe(session)
+        shared = discovery.DiscoveryFilter(timeout=FILTER_TIMEOUT)
+        start = time.perf_counter()
+
+        async def flow(host: str, name: str, properties: dict) -> None:
+            try:
+                if not use_filter:
+                    await probe.validate(host, LEGACY_TIMEOUT)
+                else:
+                    if not discovery.is_candidate(name, properties):
+                        shared.stats["filtered"] += 1
+                        return
+                    if shared.is_rejected(host):
+                        shared.stats["cached"] += 1
+                        return
+                    await shared.async_validate(host, probe.validate)
+            except Exception:  # noqa: BLE001 - Flow bricht ab
+                return
+            found.setdefault(host, time.perf_counter() - start)
+
+        await asyncio.gather(
+            *(flow(*announcement) for _ in range(ANNOUNCEMENTS) for announcement in lan.announcements)
+        )
+        total = time.perf_counter() - start
+
+    assert set(found) == lan.mada_hosts
+    label = "DiscoveryFilter" if use_filter else "probe all      "
+    print(
+        f"{label}: requests={probe.requests:4d} peak parallel={probe.peak:4d} "
+        f"all MADA found after {max(found.values()) * 1000:6.1f} ms, flows done after {total * 1000:6.1f} ms"
+    )
+    if use_filter:
+        print(f"                 {shared.stats}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    lan = Lan()
+    await lan.start(args.mada, args.foreign, args.hanging, args.stale)
+    print(
+        f"LAN: {args.mada} MADA, {args.foreign} HTTP devices (404), {args.hanging} hanging, "
+        f"{args.stale} stale MADA - {ANNOUNCEMENTS} announcements each\n"
+    )
+    try:
+        for use_filter in (False, True):
+            await run(lan, use_filter)
+    finally:
+        await lan.stop()
+
+
+def main() -> None:
+    """Parse arguments and run both variants."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mada", type=int, default=5)
+    parser.add_argument("--foreign", type=int, default=60)
+    parser.add_argument("--hanging", type=int, default=20)
+    parser.add_argument("--stale", type=int, default=3)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Memory per entity: integration-owned entity state before and after MadaEntity/MadaDevice.
+
+Home Assistant is not needed: the script builds the attributes the MADA
+entity classes set in their constructors on a plain base class with a
+__dict__ (like homeassistant.helpers.entity.Entity). The memory of the
+HA base itself is the same in both variants and not included.
+
+- before: every entity holds its metadata dict and its own device_info,
+  the per-entry metadata index stays in hass.data
+- after:  one MadaDevice per controller, no metadata dict on the entity,
+  the metadata index is dropped after the platform setup
+
+The /mada metadata dicts live in the metadata cache in both variants and
+are created before the measurement.
+
+Usage: python benchmarks/bench_entities.py [--devices 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import gc
+import tracemalloc
+
+from _common import SAMPLE_ENTITIES, load_component_module
+
+change_filter = load_component_module("change_filter")
+device_module = load_component_module("device")
+resolver = load_component_module("resolver")
+
+DOMAIN = "mada"
+
+
+class EntityBase:
+    """Stand-in for the HA Entity base class (instances have a __dict__)."""
+
+
+class LegacyEntity(EntityBase):
+    """Attributes of MadaSensorFromMetadata & co. before V2.2/V2.0."""
+
+    def __init__(self, entry_id: str, entity_id: str, metadata: dict) -> None:
+        self._entity_id = entity_id
+        self._metadata = metadata
+        self._resolve = resolver.compile_data_path(entity_id, metadata.get("data_path"))
+        self._watch = change_filter.ValueWatch(
+            self._resolve, change_filter.parse_deadband(metadata.get("deadband"))
+        )
+        self._attr_unique_id = f"{entry_id}_{entity_id}"
+        self._attr_name = f"MADA {metadata.get('name', entity_id)}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry_id)},
+            "name": "MADA Bewässerung",
+            "manufacturer": "Custom",
+            "model": "LilyGo-HiGrow-v1.1",
+            "sw_version": "1.5-HA",
+        }
+        self._attr_icon = metadata.get("icon", "mdi:numeric")
+
+
+class CompactEntity(EntityBase):
+    """Attributes of MadaEntity subclasses."""
+
+
+    def __init__(self, device, entry_id: str, entity_id: str, metadata: dict) -> None:
+        self._entity_id = entity_id
+        self._resolve = resolver.compile_data_path(entity_id, metadata.get("data_path"))
+        self._watch = change_filter.ValueWatch(
+            self._resolve, change_filter.parse_deadband(metadata.get("deadband"))
+        )
+        self._attr_unique_id = f"{entry_id}_{entity_id}"
+        self._attr_name = f"MADA {metadata.get('name', entity_id)}"
+        self._attr_device_info = device.device_info
+        icon = metadata.get("icon")
+        if icon:
+            self._attr_icon = icon
+
+
+def measure(devices: int, compact: bool) -> tuple[int, int]:
+    """Return (bytes, entities) retained after setting up all devices."""
+    # Metadaten-Cache: existiert in beiden Varianten, nicht mitgemessen
+    cache = [copy.deepcopy(SAMPLE_ENTITIES) for _ in range(devices)]
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    retained = []
+    count = 0
+    for index, entities in enumerate(cache):
+        entry_id = f"01J{index:023d}"
+        index_by_id = {entity["id"]: entity for entity in entities}
+        if compact:
+            device = device_module.MadaDevice(DOMAIN, entry_id, "LilyGo-HiGrow-v1.1", "1.5-HA")
+            retained.append(
+                [CompactEntity(device, entry_id, key, meta) for key, meta in index_by_id.items()]
+            )
+            # Index wird nach dem Plattform-Setup verworfen
+            del index_by_id
+        else:
+            retained.append(
+                [LegacyEntity(entry_id, key, meta) for key, meta in index_by_id.items()]
+            )
+            retained.append(index_by_id)
+        count += len(entities)
+
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, count
+
+
+def main() -> None:
+    """Parse arguments and compare both variants."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=500)
+    args = parser.parse_args()
+
+    results = {}
+    for compact in (False, True):
+        size, count = measure(args.devices, compact)
+        results[compact] = size / count
+        label = "after " if compact else "before"
+        print(f"{label}: {count} entities, {size / 1024:8.1f} KiB, {size / count:6.0f} bytes/entity")
+
+    print(f"\nsaved {1 - results[True] / results[False]:.0%} per entity")
+
+
+if __name__ == "__main__":
+    main()
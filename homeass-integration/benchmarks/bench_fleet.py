@@ -0,0 +1,95 @@
+"""Poll latency of the fleet scheduler against N simulated controllers.
+
+Usage: python benchmarks/bench_fleet.py [--devices 10 100 500] [--interval 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import timedelta
+
+import aiohttp
+
+from _common import load_component_module
+from simulator import DeviceSimulator
+
+fleet_module = load_component_module("fleet")
+
+
+class BenchMember:
+    """Minimal coordinator: fetch GetStatus like MadaDataUpdateCoordinator."""
+
+    def __init__(self, host, session, fleet, interval, latencies) -> None:
+        self.host = host
+        self.session = session
+        self.fleet = fleet
+        self.poll_interval = interval
+        self.latencies = latencies
+        self.failures = 0
+
+    async def async_refresh(self) -> None:
+        start = time.perf_counter()
+        try:
+            async with self.fleet.semaphore, asyncio.timeout(10):
+                async with self.session.get(f"http://{self.host}/rpc/mada.GetStatus") as response:
+                    await response.json()
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            self.failures += 1
+            return
+        self.latencies.append(time.perf_counter() - start)
+
+
+async def run(devices: int, interval: float, max_concurrent: int) -> None:
+    """Run one fleet for two intervals and report latency."""
+    simulator = DeviceSimulator(devices)
+    await simulator.start()
+
+    latencies: list[float] = []
+    fleet = fleet_module.MadaFleetScheduler(timedelta(seconds=interval), max_concurrent)
+    connector = aiohttp.TCPConnector(limit=0)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        members = [
+            BenchMember(host, session, fleet, timedelta(seconds=interval), latencies)
+            for host in simulator.hosts
+        ]
+        runner = asyncio.create_task(fleet.async_run())
+        for member in members:
+            fleet.register(member)
+
+        await asyncio.sleep(interval * 2)
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+
+    await simulator.stop()
+
+    failures = sum(member.failures for member in members)
+    if len(latencies) < 2:
+        print(f"{devices:5d} devices: not enough samples ({failures} failures)")
+        return
+
+    cuts = statistics.quantiles(latencies, n=100)
+    print(
+        f"{devices:5d} devices: polls={len(latencies):6d} failures={failures:4d} "
+        f"p50={cuts[49] * 1000:7.2f} ms p95={cuts[94] * 1000:7.2f} ms "
+        f"max={max(latencies) * 1000:7.2f} ms"
+    )
+
+
+def main() -> None:
+    """Run the benchmark for every fleet size."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--interval", type=float, default=10.0)
+    parser.add_argument("--max-concurrent", type=int, default=fleet_module.MAX_CONCURRENT_POLLS)
+    args = parser.parse_args()
+
+    for devices in args.devices:
+        asyncio.run(run(devices, args.interval, args.max_concurrent))
+
+
+if __name__ == "__main__":
+    main()
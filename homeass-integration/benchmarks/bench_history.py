@@ -0,0 +1,62 @@
+"""Cost of the per-device time-series buffer.
+
+Feeds a week of 30 s polls into MadaHistory and reports the time per
+recorded poll, the fixed memory per device and how long the downsampled
+queries behind the mada.get_history service take.
+
+Usage: python benchmarks/bench_history.py [--days 7] [--interval 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import time
+
+from _common import SAMPLE_STATUS, load_component_module
+
+history_module = load_component_module("history")
+
+
+def run(days: float, interval: float) -> None:
+    """Run the benchmark."""
+    history = history_module.MadaHistory()
+    status = copy.deepcopy(SAMPLE_STATUS)
+    polls = int(days * 86400 / interval)
+    start = time.time() - polls * interval
+
+    elapsed = 0.0
+    for index in range(polls):
+        status["soil"]["moisture"] = 30 + random.random() * 20
+        status["light"]["lux"] = random.random() * 20000
+        begin = time.perf_counter()
+        history.add(start + index * interval, status)
+        elapsed += time.perf_counter() - begin
+
+    print(f"polls recorded:   {polls}")
+    print(f"add() per poll:   {elapsed / polls * 1e6:.1f} us")
+    print(f"memory / device:  {history.nbytes / 1024:.1f} KiB (fixed)")
+
+    for resolution in history.resolutions:
+        begin = time.perf_counter()
+        buckets = history.buckets(resolution)
+        took = time.perf_counter() - begin
+        print(f"query {resolution:>5}:      {took * 1000:.2f} ms, {len(buckets['moisture'])} buckets")
+
+    begin = time.perf_counter()
+    raw = history.raw()
+    print(f"query   raw:      {(time.perf_counter() - begin) * 1000:.2f} ms, {len(raw['moisture'])} points")
+
+
+def main() -> None:
+    """Parse arguments and run."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--interval", type=float, default=30)
+    args = parser.parse_args()
+    run(args.days, args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Overhead of MadaInstrumentation per measured call, disabled vs. enabled.
+
+One poll records about five measurements (update, decode, payload and a
+few state writes), so the per-call cost times five is the cost per poll.
+
+Usage: python benchmarks/bench_instrumentation.py [--calls 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from _common import load_component_module
+
+instrumentation = load_component_module("instrumentation")
+
+
+def _measure(enabled: bool, calls: int) -> float:
+    """Return seconds per start/stop pair."""
+    collector = instrumentation.MadaInstrumentation(enabled)
+    begin = time.perf_counter()
+    for _ in range(calls):
+        start = collector.start()
+        collector.stop(instrumentation.TIMER_UPDATE, start)
+    return (time.perf_counter() - begin) / calls
+
+
+def _baseline(calls: int) -> float:
+    """Return seconds per iteration of an empty loop."""
+    begin = time.perf_counter()
+    for _ in range(calls):
+        pass
+    return (time.perf_counter() - begin) / calls
+
+
+def main() -> None:
+    """Parse arguments and run."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    calls = parser.parse_args().calls
+
+    empty = _baseline(calls)
+    disabled = _measure(False, calls) - empty
+    enabled = _measure(True, calls) - empty
+    print(f"disabled: {disabled * 1e9:7.1f} ns per measurement")
+    print(f"enabled:  {enabled * 1e9:7.1f} ns per measurement")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Command journal under fleet load, on a virtual clock.
+
+Every device has a pump switch and a PWM number. Commands arrive at
+--rate per hour across the fleet; a share of the devices drops off Wi-Fi
+for random windows, so their commands fail and go into the journal. When
+a device answers again, the journal is replayed through the same path
+the coordinator uses. Writes are counted like the delayed save of the
+Home Assistant Store (a save within the delay postpones the write).
+
+Checked: the final state of every device equals the last command sent
+to it unless that command expired, and the journal never holds more than
+one entry per actuator.
+
+Usage: python benchmarks/bench_journal.py [--devices 100] [--rate 5000] [--hours 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from _common import load_component_module
+
+journal_module = load_component_module("journal")
+
+OUTAGE_SHARE = 0.2  # Anteil Geraete mit Ausfaellen
+OUTAGE_LENGTH = (60, 3600)  # Sekunden
+POLL_INTERVAL = 30
+
+
+class DelayedSave:
+    """Count writes like Store.async_delay_save (timer restarts on every call)."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.writes = 0
+        self.due: float | None = None
+        self.now = 0.0
+
+    def __call__(self) -> None:
+        self.calls += 1
+        self.due = self.now + self.delay
+
+    def advance(self, now: float) -> None:
+        if self.due is not None and now >= self.due:
+            self.writes += 1
+            self.due = None
+        self.now = now
+
+
+def main() -> None:
+    """Parse arguments and run the scenario."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--rate", type=int, default=5000, help="commands per hour")
+    parser.add_argument("--hours", type=float, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    saver = DelayedSave(journal_module.JOURNAL_SAVE_DELAY)
+    journal = journal_module.CommandJournal(saver)
+
+    devices = [f"entry{index}" for index in range(args.devices)]
+    state = {device: {"Pump.Set": None, "Pump.SetPWM": None} for device in devices}
+    # Letzter Befehl pro Aktor: (params, Ablaufzeit)
+    wanted: dict[tuple[str, str], tuple[dict, float]] = {}
+    outages: dict[str, tuple[float, float]] = {}
+    max_entries = commands = delivered = failed = 0
+    journal_time = 0.0
+
+    def send(device: str, now: float, key: str, params: dict, ttl: float | None) -> None:
+        nonlocal delivered, failed, journal_time
+        start, end = outages.get(device, (0.0, 0.0))
+        ok = not start <= now < end
+        began = time.perf_counter()
+        if ok:
+            delivered += 1
+            state[device][key] = params
+            journal.clear(device, key)
+        else:
+            failed += 1
+            journal.record(device, key, key, params, now, ttl)
+        journal_time += time.perf_counter() - began
+
+    duration = int(args.hours * 3600)
+    for now in range(duration):
+        saver.advance(now)
+        # Ausfaelle beginnen zufaellig
+        for device in devices:
+            if rng.random() < OUTAGE_SHARE / 3600 and device not in outages:
+                outages[device] = (now, now + rng.uniform(*OUTAGE_LENGTH))
+
+        # Befehle dieser Sekunde (Poisson-artig)
+        for _ in range(int(args.rate / 3600) + (rng.random() < args.rate / 3600 % 1)):
+            device = rng.choice(devices)
+            commands += 1
+            if rng.random() < 0.5:
+                on = rng.random() < 0.5
+                ttl = None if on else journal_module.STOP_TTL
+                key, params = "Pump.Set", {"on": on}
+            else:
+                ttl = None
+                key, params = "Pump.SetPWM", {"pwm": rng.randrange(0, 101, 5)}
+            expires = now + (journal_module.COMMAND_TTL if ttl is None else ttl)
+            wanted[device, key] = (params, expires)
+            send(device, now, key, params, ttl)
+
+        # Polls: antwortende Geraete holen Liegengebliebenes nach
+        for index in range(now % POLL_INTERVAL, len(devices), POLL_INTERVAL):
+            device = devices[index]
+            start, end = outages.get(device, (0.0, 0.0))
+            if start <= now < end or not journal.has(device):
+                continue
+            began = time.perf_counter()
+            calls = journal.pending(device, now)
+            journal_time += time.perf_counter() - began
+            for key, _, params in calls:
+                send(device, now, key, params, None)
+
+        max_entries = max(max_entries, len(journal))
+        for device, (_, end) in list(outages.items()):
+            if now >= end:
+                del outages[device]
+
+    # Pruefung: Endzustand = letzter Befehl, ausser er ist abgelaufen oder wartet noch
+    wrong = 0
+    for (device, key), (params, expires) in wanted.items():
+        waiting = journal.has(device) and any(
+            call[0] == key for call in journal.pending(device, duration)
+        )
+        if state[device][key] != params and expires > duration and not waiting:
+            wrong += 1
+
+    print(
+        f"{args.devices} devices, {commands} commands in {args.hours:g} h "
+        f"({commands / args.hours:.0f}/h), {failed} failed sends\n"
+        f"journal: recorded={journal.stats['recorded']} collapsed={journal.stats['collapsed']} "
+        f"cleared={journal.stats['cleared']} expired={journal.stats['expired']} "
+        f"max entries={max_entries} (limit {2 * args.devices})\n"
+        f"saves: {saver.calls} requested -> {saver.writes} disk writes\n"
+        f"journal cpu: {journal_time / commands * 1e6:.2f} us per command\n"
+        f"final state wrong: {wrong}"
+    )
+
+
+if __name__ == "__main__":
+    main()
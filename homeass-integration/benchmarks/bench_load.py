@@ -0,0 +1,281 @@
+"""Load test and regression gate: the integration against 1-1000 simulated devices.
+
+Starts the simulator in a separate process (so its work does not skew the
+measurements) and runs the real integration on a minimal Home Assistant
+stand-in (_hass.py): every device is added through HiGrowConfigFlow, set
+up with async_setup_entry (MadaDataUpdateCoordinator, the sensor, switch
+and number platforms, the fleet scheduler) and then polled by the fleet
+scheduler. Polls go through the same path as in HA: single-flight,
+circuit breaker, change detection and entity state writes. With --commands the switch and number entities send commands
+at that rate across the fleet.
+
+Reported per fleet size:
+- config flow latency (p95) and setup time of all entries
+- poll latency percentiles (coordinator refresh incl. listener updates)
+- event loop blocking: lag of a 10 ms probe timer, max and total > 20 ms
+- memory per device after flow, setup and the first poll (tracemalloc)
+- GetStatus requests saved by single-flight, state writes per poll
+
+With --max-p95 / --max-lag the script exits with status 1 when a limit is
+exceeded, so it can gate performance changes.
+
+Usage: python benchmarks/bench_load.py [--devices 1 100 1000] [--duration 20]
+       [--interval 5] [--commands 2] [--latency 30 --jitter 15 --error-rate 0.01 --payload-size 1024]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import importlib
+import logging
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+import aiohttp
+
+import _hass
+from simulator import add_profile_arguments
+
+integration = _hass.load_integration()
+config_flow = importlib.import_module("mada.config_flow")
+polling = importlib.import_module("mada.polling")
+
+BASE_PORT = 19000
+PROBE_INTERVAL = 0.01
+BLOCKING_THRESHOLD = 0.02
+# Wartezeit bis zum erneuten Versuch nach fehlgeschlagenem Flow/Setup (Sekunden)
+RETRY_DELAY = 0.1
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    cuts = statistics.quantiles(values, n=100) if len(values) > 1 else values * 99 or [0.0] * 99
+    return cuts[percent - 1]
+
+
+async def _async_add_entry(hass, index: int, host: str, options: dict, flow_times: list[float]):
+    """Add one device through the config flow like a user, retrying injected errors."""
+    while True:
+        flow = config_flow.HiGrowConfigFlow()
+        flow.hass = hass
+        start = time.perf_counter()
+        result = await flow.async_step_host({"host": host})
+        flow_times.append(time.perf_counter() - start)
+        if result["type"] == _hass.FlowResultType.CREATE_ENTRY:
+            break
+        await asyncio.sleep(RETRY_DELAY)
+
+    entry = _hass.ConfigEntry(f"entry{index}", result["title"], result["data"], options, result["unique_id"])
+    hass.config_entries.entries.append(entry)
+    return entry
+
+
+async def _async_setup(hass, entry) -> None:
+    """Set up one entry, retrying like HA on ConfigEntryNotReady."""
+    while True:
+        try:
+            if await integration.async_setup_entry(hass, entry):
+                # Erster Poll laeuft beim Setup aus dem Cache im Hintergrund
+                await entry.async_wait_tasks()
+                return
+        except _hass.ConfigEntryNotReady:
+            pass
+        await entry.async_process_on_unload()
+        await asyncio.sleep(RETRY_DELAY)
+
+
+def _timed(coordinator, latencies: list[float], failures: list[int]) -> None:
+    """Measure every fleet poll of a coordinator: refresh and listener updates."""
+    refresh = coordinator.async_refresh
+
+    async def async_refresh() -> None:
+        start = time.perf_counter()
+        await refresh()
+        if coordinator.last_update_success:
+            latencies.append(time.perf_counter() - start)
+        else:
+            failures[0] += 1
+
+    coordinator.async_refresh = async_refresh
+
+
+async def _commands(entities: list, rate: float) -> None:
+    """Switch pumps and set PWM through the entities at rate per second."""
+    rng = random.Random(1)
+    while True:
+        await asyncio.sleep(rng.expovariate(rate))
+        entity = rng.choice(entities)
+        if hasattr(entity, "async_turn_on"):
+            await (entity.async_turn_on() if rng.random() < 0.5 else entity.async_turn_off())
+        else:
+            await entity.async_set_native_value(rng.randrange(0, 101, 5))
+
+
+async def _probe(lags: list[float]) -> None:
+    """Measure how late a short timer fires - the loop was blocked meanwhile."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - start - PROBE_INTERVAL)
+
+
+def _start_simulator(devices: int, args: argparse.Namespace) -> subprocess.Popen:
+    """Run the simulator in its own process and wait for the last port."""
+    command = [
+        sys.executable,
+        str(Path(__file__).with_name("simulator.py")),
+        "--devices", str(devices),
+        "--base-port", str(BASE_PORT),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--payload-size", str(args.payload_size),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", BASE_PORT + devices - 1), 0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+
+    process.kill()
+    raise RuntimeError("Simulator did not start")
+
+
+async def run(devices: int, args: argparse.Namespace) -> dict:
+    """Measure one fleet size."""
+    # Konstante Last: Basisintervall = Obergrenze, der adaptive Backoff greift nicht
+    integration.SCAN_INTERVAL = timedelta(seconds=args.interval)
+    options = {polling.CONF_MAX_SCAN_INTERVAL: args.interval}
+    hosts = [f"127.0.0.1:{BASE_PORT + index}" for index in range(devices)]
+    latencies: list[float] = []
+    failures = [0]
+    flow_times: list[float] = []
+
+    async with aiohttp.ClientSession() as shared:
+        hass = _hass.HomeAssistant(shared)
+
+        # Speicher: Flow, Setup und erster Poll unter tracemalloc
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        entries = await asyncio.gather(
+            *(
+                _async_add_entry(hass, index, host, options, flow_times)
+                for index, host in enumerate(hosts)
+            )
+        )
+        await asyncio.gather(*(_async_setup(hass, entry) for entry in entries))
+        setup_time = time.perf_counter() - start
+        gc.collect()
+        per_device = (tracemalloc.get_traced_memory()[0] - baseline) / devices
+        tracemalloc.stop()
+
+        coordinators = [hass.data[integration.DOMAIN][entry.entry_id]["coordinator"] for entry in entries]
+        for coordinator in coordinators:
+            _timed(coordinator, latencies, failures)
+            coordinator.update_stats.update(delivered=0, suppressed=0)
+        actuators = [
+            entity
+            for entities in hass.config_entries._platforms.values()
+            for entity in entities
+            if entity.entity_id.startswith(("switch.", "number."))
+        ]
+
+        lags: list[float] = []
+        tasks = [asyncio.create_task(_probe(lags))]
+        if args.commands and actuators:
+            tasks.append(asyncio.create_task(_commands(actuators, args.commands)))
+        await asyncio.sleep(args.duration)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        flights = [coordinator.status_flight.stats for coordinator in coordinators]
+        fetched = sum(stats["fetched"] for stats in flights)
+        shared_status = sum(stats["shared"] + stats["reused"] for stats in flights)
+        writes = sum(coordinator.update_stats["delivered"] for coordinator in coordinators)
+        open_breakers = sum(coordinator.breaker.is_open for coordinator in coordinators)
+
+        for entry in entries:
+            await integration.async_unload_entry(hass, entry)
+            await entry.async_process_on_unload()
+
+    return {
+        "devices": devices,
+        "flow_p95": _percentile(flow_times, 95),
+        "setup": setup_time,
+        "polls": len(latencies),
+        "failures": failures[0],
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "max_lag": max(lags, default=0.0),
+        "blocked": sum(lag for lag in lags if lag > BLOCKING_THRESHOLD),
+        "memory": per_device,
+        "fetched": fetched,
+        "shared": shared_status,
+        "writes": writes / max(len(latencies), 1),
+        "open_breakers": open_breakers,
+    }
+
+
+def main() -> None:
+    """Parse arguments, run every fleet size and apply the gates."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per fleet size")
+    parser.add_argument("--interval", type=float, default=5.0, help="poll interval in seconds")
+    parser.add_argument("--commands", type=float, default=0.0, help="commands per second across the fleet")
+    parser.add_argument("--max-p95", type=float, help="gate: p95 poll latency in ms")
+    parser.add_argument("--max-lag", type=float, help="gate: max event loop lag in ms")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    # Injizierte Fehler loggt die Integration als Warnung - hier nur Stoerung der Ausgabe
+    logging.basicConfig(level=logging.ERROR)
+
+    failed = False
+    for devices in args.devices:
+        simulator = _start_simulator(devices, args)
+        try:
+            result = asyncio.run(run(devices, args))
+        finally:
+            simulator.terminate()
+            simulator.wait()
+
+        print(
+            f"{result['devices']:5d} devices: flow p95={result['flow_p95'] * 1000:7.2f} ms "
+            f"setup={result['setup']:5.2f} s | polls={result['polls']:6d} failures={result['failures']:4d} "
+            f"p50={result['p50'] * 1000:7.2f} p95={result['p95'] * 1000:7.2f} "
+            f"p99={result['p99'] * 1000:7.2f} ms\n"
+            f"{'':15}loop lag max={result['max_lag'] * 1000:6.1f} ms "
+            f"blocked={result['blocked'] * 1000:7.1f} ms | {result['memory'] / 1024:6.1f} KiB/device | "
+            f"GetStatus={result['fetched']} shared={result['shared']} | "
+            f"state writes/poll={result['writes']:.1f} | open breakers={result['open_breakers']}"
+        )
+
+        if args.max_p95 is not None and result["p95"] * 1000 > args.max_p95:
+            print(f"  FAIL: p95 above {args.max_p95} ms")
+            failed = True
+        if args.max_lag is not None and result["max_lag"] * 1000 > args.max_lag:
+            print(f"  FAIL: loop lag above {args.max_lag} ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Delta ingestion throughput of the push channel.
+
+Starts a local receiver that routes webhook POSTs to MadaPushChannel (the
+same handler Home Assistant's webhook component calls) and N fake devices
+posting status deltas like the firmware's push mode.
+
+Usage: python benchmarks/bench_push.py [--devices 10] [--messages 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import random
+import statistics
+import time
+
+import aiohttp
+from aiohttp import web
+
+from _common import SAMPLE_STATUS, load_component_module
+
+push = load_component_module("push")
+
+
+class Receiver:
+    """Integration side: one push channel per device."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, dict] = {}
+        self.updates = 0
+        self.channels: dict[str, push.MadaPushChannel] = {}
+
+    def add(self, webhook_id: str) -> None:
+        async def subscribe(url, heartbeat):
+            return True
+
+        def set_data(data, webhook_id=webhook_id):
+            self.data[webhook_id] = data
+            self.updates += 1
+
+        self.channels[webhook_id] = push.MadaPushChannel(
+            f"/api/webhook/{webhook_id}",
+            subscribe,
+            lambda webhook_id=webhook_id: self.data.get(webhook_id),
+            set_data,
+        )
+
+    async def handle(self, request: web.Request) -> web.Response:
+        webhook_id = request.match_info["webhook_id"]
+        return await self.channels[webhook_id].async_handle_webhook(None, webhook_id, request)
+
+
+async def fake_device(session, url, messages, latencies) -> dict:
+    """Post a full status, then deltas of changing values."""
+    status = copy.deepcopy(SAMPLE_STATUS)
+    await session.post(url, json={"seq": 0, "full": True, "delta": status})
+
+    for seq in range(1, messages + 1):
+        moisture = random.randint(20, 60)
+        status["soil"]["moisture"] = moisture
+        delta = {"soil": {"moisture": moisture}}
+        if seq % 10 == 0:
+            status["pump"]["running"] = not status["pump"]["running"]
+            delta["pump"] = {"running": status["pump"]["running"]}
+
+        start = time.perf_counter()
+        async with session.post(url, json={"seq": seq, "delta": delta}) as response:
+            assert response.status == 200
+        latencies.append(time.perf_counter() - start)
+
+    return status
+
+
+async def run(devices: int, messages: int) -> None:
+    """Run the benchmark."""
+    receiver = Receiver()
+    app = web.Application()
+    app.router.add_post("/api/webhook/{webhook_id}", receiver.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    for index in range(devices):
+        receiver.add(f"device{index}")
+
+    latencies: list[float] = []
+    async with aiohttp.ClientSession() as session:
+        start = time.perf_counter()
+        expected = await asyncio.gather(
+            *(
+                fake_device(
+                    session,
+                    f"http://127.0.0.1:{port}/api/webhook/device{index}",
+                    messages,
+                    latencies,
+                )
+                for index in range(devices)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    await runner.cleanup()
+
+    for index, status in enumerate(expected):
+        assert receiver.data[f"device{index}"] == status, f"device{index} diverged"
+
+    total = devices * (messages + 1)
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"devices:      {devices}")
+    print(f"messages:     {total} ({receiver.updates} state updates)")
+    print(f"throughput:   {total / elapsed:,.0f} msg/s")
+    print(f"latency:      p50={cuts[49] * 1000:.2f} ms p95={cuts[94] * 1000:.2f} ms")
+
+
+def main() -> None:
+    """Parse arguments and run."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.devices, args.messages))
+
+
+if __name__ == "__main__":
+    main()
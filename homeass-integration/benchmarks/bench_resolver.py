@@ -0,0 +1,72 @@
+"""Micro-benchmark: precompiled data_path resolver vs. per-read dict walk.
+
+Usage: python benchmarks/bench_resolver.py [--reads N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from _common import SAMPLE_PATHS, SAMPLE_STATUS, load_component_module
+
+resolver = load_component_module("resolver")
+
+
+def legacy_walk(data, data_path):
+    """The per-read lookup the entity platforms used before V1.6."""
+    if data is None:
+        return None
+    if not data_path or len(data_path) < 2:
+        return None
+    try:
+        value = data
+        for key in data_path:
+            value = value.get(key, {})
+            if value == {}:
+                return None
+        return value
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reads", type=int, default=200_000)
+    args = parser.parse_args()
+
+    paths = list(SAMPLE_PATHS.items())
+    compiled = [
+        resolver.compile_data_path(entity_id, path) for entity_id, path in paths
+    ]
+    missing = resolver.MISSING
+
+    # Plausibilitaet: beide Varianten liefern dieselben Werte (0/False inkl.)
+    for (entity_id, path), resolve in zip(paths, compiled):
+        value = resolve(SAMPLE_STATUS)
+        value = None if value is missing else value
+        assert value == legacy_walk(SAMPLE_STATUS, path), entity_id
+
+    rounds = max(1, args.reads // len(paths))
+
+    def run_legacy():
+        for _, path in paths:
+            legacy_walk(SAMPLE_STATUS, path)
+
+    def run_compiled():
+        for resolve in compiled:
+            resolve(SAMPLE_STATUS)
+
+    legacy = min(timeit.repeat(run_legacy, number=rounds, repeat=5))
+    fast = min(timeit.repeat(run_compiled, number=rounds, repeat=5))
+    reads = rounds * len(paths)
+
+    print(f"reads per variant:  {reads}")
+    print(f"legacy walk:        {legacy / reads * 1e9:8.1f} ns/read")
+    print(f"compiled resolver:  {fast / reads * 1e9:8.1f} ns/read")
+    print(f"speedup:            {legacy / fast:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
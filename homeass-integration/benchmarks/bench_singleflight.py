@@ -0,0 +1,87 @@
+"""GetStatus requests during refresh bursts, with and without single-flight.
+
+One burst is what Home Assistant does when a switch and a number finish
+at nearly the same time while the fleet poll is due: several refreshes
+of one coordinator within a few hundred milliseconds. Half of the callers
+start together, the others arrive spread over --spread ms - partly after
+the first fetch has returned, where only the freshness window helps.
+
+Usage: python benchmarks/bench_singleflight.py [--bursts 20] [--callers 4] [--latency 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from _common import load_component_module
+from simulator import DeviceProfile, DeviceSimulator
+
+singleflight = load_component_module("singleflight")
+
+
+async def run(bursts: int, callers: int, latency: float, spread: float, shared: bool) -> None:
+    """Run all bursts against one simulated device and print the result."""
+    simulator = DeviceSimulator(1, profile=DeviceProfile(latency=latency / 1000))
+    await simulator.start()
+    host = simulator.hosts[0]
+    device = simulator.devices[0]
+    flight = singleflight.SingleFlight()
+    rng = random.Random(1)
+
+    async with aiohttp.ClientSession() as session:
+
+        async def fetch() -> dict:
+            async with session.get(f"http://{host}/rpc/mada.GetStatus") as response:
+                return await response.json()
+
+        async def refresh(delay: float) -> None:
+            await asyncio.sleep(delay)
+            if shared:
+                await flight.run(fetch)
+            else:
+                await fetch()
+
+        start = time.perf_counter()
+        for _ in range(bursts):
+            delays = [
+                0.0 if index < callers // 2 else rng.uniform(0, spread / 1000)
+                for index in range(callers)
+            ]
+            await asyncio.gather(*(refresh(delay) for delay in delays))
+            # Naechster Burst ausserhalb des Frische-Fensters
+            await asyncio.sleep(singleflight.FRESHNESS_WINDOW)
+        elapsed = time.perf_counter() - start
+
+    await simulator.stop()
+
+    requests = device.requests["/rpc/mada.GetStatus"]
+    label = "single-flight" if shared else "plain"
+    line = f"{label:13} GetStatus requests={requests:4d} for {bursts * callers} refreshes"
+    if shared:
+        line += (
+            f" (shared {flight.stats['shared']}, reused {flight.stats['reused']},"
+            f" deduplicated {flight.deduplicated})"
+        )
+    print(f"{line} | {elapsed:.1f} s")
+
+
+async def main() -> None:
+    """Parse arguments and compare both variants."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--callers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=50, help="ms per request")
+    parser.add_argument("--spread", type=float, default=300, help="ms")
+    args = parser.parse_args()
+
+    for shared in (False, True):
+        await run(args.bursts, args.callers, args.latency, args.spread, shared)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
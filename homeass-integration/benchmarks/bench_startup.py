@@ -0,0 +1,164 @@
+"""Setup time per config entry when Home Assistant starts with many MADA controllers.
+
+All entries are set up at once like during HA startup and share the fleet
+semaphore. Compared strategies of async_setup_entry:
+
+- sequential: first refresh, then /mada, then platforms (before V2.6)
+- concurrent: first refresh on the device transport and /mada on the shared
+  session at the same time (no cached metadata)
+- cached:     entities from cached metadata right away, first refresh in the
+  background (start without snapshot)
+- snapshot:   entities with the status saved before the restart, first
+  refreshes staggered by the fleet scheduler over one interval (regular start)
+
+"setup" is the time until the platforms could be forwarded, "data" the
+time until entities had values, "live" until the first polled status.
+"burst" counts the polls started within the first second.
+
+Usage: python benchmarks/bench_startup.py [--entries 50] [--latency 50 --jitter 20] [--interval 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import statistics
+import time
+from datetime import timedelta
+
+import aiohttp
+
+from _common import SAMPLE_ENTITIES, SAMPLE_STATUS, load_component_module
+from simulator import DeviceSimulator, add_profile_arguments, profile_from_args
+
+change_filter = load_component_module("change_filter")
+fleet_module = load_component_module("fleet")
+resolver = load_component_module("resolver")
+transport_module = load_component_module("transport")
+
+# Metadaten-Cache: /mada Entities nach id
+CACHED_ENTITIES = {entity["id"]: entity for entity in SAMPLE_ENTITIES}
+# Status-Snapshot vom letzten Lauf
+SNAPSHOT = copy.deepcopy(SAMPLE_STATUS)
+
+
+class Entry:
+    """One config entry during setup."""
+
+    def __init__(self, host: str, fleet, shared: aiohttp.ClientSession) -> None:
+        self.host = host
+        self.fleet = fleet
+        self.shared = shared
+        self.transport = transport_module.MadaTransport()
+        self.data = None
+        self.watches: list = []
+        self.setup_time = 0.0
+        self.data_time = 0.0
+        self.live_time = 0.0
+        self.poll_started = 0.0
+        self.start = 0.0
+        self.live = asyncio.Event()
+        # Fuer den Fleet-Scheduler: nach dem ersten Poll nicht erneut
+        self.poll_interval = timedelta(hours=1)
+
+    async def _get(self, session: aiohttp.ClientSession, path: str) -> dict:
+        async with self.fleet.semaphore:
+            async with session.get(f"http://{self.host}{path}") as response:
+                return await response.json()
+
+    async def refresh(self, start: float) -> None:
+        self.poll_started = time.perf_counter() - start
+        self.data = await self._get(self.transport.session, "/rpc/mada.GetStatus")
+        self.live_time = time.perf_counter() - start
+        if not self.data_time:
+            self.data_time = self.live_time
+        self.live.set()
+
+    async def async_refresh(self) -> None:
+        await self.refresh(self.start)
+
+    def create_entities(self, entities: dict, start: float) -> None:
+        # Wie die Plattformen: data_path kompilieren, ValueWatch pro Entity
+        for entity_id, metadata in entities.items():
+            resolve = resolver.compile_data_path(entity_id, metadata.get("data_path"))
+            self.watches.append(
+                change_filter.ValueWatch(resolve, change_filter.parse_deadband(metadata.get("deadband")))
+            )
+        self.setup_time = time.perf_counter() - start
+
+    async def setup(self, strategy: str, start: float) -> None:
+        if strategy == "sequential":
+            await self.refresh(start)
+            info = await self._get(self.transport.session, "/mada")
+            entities = {entity["id"]: entity for entity in info["entities"]}
+        elif strategy == "concurrent":
+            _, info = await asyncio.gather(self.refresh(start), self._get(self.shared, "/mada"))
+            entities = {entity["id"]: entity for entity in info["entities"]}
+        elif strategy == "snapshot":
+            entities = CACHED_ENTITIES
+            self.data = SNAPSHOT
+            self.start = start
+        else:
+            entities = CACHED_ENTITIES
+            self._first = asyncio.create_task(self.refresh(start))
+
+        self.create_entities(entities, start)
+        if strategy == "cached":
+            await self._first
+        elif strategy == "snapshot":
+            self.data_time = self.setup_time
+            # Wie die Integration: nach Snapshot-Restore noch kein Live-Poll
+            self.fleet.register(self, polled=False)
+            await self.live.wait()
+
+
+def _summary(values: list[float]) -> str:
+    cuts = statistics.quantiles(values, n=100) if len(values) > 1 else values * 99
+    return f"p50={cuts[49] * 1000:7.1f} ms p95={cuts[94] * 1000:7.1f} ms max={max(values) * 1000:7.1f} ms"
+
+
+async def run(simulator: DeviceSimulator, strategy: str, interval: float) -> None:
+    """Set up one entry per simulated device and report the timings."""
+    fleet = fleet_module.MadaFleetScheduler(timedelta(seconds=interval))
+    scheduler = asyncio.create_task(fleet.async_run())
+    async with aiohttp.ClientSession() as shared:
+        entries = [Entry(host, fleet, shared) for host in simulator.hosts]
+        start = time.perf_counter()
+        await asyncio.gather(*(entry.setup(strategy, start) for entry in entries))
+        for entry in entries:
+            await entry.transport.async_close()
+    scheduler.cancel()
+
+    burst = sum(entry.poll_started < 1.0 for entry in entries)
+    print(
+        f"{strategy:10} setup {_summary([entry.setup_time for entry in entries])}\n"
+        f"{'':10} data  {_summary([entry.data_time for entry in entries])}\n"
+        f"{'':10} live  {_summary([entry.live_time for entry in entries])} burst={burst}"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    simulator = DeviceSimulator(args.entries, profile=profile_from_args(args))
+    await simulator.start()
+    types = sorted({entity["type"] for entity in SAMPLE_ENTITIES})
+    print(f"{args.entries} entries, platforms forwarded per entry: {', '.join(types)}\n")
+    try:
+        for strategy in ("sequential", "concurrent", "cached", "snapshot"):
+            await run(simulator, strategy, args.interval)
+    finally:
+        await simulator.stop()
+
+
+def main() -> None:
+    """Parse arguments and run all strategies."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=10, help="poll interval in s")
+    add_profile_arguments(parser)
+    parser.set_defaults(latency=50, jitter=20)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Recorder rows and database size per device-day, state history vs external statistics.
+
+One controller is polled every --interval seconds for --days days; the
+measurement sensors of SAMPLE_ENTITIES follow noisy daily curves. Rows
+are counted the way the recorder would write them and inserted into an
+SQLite database with the columns and indexes of the Home Assistant
+schema (states, statistics, statistics_short_term):
+
+- states:   a state row whenever a sensor writes (deadband of the
+            metadata), the recorder compiles 5-minute and hourly
+            statistics for every sensor with state_class
+- external: sensors write at most every STATE_WRITE_INTERVAL and have no
+            state_class, the integration imports one hourly row per
+            sensor via longterm.py
+
+Also checked: the imported hourly means against the mean of the raw
+samples of that hour.
+
+Usage: python benchmarks/bench_statistics.py [--days 7] [--interval 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import math
+import os
+import random
+import sqlite3
+import tempfile
+
+from _common import SAMPLE_ENTITIES, SAMPLE_STATUS, load_component_module
+
+change_filter = load_component_module("change_filter")
+longterm_module = load_component_module("longterm")
+resolver = load_component_module("resolver")
+
+DAY = 86400
+SHORT_TERM_PERIOD = 300
+
+SCHEMA = """
+CREATE TABLE states (
+    state_id INTEGER PRIMARY KEY, state VARCHAR(255), last_changed_ts FLOAT,
+    last_reported_ts FLOAT, last_updated_ts FLOAT, old_state_id INTEGER,
+    attributes_id INTEGER, origin_idx SMALLINT, context_id_bin BLOB, metadata_id INTEGER
+);
+CREATE INDEX ix_states_metadata_id_last_updated_ts ON states (metadata_id, last_updated_ts);
+CREATE INDEX ix_states_last_updated_ts ON states (last_updated_ts);
+CREATE INDEX ix_states_context_id_bin ON states (context_id_bin);
+CREATE INDEX ix_states_old_state_id ON states (old_state_id);
+"""
+STATISTICS_SCHEMA = """
+CREATE TABLE {table} (
+    id INTEGER PRIMARY KEY, created_ts FLOAT, metadata_id INTEGER, start_ts FLOAT,
+    mean FLOAT, min FLOAT, max FLOAT, last_reset_ts FLOAT, state FLOAT, sum FLOAT
+);
+CREATE UNIQUE INDEX ix_{table}_statistic_id_start_ts ON {table} (metadata_id, start_ts);
+CREATE INDEX ix_{table}_start_ts ON {table} (start_ts);
+"""
+
+
+def reading(rng: random.Random, now: float) -> dict:
+    """Return a status with daily curves and sensor noise."""
+    phase = math.sin(2 * math.pi * ((now % DAY) / DAY - 0.25))
+    daylight = max(0.0, phase)
+    status = copy.deepcopy(SAMPLE_STATUS)
+    status["soil"]["moisture"] = round(45 - 10 * (now % (3 * DAY)) / (3 * DAY) + rng.gauss(0, 0.4))
+    status["soil"]["salt"] = round(310 + rng.gauss(0, 6))
+    status["battery"]["percent"] = round(79 - now / DAY + rng.gauss(0, 0.3))
+    status["temperature"]["value"] = round(19 + 5 * phase + rng.gauss(0, 0.1), 1)
+    status["humidity"]["value"] = round(60 - 12 * phase + rng.gauss(0, 0.3), 1)
+    status["light"]["lux"] = round(20000 * daylight * rng.uniform(0.8, 1.0) + rng.uniform(0, 3), 1)
+    return status
+
+
+def simulate(mode: str, days: float, interval: float, seed: int) -> dict:
+    """Return the rows the recorder writes in one mode."""
+    rng = random.Random(seed)
+    sensors = {
+        entity["id"]: entity
+        for entity in SAMPLE_ENTITIES
+        if entity["type"] == "sensor" and entity.get("state_class") == "measurement"
+    }
+    resolvers = {
+        entity_id: resolver.compile_data_path(entity_id, entity["data_path"])
+        for entity_id, entity in sensors.items()
+    }
+    watches = {
+        entity_id: change_filter.ValueWatch(
+            resolvers[entity_id], change_filter.parse_deadband(entity.get("deadband"))
+        )
+        for entity_id, entity in sensors.items()
+    }
+    statistics = longterm_module.LongTermStatistics("entry", "MADA")
+    statistics.add_channels(sensors)
+
+    rows = {"states": [], "statistics": [], "statistics_short_term": []}
+    samples: dict[tuple[str, float], list[float]] = {}
+    hourly_error = 0.0
+    end = days * DAY
+    now = 0.0
+    while now < end:
+        data = reading(rng, now)
+        throttle = False
+        if mode == "external":
+            statistics.add(now, data)
+            throttle = not statistics.window_open
+        for index, (entity_id, watch) in enumerate(watches.items()):
+            value = resolvers[entity_id](data)
+            samples.setdefault((entity_id, now - now % 3600), []).append(value)
+            if not throttle and watch.changed(data, True):
+                rows["states"].append((index, value, now))
+        if mode == "external":
+            for object_id, (_, _, hours) in statistics.pop_rows().items():
+                entity_id = object_id.removeprefix("entry_")
+                index = list(sensors).index(entity_id)
+                for start, mean, low, high in hours:
+                    rows["statistics"].append((index, start, mean, low, high))
+                    values = samples[entity_id, start]
+                    reference = sum(values) / len(values)
+                    scale = max(abs(reference), 1.0)
+                    hourly_error = max(hourly_error, abs(mean - reference) / scale)
+        now += interval
+
+    if mode == "states":
+        # Recorder: 5-Minuten- und Stundenstatistik fuer jeden Sensor mit state_class
+        for (entity_id, start), values in samples.items():
+            index = list(sensors).index(entity_id)
+            mean = sum(values) / len(values)
+            rows["statistics"].append((index, start, mean, min(values), max(values)))
+            for short in range(int(start), int(start) + 3600, SHORT_TERM_PERIOD):
+                rows["statistics_short_term"].append((index, short, mean, min(values), max(values)))
+    rows["hourly_error"] = hourly_error
+    return rows
+
+
+def database_size(rows: dict) -> int:
+    """Insert the rows into a fresh SQLite database and return its size in bytes."""
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    try:
+        connection = sqlite3.connect(path)
+        connection.executescript(SCHEMA)
+        for table in ("statistics", "statistics_short_term"):
+            connection.executescript(STATISTICS_SCHEMA.format(table=table))
+        last: dict[int, int] = {}
+        for state_id, (metadata_id, value, now) in enumerate(rows["states"], 1):
+            connection.execute(
+                "INSERT INTO states VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (state_id, str(value), now, None, now, last.get(metadata_id), 1, 0,
+                 os.urandom(16), metadata_id),
+            )
+            last[metadata_id] = state_id
+        for table in ("statistics", "statistics_short_term"):
+            connection.executemany(
+                f"INSERT INTO {table} (created_ts, metadata_id, start_ts, mean, min, max) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(start + 3600, index, start, mean, low, high) for index, start, mean, low, high in rows[table]],
+            )
+        connection.commit()
+        connection.execute("VACUUM")
+        connection.close()
+        return os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+
+def main() -> None:
+    """Parse arguments and compare both modes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--interval", type=float, default=30, help="poll interval in s")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.days:g} device-days, poll every {args.interval:g} s, per device-day:")
+    for mode in ("states", "external"):
+        rows = simulate(mode, args.days, args.interval, args.seed)
+        size = database_size(rows)
+        counts = {table: len(rows[table]) / args.days for table in ("states", "statistics", "statistics_short_term")}
+        total = sum(counts.values())
+        print(
+            f"{mode:9} rows={total:7.0f} (states={counts['states']:.0f} "
+            f"statistics={counts['statistics']:.0f} short_term={counts['statistics_short_term']:.0f}) "
+            f"db={size / args.days / 1024:7.1f} KiB"
+            + (f" hourly mean error max={rows['hourly_error'] * 100:.2f} %" if mode == "external" else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Subnet sweep against stand-in controllers on loopback addresses.
+
+The simulator binds every device to its own address of 127.0.0.0/8 on one
+port (127.0.0.1, 127.0.0.2, ...); the sweep probes a whole /22 around
+them like the config flow does. Part of the devices count as already
+configured (known MACs) and must be skipped.
+
+Free loopback addresses refuse the connection at once; in a real LAN an
+unused address costs up to the connect timeout, the worst case for that
+is printed as an estimate.
+
+Usage: python benchmarks/bench_sweep.py [--devices 40] [--network 127.0.0.0/22] [--known 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import time
+
+from _common import load_component_module
+from simulator import DeviceSimulator, add_profile_arguments, profile_from_args
+
+sweep = load_component_module("sweep")
+
+PORT = 18080
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    simulator = DeviceSimulator(
+        args.devices,
+        base_port=PORT,
+        profile=profile_from_args(args),
+        spread=True,
+    )
+    await simulator.start()
+    known = {device.mac for device in simulator.devices[: args.known]}
+    try:
+        start = time.perf_counter()
+        found = await sweep.async_sweep(args.network, PORT, known, args.concurrency)
+        elapsed = time.perf_counter() - start
+    finally:
+        await simulator.stop()
+
+    hosts = len(sweep.sweep_hosts(args.network, PORT))
+    expected = {device.mac for device in simulator.devices} - known
+    probed = sum(device.requests["/mada"] for device in simulator.devices)
+    worst = math.ceil(hosts / args.concurrency) * sweep.CONNECT_TIMEOUT
+
+    print(
+        f"{hosts} addresses, {args.devices} devices ({args.known} configured), "
+        f"concurrency {args.concurrency}\n"
+        f"found {len(found)} new controllers in {elapsed:.2f} s "
+        f"({hosts / elapsed:.0f} addresses/s), /mada requests {probed}\n"
+        f"correct: {({info['mac'] for info in found} == expected)}\n"
+        f"worst case in a LAN (all other addresses silent): ~{worst:.0f} s"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the sweep."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=40)
+    parser.add_argument("--network", default="127.0.0.0/22")
+    parser.add_argument("--known", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=sweep.SWEEP_CONCURRENCY)
+    add_profile_arguments(parser)
+    parser.set_defaults(latency=50, jitter=20)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
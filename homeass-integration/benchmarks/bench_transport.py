@@ -0,0 +1,88 @@
+"""Shared client session vs. the dedicated per-device transport.
+
+Polls one stand-in device while command bursts run in parallel, once
+through a plain aiohttp session (like the shared Home Assistant session)
+and once through MadaTransport. Prints how many TCP connections the
+device had to accept and the transport metrics.
+
+Usage: python benchmarks/bench_transport.py [--rounds 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import time
+
+import aiohttp
+
+from _common import load_component_module
+from simulator import DeviceSimulator
+
+transport_module = load_component_module("transport")
+
+
+async def _traffic(session: aiohttp.ClientSession, host: str, rounds: int, transport=None) -> float:
+    """Interleave status polls with short command bursts, return elapsed seconds."""
+
+    def connection():
+        # Wie der Coordinator: jeder Request belegt die Geraeteverbindung
+        return transport.connection() if transport is not None else contextlib.nullcontext()
+
+    async def poll():
+        async with connection(), session.get(f"http://{host}/rpc/mada.GetStatus") as response:
+            await response.json()
+
+    async def command(pwm):
+        async with connection(), session.post(
+            f"http://{host}/rpc/Pump.SetPWM", json={"pwm": pwm}
+        ) as response:
+            await response.read()
+
+    start = time.perf_counter()
+    for step in range(rounds):
+        await asyncio.gather(poll(), command(step % 101), command((step + 1) % 101))
+        await asyncio.sleep(0.005)
+    return time.perf_counter() - start
+
+
+async def run(rounds: int) -> None:
+    """Run both variants against fresh simulators."""
+    for label in ("shared session", "MadaTransport"):
+        simulator = DeviceSimulator(1)
+        await simulator.start()
+        device = simulator.devices[0]
+
+        if label == "MadaTransport":
+            transport = transport_module.MadaTransport()
+            session = transport.session
+        else:
+            transport = None
+            session = aiohttp.ClientSession()
+
+        elapsed = await _traffic(session, simulator.hosts[0], rounds, transport)
+        await session.close()
+        await simulator.stop()
+
+        print(f"{label}:")
+        print(f"  requests:           {sum(device.requests.values())}")
+        print(f"  device connections: {len(device.connections)}")
+        print(f"  elapsed:            {elapsed:.2f} s")
+        if transport is not None:
+            print(f"  stats:              {transport.stats}")
+            print(f"  reuse ratio:        {transport.reuse_ratio:.1%}")
+            print(f"  handshake (mean):   {transport.handshake_time * 1000:.2f} ms")
+            print(f"  queue wait (mean):  {transport.queue_time * 1000:.2f} ms")
+            assert len(device.connections) == transport.stats["connections"]
+
+
+def main() -> None:
+    """Parse arguments and run."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=50)
+    asyncio.run(run(parser.parse_args().rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Replay days of irrigation against simulated controllers on a virtual clock.
+
+Every simulated device gets a soil model: moisture drops at a per-zone
+rate (sun, drainage) and rises while its pump runs. The real
+IrrigationScheduler plans on the virtual clock; its commands are applied
+to the devices like one mada.Batch per controller and tick. Readings
+reach the scheduler with the poll interval, so decisions are based on
+data that is up to one interval old - as in Home Assistant.
+
+Compared: the global pump limit vs. an unlimited scheduler (what
+independent per-zone automations do).
+
+Usage: python benchmarks/sim_irrigation.py [--zones 20] [--limit 2] [--days 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from _common import load_component_module
+from simulator import SimulatedDevice
+
+irrigation = load_component_module("irrigation")
+
+STEP = 10  # Sekunden Bodenmodell
+POLL_INTERVAL = 60
+TICK = int(irrigation.SCHEDULE_INTERVAL.total_seconds())
+WET_RATE = 1.5 / 60  # % pro Sekunde bei laufender Pumpe
+
+
+class Zone:
+    """Simulated controller with soil model."""
+
+    def __init__(self, index: int, rng: random.Random) -> None:
+        self.device = SimulatedDevice(index)
+        self.device.status["soil"]["moisture"] = rng.uniform(25, 50)
+        # 3-12 % pro Tag Austrocknung
+        self.dry_rate = rng.uniform(3, 12) / 86400
+        self.dry_seconds = 0
+
+    @property
+    def status(self) -> dict:
+        return self.device.status
+
+    def step(self, seconds: float, moisture_min: float) -> None:
+        soil = self.status["soil"]
+        rate = WET_RATE if self.status["pump"]["running"] else -self.dry_rate
+        soil["moisture"] = max(0.0, min(100.0, soil["moisture"] + rate * seconds))
+        if soil["moisture"] < moisture_min:
+            self.dry_seconds += seconds
+
+
+def run(zones_count: int, limit: int, days: float, seed: int) -> None:
+    """Simulate one configuration and print its results."""
+    rng = random.Random(seed)
+    zones = [Zone(index, rng) for index in range(zones_count)]
+    scheduler = irrigation.IrrigationScheduler(max_running=limit)
+
+    # Befehle eines Takts pro Controller sammeln -> ein Batch
+    pending: dict[int, list[bool]] = defaultdict(list)
+    for zone in zones:
+        scheduler.add_zone(
+            str(zone.device.index),
+            irrigation.IrrigationZone(
+                f"zone {zone.device.index}",
+                lambda on, index=zone.device.index: pending[index].append(on),
+            ),
+        )
+
+    batches = commands = peak = 0
+    running_seconds = 0
+    wall = time.perf_counter()
+    for now in range(0, int(days * 86400), STEP):
+        if now % POLL_INTERVAL == 0:
+            for zone in zones:
+                scheduler.zones[str(zone.device.index)].update(zone.status, now)
+
+        if now % TICK == 0:
+            scheduler.tick(now)
+            for index, calls in pending.items():
+                batches += 1
+                commands += len(calls)
+                zones[index].status["pump"]["running"] = calls[-1]
+            pending.clear()
+
+        running = sum(zone.status["pump"]["running"] for zone in zones)
+        peak = max(peak, running)
+        running_seconds += running * STEP
+        for zone in zones:
+            zone.step(STEP, irrigation.DEFAULT_MOISTURE_MIN)
+    wall = time.perf_counter() - wall
+
+    dry_share = [zone.dry_seconds / (days * 86400) for zone in zones]
+    starts = sum(zone.stats["starts"] for zone in scheduler.zones.values())
+    label = f"limit {limit}" if limit < zones_count else "unlimited"
+    print(
+        f"{label:10} peak pumps={peak:3d} pump hours={running_seconds / 3600:7.1f} "
+        f"starts={starts:5d} deferred={scheduler.stats['deferred']:6d} "
+        f"batches={batches:5d} commands={commands:5d}\n"
+        f"{'':10} time below {irrigation.DEFAULT_MOISTURE_MIN} %: "
+        f"mean {statistics.mean(dry_share):6.2%} max {max(dry_share):6.2%} "
+        f"| {days:g} virtual days in {wall:.2f} s"
+    )
+
+
+def main() -> None:
+    """Parse arguments and compare limited and unlimited scheduling."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--zones", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=irrigation.MAX_RUNNING_ZONES)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.zones} zones, tick {TICK} s, poll {POLL_INTERVAL} s\n")
+    for limit in (args.limit, args.zones):
+        run(args.zones, limit, args.days, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Polls and waterings with and without the moisture trend, on a virtual clock.
+
+Every zone dries at its own rate (3-12 % per day), gets occasional rain
+showers and reports integer readings with sensor noise, like the
+firmware. The real AdaptivePollInterval decides when each zone is polled
+next, the real IrrigationScheduler (without pump limit) waters zones below
+the threshold.
+
+- adaptive:   poll interval from pump state and moisture change only
+- prediction: MoistureTrend feeds the predicted time until the threshold
+              into the interval and blocks starts while the soil gets wetter
+
+Reported: polls per zone and day, delay between the real threshold
+crossing and the first poll that sees it, waterings, and the error of
+predictions made 6-24 h ahead.
+
+Usage: python benchmarks/sim_prediction.py [--zones 20] [--days 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from _common import SAMPLE_STATUS, load_component_module
+
+irrigation = load_component_module("irrigation")
+polling = load_component_module("polling")
+prediction = load_component_module("prediction")
+
+STEP = 5  # Sekunden Bodenmodell
+BASE_INTERVAL = timedelta(seconds=30)  # SCAN_INTERVAL der Integration
+TICK = int(irrigation.SCHEDULE_INTERVAL.total_seconds())
+WET_RATE = 1.5 / 60  # % pro Sekunde bei laufender Pumpe
+RAIN_CHANCE = 0.3  # pro Zone und Tag
+RAIN_RATE = 2.0 / 3600  # % pro Sekunde
+RAIN_DURATION = 3 * 3600
+NOISE = 0.4  # Standardabweichung des Sensors (%)
+THRESHOLD = irrigation.DEFAULT_MOISTURE_MIN
+
+
+class Zone:
+    """Simulated controller with soil model and its integration state."""
+
+    def __init__(self, index: int, rng: random.Random, use_prediction: bool) -> None:
+        self.rng = rng
+        self.moisture = rng.uniform(35, 50)
+        self.dry_rate = rng.uniform(3, 12) / 86400
+        self.rain_until = -1.0
+        self.pump = False
+        self.status = {"soil": dict(SAMPLE_STATUS["soil"]), "pump": {"running": False}}
+        self.adaptive = polling.AdaptivePollInterval(BASE_INTERVAL)
+        self.trend = prediction.MoistureTrend() if use_prediction else None
+        self.next_poll = 0.0
+        self.polls = 0
+        # Echte Unterschreitung der Schwelle, noch nicht per Poll gesehen
+        self.crossed: float | None = None
+        self.lags: list[float] = []
+        # (Zeitpunkt der Vorhersage, vorhergesagte Unterschreitung)
+        self.forecasts: list[tuple[float, float]] = []
+        self.errors: list[float] = []
+
+    def step(self, now: float, seconds: float) -> None:
+        """Advance the soil model."""
+        if self.rng.random() < RAIN_CHANCE * seconds / 86400:
+            self.rain_until = now + RAIN_DURATION
+        rate = -self.dry_rate
+        if self.pump:
+            rate = WET_RATE
+        elif now < self.rain_until:
+            rate = RAIN_RATE
+        before = self.moisture
+        self.moisture = max(0.0, min(100.0, self.moisture + rate * seconds))
+        if before >= THRESHOLD > self.moisture:
+            self.crossed = now
+            # Vorhersagen fuer genau diese Unterschreitung auswerten
+            self.errors.extend(abs(predicted - now) for made, predicted in self.forecasts)
+            self.forecasts.clear()
+        elif self.moisture > before:
+            # Regen/Giessen: offene Vorhersagen gelten nicht mehr
+            self.forecasts.clear()
+
+    def poll(self, now: float, zone: irrigation.IrrigationZone) -> None:
+        """Read the sensor like a GetStatus poll."""
+        self.polls += 1
+        self.status["soil"]["moisture"] = round(self.moisture + self.rng.gauss(0, NOISE))
+        self.status["pump"]["running"] = self.pump
+
+        horizon = None
+        rising = False
+        if self.trend is not None:
+            self.trend.update(self.status, now)
+            horizon = self.trend.time_to(THRESHOLD, now)
+            rising = self.trend.rising
+            if horizon is not None and 6 * 3600 <= horizon <= 24 * 3600:
+                self.forecasts.append((now, now + horizon))
+
+        interval = self.adaptive.update(self.status, now, horizon)
+        self.next_poll = now + interval.total_seconds()
+        zone.update(self.status, now, rising)
+
+        if self.crossed is not None and self.status["soil"]["moisture"] < THRESHOLD:
+            self.lags.append(now - self.crossed)
+            self.crossed = None
+
+
+def run(zones_count: int, days: float, seed: int, use_prediction: bool) -> dict:
+    """Simulate one variant and return its results."""
+    rng = random.Random(seed)
+    zones = [Zone(index, rng, use_prediction) for index in range(zones_count)]
+    scheduler = irrigation.IrrigationScheduler(max_running=zones_count)
+    for index, zone in enumerate(zones):
+
+        def send(on: bool, zone: Zone = zone) -> None:
+            zone.pump = on
+
+        scheduler.add_zone(str(index), irrigation.IrrigationZone(f"zone {index}", send))
+
+    wall = time.perf_counter()
+    for now in range(0, int(days * 86400), STEP):
+        for index, zone in enumerate(zones):
+            if now >= zone.next_poll:
+                zone.poll(now, scheduler.zones[str(index)])
+        if now % TICK == 0:
+            scheduler.tick(now)
+        for zone in zones:
+            zone.step(now, STEP)
+    wall = time.perf_counter() - wall
+
+    lags = [lag for zone in zones for lag in zone.lags]
+    errors = [error for zone in zones for error in zone.errors]
+    return {
+        "polls": sum(zone.polls for zone in zones) / zones_count / days,
+        "lag_p50": statistics.median(lags) if lags else 0.0,
+        "lag_max": max(lags, default=0.0),
+        "starts": sum(zone.stats["starts"] for zone in scheduler.zones.values()),
+        "error_p50": statistics.median(errors) / 3600 if errors else None,
+        "wall": wall,
+    }
+
+
+def main() -> None:
+    """Parse arguments and compare both variants."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--zones", type=int, default=20)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.zones} zones, {args.days:g} virtual days, threshold {THRESHOLD} %\n")
+    results = {}
+    for use_prediction in (False, True):
+        result = results[use_prediction] = run(args.zones, args.days, args.seed, use_prediction)
+        label = "prediction" if use_prediction else "adaptive"
+        error = (
+            f"{result['error_p50']:.1f} h"
+            if result["error_p50"] is not None
+            else "-"
+        )
+        print(
+            f"{label:10} polls/zone/day={result['polls']:7.0f} "
+            f"detection lag p50={result['lag_p50']:5.0f} s max={result['lag_max']:5.0f} s "
+            f"waterings={result['starts']:4d} forecast error p50={error} "
+            f"({result['wall']:.1f} s)"
+        )
+
+    print(f"\npolls saved: {1 - results[True]['polls'] / results[False]['polls']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Local stand-in for HiGrow controllers.
+
+Every simulated device listens on its own loopback port and serves /mada
+and the JSON-RPC endpoints of the firmware. Latency, jitter, error rate
+and payload size are configurable. Usable as a library from the
+benchmark scripts or standalone, e.g. to add simulated devices to a
+Home Assistant dev instance by host:port:
+
+    python benchmarks/simulator.py --devices 10 --base-port 18000 --latency 40 --jitter 20
+
+With --spread every device gets its own loopback address on the same
+port (127.0.0.1, 127.0.0.2, ...), e.g. for a subnet sweep of 127.0.0.0/24.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import ipaddress
+import json
+import random
+import socket
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+
+from aiohttp import web
+
+from _common import SAMPLE_ENTITIES, SAMPLE_STATUS
+
+FIRMWARE_VERSION = "1.6-sim"
+
+
+@dataclass
+class DeviceProfile:
+    """Network behaviour of the simulated devices."""
+
+    latency: float = 0.0  # Sekunden pro Request
+    jitter: float = 0.0  # +/- Sekunden, gleichverteilt
+    error_rate: float = 0.0  # Anteil der Requests mit HTTP 500
+    payload_size: int = 0  # GetStatus wird auf mindestens so viele Bytes aufgefuellt
+
+
+class SimulatedDevice:
+    """State of one simulated HiGrow controller."""
+
+    def __init__(self, index: int) -> None:
+        """Initialize the device."""
+        self.index = index
+        self.status = copy.deepcopy(SAMPLE_STATUS)
+        self.status["soil"]["moisture"] = 30 + index % 40
+        self.mac = f"5A:00:00:00:{index >> 8 & 0xFF:02X}:{index & 0xFF:02X}"
+        self.requests: Counter[str] = Counter()
+        # Client-Ports der Verbindungen, die das Geraet gesehen hat
+        self.connections: set[int] = set()
+
+    def get_status(self) -> dict:
+        """Return the current status, drifting like a real sensor."""
+        soil = self.status["soil"]
+        soil["moisture"] = max(0, min(100, soil["moisture"] + random.choice((-1, 0, 0, 1))))
+        self.status["system"]["uptime"] += 1
+        return self.status
+
+    def get_info(self) -> dict:
+        """Return the /mada device info with entity definitions."""
+        return {
+            "name": f"HiGrow Sim {self.index}",
+            "model": "LilyGo-HiGrow",
+            "version": FIRMWARE_VERSION,
+            "mac": self.mac,
+            "id": f"higrow_sim_{self.index}",
+            "type": "irrigation_controller",
+            "hostname": f"higrow-sim-{self.index}.local",
+            "batch": True,
+            "entities": SAMPLE_ENTITIES,
+        }
+
+
+class DeviceSimulator:
+    """Serve many simulated devices from one aiohttp application."""
+
+    def __init__(
+        self,
+        devices: int,
+        host: str = "127.0.0.1",
+        base_port: int = 0,
+        profile: DeviceProfile | None = None,
+        spread: bool = False,
+    ) -> None:
+        """Initialize the simulator.
+
+        spread binds device n to host + n on base_port instead of host on
+        base_port + n (loopback addresses as a small network).
+        """
+        self.host = host
+        self.base_port = base_port
+        self.spread = spread
+        self.profile = profile or DeviceProfile()
+        self.devices = [SimulatedDevice(index) for index in range(devices)]
+        self.hosts: list[str] = []
+        # (Adresse, Port) des Listen-Sockets -> Geraet
+        self._by_socket: dict[tuple[str, int], SimulatedDevice] = {}
+        self._runner: web.AppRunner | None = None
+
+        self.app = web.Application(middlewares=[self._network])
+        self.app.router.add_get("/mada", self._handle_info)
+        self.app.router.add_get("/rpc/mada.GetStatus", self._handle_get_status)
+        self.app.router.add_post("/rpc/Pump.Set", self._handle_pump_set)
+        self.app.router.add_post("/rpc/Pump.SetPWM", self._handle_pump_set_pwm)
+        self.app.router.add_post("/rpc/mada.Batch", self._handle_batch)
+
+    def device_for(self, request: web.Request) -> SimulatedDevice:
+        """Map a request to its device by the local address and count it."""
+        device = self._by_socket[request.transport.get_extra_info("sockname")[:2]]
+        device.requests[request.path] += 1
+        device.connections.add(request.transport.get_extra_info("peername")[1])
+        return device
+
+    @web.middleware
+    async def _network(self, request: web.Request, handler) -> web.StreamResponse:
+        """Apply latency, jitter and injected errors of the profile."""
+        profile = self.profile
+        delay = profile.latency + random.uniform(-profile.jitter, profile.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if profile.error_rate and random.random() < profile.error_rate:
+            self.device_for(request)
+            return web.json_response({"error": "Simulated failure"}, status=500)
+        return await handler(request)
+
+    async def _handle_info(self, request: web.Request) -> web.Response:
+        body = json.dumps(self.device_for(request).get_info())
+        # Wie die Firmware: ETag ueber das ganze Dokument
+        etag = f'"{zlib.crc32(body.encode()):08x}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=body, content_type="application/json", headers={"ETag": etag})
+
+    async def _handle_get_status(self, request: web.Request) -> web.Response:
+        status = self.device_for(request).get_status()
+        if self.profile.payload_size:
+            body = json.dumps(status)
+            missing = self.profile.payload_size - len(body)
+            if missing > 0:
+                # Unbekannte Keys ignoriert die Integration
+                body = body[:-1] + f', "padding": "{"x" * max(missing - 15, 0)}"}}'
+            return web.Response(text=body, content_type="application/json")
+        return web.json_response(status)
+
+    async def _handle_pump_set(self, request: web.Request) -> web.Response:
+        device = self.device_for(request)
+        body = await request.json()
+        if not isinstance(body.get("on"), bool):
+            return web.json_response({"error": "Missing 'on' parameter"}, status=400)
+        device.status["pump"]["running"] = body["on"]
+        device.status["pump"]["pwm_active"] = device.status["pump"]["pwm_target"] if body["on"] else 0
+        return web.json_response({"success": True, "running": body["on"]})
+
+    async def _handle_pump_set_pwm(self, request: web.Request) -> web.Response:
+        device = self.device_for(request)
+        body = await request.json()
+        pwm = body.get("pwm")
+        if not isinstance(pwm, int) or not 0 <= pwm <= 100:
+            return web.json_response({"error": "PWM must be 0-100"}, status=400)
+        device.status["pump"]["pwm_target"] = pwm
+        return web.json_response({"success": True, "pwm": pwm})
+
+    async def _handle_batch(self, request: web.Request) -> web.Response:
+        device = self.device_for(request)
+        body = await request.json()
+        results = []
+        for call in body.get("calls", []):
+            method = call.get("method")
+            params = call.get("params", {})
+            if method == "Pump.Set":
+                device.status["pump"]["running"] = bool(params.get("on"))
+                results.append({"success": True})
+            elif method == "Pump.SetPWM":
+                device.status["pump"]["pwm_target"] = params.get("pwm", 0)
+                results.append({"success": True})
+            elif method == "mada.GetStatus":
+                results.append(device.get_status())
+            else:
+                results.append({"error": "Unknown method"})
+        return web.json_response({"results": results})
+
+    async def start(self) -> None:
+        """Bind one listening socket per device."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+
+        for device in self.devices:
+            if self.spread:
+                host = str(ipaddress.ip_address(self.host) + device.index)
+                port = self.base_port
+            else:
+                host = self.host
+                port = self.base_port + device.index if self.base_port else 0
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((host, port))
+            bound = sock.getsockname()[1]
+            await web.SockSite(self._runner, sock).start()
+            self._by_socket[(host, bound)] = device
+            self.hosts.append(f"{host}:{bound}")
+
+    async def stop(self) -> None:
+        """Close all sockets."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def profile_from_args(args: argparse.Namespace) -> DeviceProfile:
+    """Build a profile from --latency/--jitter (ms), --error-rate and --payload-size."""
+    return DeviceProfile(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        payload_size=args.payload_size,
+    )
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the profile options to a command line parser."""
+    parser.add_argument("--latency", type=float, default=0.0, help="ms per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 500")
+    parser.add_argument("--payload-size", type=int, default=0, help="min. GetStatus bytes")
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    simulator = DeviceSimulator(
+        args.devices,
+        host=args.host,
+        base_port=args.base_port,
+        profile=profile_from_args(args),
+        spread=args.spread,
+    )
+    await simulator.start()
+    print("\n".join(simulator.hosts))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=18000)
+    parser.add_argument("--spread", action="store_true", help="one loopback address per device")
+    add_profile_arguments(parser)
+    asyncio.run(_serve(parser.parse_args()))
@@ -1,127 +1,1050 @@
 """HiGrow Irrigation System Integration."""
+# V3.8 Nach Snapshot-Restore kein Warten auf ein volles Intervall bis zum ersten Live-Poll
+# V3.7 Offener Breaker: Befehle und angeforderte Refreshes schlagen sofort fehl statt im Timeout
+# V3.6 Kompakter Status entfernt - Dekodieren war nicht schneller als JSON
+# V3.5 Transport-Session per async_on_unload/HA-Ende geschlossen, Geraeteverbindung vor dem Fleet-Slot
+# V3.4 Optionale externe Langzeitstatistik: Stundenwerte in Bloecken statt State-Zeilen pro Messung
+# V3.3 Letzter Status als Snapshot auf Platte: Werte sofort nach Neustart, erster Poll gestaffelt
+# V3.2 Journal unzustellbarer Befehle auf Platte, Replay in Reihenfolge sobald das Geraet antwortet
+# V3.1 Single-Flight: gleichzeitige Refreshes teilen sich ein GetStatus, Frische-Fenster 0.5 s
+# V3.0 Trend der Bodenfeuchte: seltener pollen bis zur Schwelle, Sensor "Zeit bis Bewässerung"
+# V2.9 Bewaesserungs-Scheduler ueber alle Controller (Bodenfeuchte, Limit laufender Pumpen)
+# V2.8 Befehls-Routing pro Entity aus "command" in /mada, beim Setup kompiliert
+# V2.7 Geraete-Objekt (Geraete-Info, Endpoints) fuer alle Entities, Metadaten nach dem Setup verworfen
+# V2.6 Schneller Start: Entities aus dem Cache vor der ersten Antwort, nur angebotene Plattformen
+# V2.5 Kompakter Status (Werte-Array, Layout aus /mada), Fallback auf JSON
+# V2.4 Circuit-Breaker pro Geraet: seltene Proben mit Backoff + Jitter, kurzer Timeout
+# V2.3 Optionale Instrumentierung (Latenzen, Timeouts, Payload), Diagnose-Download
+# V2.2 Zeitreihen-Puffer pro Geraet, Service mada.get_history mit min/max/mean Buckets
+# V2.1 Eigene HTTP-Session pro Geraet: eine Keep-Alive-Verbindung, Requests in Queue
+# V2.0 Batch-RPC: mehrere Befehle + GetStatus in einem Request (falls vom Geraet unterstuetzt)
+# V1.9 Befehls-Queue pro Geraet (Switch/Number), ein Refresh pro Burst
+# V1.8 Entity-Metadaten aus persistentem Cache, Revalidierung per ETag im Hintergrund
+# V1.7 Optionaler Push-Modus via Webhook, Polling nur als Fallback
+# V1.6 Adaptives Poll-Intervall (Pumpe, Bodenfeuchte, Batteriebetrieb)
+# V1.5 Fleet-Scheduler: alle Controller gestaffelt mit begrenzter Parallelitaet
+# V1.4 Change-Detection: Entities werden nur bei Wertaenderung geweckt
 # V1.3 Liest Entity-Metadaten vom ESP32
 # V1.2 Dynamische Sensor-Erkennung
 # V1.1 Initial
 
+from __future__ import annotations
+
 import logging
 import asyncio
+import contextlib
+import json
+import time
 from datetime import timedelta
 
 import aiohttp
 import async_timeout
+import voluptuous as vol
 
+from homeassistant.components import webhook
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_DEVICE_ID, EVENT_HOMEASSISTANT_CLOSE, Platform
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.network import NoURLAvailableError
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
+
+from .breaker import CircuitBreaker
+from .change_filter import ValueWatch
+from .commands import MadaCommandQueue
+from .device import MadaDevice
+from .fleet import MadaFleetScheduler
+from .history import HISTORY_CHANNELS, RESOLUTIONS, MadaHistory
+from .irrigation import (
+    CONF_IRRIGATION,
+    CONF_MAX_RUNTIME,
+    CONF_MOISTURE_MIN,
+    CONF_MOISTURE_TARGET,
+    DEFAULT_MAX_RUNTIME,
+    DEFAULT_MOISTURE_MIN,
+    DEFAULT_MOISTURE_TARGET,
+    SCHEDULE_INTERVAL,
+    IrrigationScheduler,
+    IrrigationZone,
+)
+from .instrumentation import (
+    CONF_INSTRUMENTATION,
+    TIMER_COMMAND,
+    TIMER_DECODE,
+    TIMER_METADATA,
+    TIMER_UPDATE,
+    MadaInstrumentation,
+)
+from .journal import (
+    DATA_COMMAND_JOURNAL,
+    JOURNAL_SAVE_DELAY,
+    STOP_TTL,
+    STORAGE_KEY as JOURNAL_STORAGE_KEY,
+    STORAGE_VERSION as JOURNAL_STORAGE_VERSION,
+    CommandJournal,
+)
+from .longterm import CONF_EXTERNAL_STATISTICS, LongTermStatistics
+from .metadata_cache import (
+    NOT_MODIFIED,
+    MadaMetadataCache,
+    async_get_metadata_cache,
+    index_entities,
+)
+from .polling import (
+    CONF_BATTERY_POWERED,
+    CONF_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    AdaptivePollInterval,
+)
+from .prediction import MoistureTrend
+from .push import (
+    CONF_PUSH_MODE,
+    CONF_WEBHOOK_ID,
+    PUSH_SILENCE_TIMEOUT,
+    MadaPushChannel,
+)
+from .singleflight import SingleFlight
+from .snapshot import (
+    DATA_SNAPSHOTS,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_KEY as SNAPSHOT_STORAGE_KEY,
+    STORAGE_VERSION as SNAPSHOT_STORAGE_VERSION,
+    StatusSnapshots,
+)
+from .transport import MadaTransport
 
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "mada"
-PLATFORMS = [Platform.SENSOR, Platform.SWITCH, Platform.NUMBER]
+# Sensor immer (Diagnose-Sensoren), die anderen nur wenn /mada Entities dieses Typs meldet
+OPTIONAL_PLATFORMS = {"switch": Platform.SWITCH, "number": Platform.NUMBER}
 
 SCAN_INTERVAL = timedelta(seconds=30)
 
+# hass.data Key fuer den gemeinsamen Fleet-Scheduler
+DATA_FLEET = f"{DOMAIN}_fleet"
+# hass.data Key fuer den Bewaesserungs-Scheduler aller Controller
+DATA_IRRIGATION = f"{DOMAIN}_irrigation"
+
+# Switch, den der Bewaesserungs-Scheduler schaltet (entity_id aus /mada)
+IRRIGATION_SWITCH = "pumpe"
+
+# Service: aggregierte Messwerte aus dem Zeitreihen-Puffer
+SERVICE_GET_HISTORY = "get_history"
+ATTR_RESOLUTION = "resolution"
+ATTR_CHANNELS = "channels"
+ATTR_SINCE = "since"
+RESOLUTION_RAW = "raw"
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_RESOLUTION, default="15min"): vol.In(
+            [RESOLUTION_RAW, *RESOLUTIONS]
+        ),
+        vol.Optional(ATTR_CHANNELS): vol.All(
+            cv.ensure_list, [vol.In(list(HISTORY_CHANNELS))]
+        ),
+        vol.Optional(ATTR_SINCE): cv.datetime,
+    }
+)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up MADA from a config entry."""
     host = entry.data["host"]
     
-    coordinator = MadaDataUpdateCoordinator(hass, host)
-    await coordinator.async_config_entry_first_refresh()
-
-    # Lade Entity-Metadaten vom ESP32
-    entity_metadata = await coordinator.fetch_entity_metadata()
+    adaptive = AdaptivePollInterval(
+        SCAN_INTERVAL,
+        timedelta(
+            seconds=entry.options.get(
+                CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL.total_seconds()
+            )
+        ),
+        entry.options.get(CONF_BATTERY_POWERED, False),
+    )
+    
+    fleet = _async_get_fleet(hass)
+    transport = MadaTransport()
+    
+    async def _async_close_transport(event: Event) -> None:
+        await transport.async_close()
+    
+    # Session schliessen bei Unload, fehlgeschlagenem Setup und HA-Ende
+    entry.async_on_unload(transport.async_close)
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_transport)
+    )
+    device = MadaDevice(
+        DOMAIN,
+        entry.entry_id,
+        entry.data.get("model", "HiGrow"),
+        entry.data.get("version", "1.4"),
+    )
+    coordinator = MadaDataUpdateCoordinator(
+        hass,
+        host,
+        fleet,
+        adaptive,
+        transport,
+        MadaInstrumentation(entry.options.get(CONF_INSTRUMENTATION, False)),
+        device,
+    )
+    coordinator.moisture_min = entry.options.get(CONF_MOISTURE_MIN, DEFAULT_MOISTURE_MIN)
+    # Unzustellbare Befehle ueberleben Ausfaelle und Neustarts
+    coordinator.journal = await _async_get_journal(hass)
+    coordinator.snapshots = await _async_get_snapshots(hass)
+    
+    # Entity-Metadaten aus dem Cache (MAC + Firmware-Version), sonst vom ESP32
+    cache = await async_get_metadata_cache(hass)
+    mac = entry.unique_id
+    version = entry.data.get("version")
+    cached = cache.get(mac, version) if mac else None
+    
+    if cached is not None:
+        # Entities sofort aus dem Cache - der erste Poll laeuft parallel zum Plattform-Setup
+        entity_metadata = index_entities(cached["entities"])
+        coordinator.apply_capabilities(cached)
+        # Mit Snapshot zeigen die Entities sofort die letzten Werte (markiert),
+        # der erste Poll kommt gestaffelt vom Fleet-Scheduler statt allen auf einmal
+        if not coordinator.restore_snapshot():
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"mada first refresh {host}"
+            )
+        entry.async_create_background_task(
+            hass,
+            _async_revalidate_metadata(hass, entry, coordinator, cache, cached),
+            f"mada metadata {host}",
+        )
+    else:
+        entity_metadata = await _async_first_fetch(hass, coordinator, cache, mac, version)
     
+    device.compile_routes(entity_metadata)
+    
+    # Messwert-Sensoren als Stundenwerte (vor dem Plattform-Setup - Sensoren pruefen es)
+    if entry.options.get(CONF_EXTERNAL_STATISTICS):
+        coordinator.longterm = LongTermStatistics(entry.entry_id, entry.title)
+        coordinator.longterm.add_channels(entity_metadata)
+    
+    platforms = _platforms_for(entity_metadata)
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "entity_metadata": entity_metadata,
+        "platforms": platforms,
     }
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
+    
+    # Entities sind erstellt - Metadaten liegen nur noch im Cache
+    hass.data[DOMAIN][entry.entry_id].pop("entity_metadata")
+
+    if not hass.services.has_service(DOMAIN, SERVICE_GET_HISTORY):
+        _async_register_services(hass)
+
+    if entry.options.get(CONF_PUSH_MODE) and entry.options.get(CONF_WEBHOOK_ID):
+        _async_setup_push(hass, entry, coordinator)
+
+    if entry.options.get(CONF_IRRIGATION):
+        _async_setup_irrigation(hass, entry, coordinator)
+
+    # Ab jetzt pollt der Fleet-Scheduler - nach Snapshot-Restore gab es noch keinen Live-Poll
+    fleet.register(coordinator, polled=coordinator.restored is None)
+    
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     return True
 
 
+async def _async_first_fetch(
+    hass: HomeAssistant,
+    coordinator: MadaDataUpdateCoordinator,
+    cache: MadaMetadataCache,
+    mac: str | None,
+    version: str | None,
+) -> dict:
+    """Fetch the first status and the entity metadata concurrently.
+    
+    /mada goes over the shared HA session: the transport of the coordinator
+    has a single connection and would run both requests one after another.
+    """
+    refresh, entity_metadata = await asyncio.gather(
+        coordinator.async_config_entry_first_refresh(),
+        coordinator.fetch_entity_metadata(
+            cache, mac, version, async_get_clientsession(hass)
+        ),
+        return_exceptions=True,
+    )
+    
+    if isinstance(refresh, BaseException) or not entity_metadata:
+        # Setup wird wiederholt - die Session schliesst async_on_unload
+        if isinstance(refresh, BaseException):
+            raise refresh
+        raise ConfigEntryNotReady(f"No entity metadata from {coordinator.host}")
+    
+    return entity_metadata
+
+
+def _platforms_for(entity_metadata: dict) -> list[Platform]:
+    """Return the platforms needed for the entities announced by the device."""
+    types = {metadata.get("type") for metadata in entity_metadata.values()}
+    
+    return [Platform.SENSOR] + [
+        platform for entity_type, platform in OPTIONAL_PLATFORMS.items() if entity_type in types
+    ]
+
+
+def _async_setup_push(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: MadaDataUpdateCoordinator
+) -> None:
+    """Register the webhook and keep the device subscribed to it."""
+    webhook_id = entry.options[CONF_WEBHOOK_ID]
+    
+    try:
+        url = webhook.async_generate_url(hass, webhook_id, prefer_external=False)
+    except NoURLAvailableError:
+        _LOGGER.warning("No Home Assistant URL available, push mode disabled for %s", coordinator.host)
+        return
+    
+    channel = MadaPushChannel(
+        url,
+        coordinator.async_subscribe_push,
+        lambda: coordinator.data,
+        coordinator.async_set_status,
+    )
+    webhook.async_register(
+        hass,
+        DOMAIN,
+        f"MADA {coordinator.host}",
+        webhook_id,
+        channel.async_handle_webhook,
+        local_only=True,
+    )
+    entry.async_on_unload(lambda: webhook.async_unregister(hass, webhook_id))
+    
+    task = hass.async_create_background_task(
+        channel.async_run(), f"mada push {coordinator.host}"
+    )
+    entry.async_on_unload(task.cancel)
+    
+    coordinator.push = channel
+
+
+def _async_setup_irrigation(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: MadaDataUpdateCoordinator
+) -> None:
+    """Let the irrigation scheduler water the zone of this controller."""
+    if IRRIGATION_SWITCH not in coordinator.device.routes:
+        _LOGGER.warning(f"{coordinator.host} announces no pump switch, irrigation disabled")
+        return
+    
+    zone = IrrigationZone(
+        entry.title,
+        coordinator.irrigate,
+        entry.options.get(CONF_MOISTURE_MIN, DEFAULT_MOISTURE_MIN),
+        entry.options.get(CONF_MOISTURE_TARGET, DEFAULT_MOISTURE_TARGET),
+        entry.options.get(CONF_MAX_RUNTIME, DEFAULT_MAX_RUNTIME) * 60,
+    )
+    # Werte aus dem Snapshot sind zu alt fuer eine Giess-Entscheidung
+    if coordinator.data is not None and coordinator.restored is None:
+        zone.update(coordinator.data, time.monotonic(), coordinator.trend.rising)
+    coordinator.zone = zone
+    
+    _async_get_irrigation(hass).add_zone(entry.entry_id, zone)
+    entry.async_on_unload(lambda: _async_release_irrigation(hass, entry.entry_id))
+
+
+@callback
+def _async_get_irrigation(hass: HomeAssistant) -> IrrigationScheduler:
+    """Return the shared irrigation scheduler, starting its timer on first use."""
+    if DATA_IRRIGATION not in hass.data:
+        scheduler = IrrigationScheduler()
+        
+        @callback
+        def _async_tick(_now) -> None:
+            scheduler.tick(time.monotonic())
+        
+        unsub = async_track_time_interval(
+            hass, _async_tick, SCHEDULE_INTERVAL, name="mada irrigation"
+        )
+        hass.data[DATA_IRRIGATION] = (scheduler, unsub)
+    
+    return hass.data[DATA_IRRIGATION][0]
+
+
+@callback
+def _async_release_irrigation(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove a zone and stop the timer with the last one."""
+    scheduler, unsub = hass.data[DATA_IRRIGATION]
+    scheduler.remove_zone(entry_id)
+    
+    if not len(scheduler):
+        unsub()
+        hass.data.pop(DATA_IRRIGATION)
+
+
+async def _async_revalidate_metadata(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: MadaDataUpdateCoordinator,
+    cache: MadaMetadataCache,
+    cached: dict,
+) -> None:
+    """Check the cached metadata against the device and reload if it changed."""
+    result = await coordinator.fetch_device_info(cached["etag"])
+    if result is None or result is NOT_MODIFIED:
+        return
+    
+    etag, data = result
+    entities = data.get("entities", [])
+    version = data.get("version", entry.data.get("version"))
+    cache.set(entry.unique_id, version, etag, data)
+    coordinator.apply_capabilities(data)
+    
+    if entities == cached["entities"] and version == entry.data.get("version"):
+        return
+    
+    _LOGGER.info(f"Entity metadata of {coordinator.host} changed, reloading")
+    if version != entry.data.get("version"):
+        # Update-Listener laedt den Eintrag neu
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, "version": version}
+        )
+    else:
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    platforms = hass.data[DOMAIN][entry.entry_id]["platforms"]
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        data["coordinator"].commands.cancel()
+        _async_release_fleet(hass, data["coordinator"])
+        
+        if not hass.data[DOMAIN]:
+            hass.services.async_remove(DOMAIN, SERVICE_GET_HISTORY)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the cached metadata, commands and snapshot of a removed device."""
+    if entry.unique_id:
+        cache = await async_get_metadata_cache(hass)
+        cache.remove(entry.unique_id)
+    
+    journal = await _async_get_journal(hass)
+    journal.remove_device(entry.entry_id)
+    snapshots = await _async_get_snapshots(hass)
+    snapshots.remove(entry.entry_id)
+
+
+async def _async_get_journal(hass: HomeAssistant) -> CommandJournal:
+    """Return the shared command journal, loading it on first use."""
+    if DATA_COMMAND_JOURNAL not in hass.data:
+        store = Store(hass, JOURNAL_STORAGE_VERSION, JOURNAL_STORAGE_KEY)
+        journal = CommandJournal(
+            lambda: store.async_delay_save(journal.as_dict, JOURNAL_SAVE_DELAY)
+        )
+        journal.load(await store.async_load())
+        # Parallele Setups: das erste geladene Journal gewinnt
+        hass.data.setdefault(DATA_COMMAND_JOURNAL, journal)
+    
+    return hass.data[DATA_COMMAND_JOURNAL]
+
+
+async def _async_get_snapshots(hass: HomeAssistant) -> StatusSnapshots:
+    """Return the shared status snapshots, loading them on first use."""
+    if DATA_SNAPSHOTS not in hass.data:
+        store = Store(hass, SNAPSHOT_STORAGE_VERSION, SNAPSHOT_STORAGE_KEY)
+        snapshots = StatusSnapshots(
+            lambda: store.async_delay_save(snapshots.as_dict, SNAPSHOT_SAVE_DELAY)
+        )
+        snapshots.load(await store.async_load())
+        hass.data.setdefault(DATA_SNAPSHOTS, snapshots)
+    
+    return hass.data[DATA_SNAPSHOTS]
+
+
+@callback
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_get_history(call: ServiceCall) -> ServiceResponse:
+        """Return aggregated readings of one controller."""
+        device = dr.async_get(hass).async_get(call.data[ATTR_DEVICE_ID])
+        entries = hass.data.get(DOMAIN, {})
+        entry_ids = device.config_entries & entries.keys() if device else set()
+        
+        if not entry_ids:
+            raise HomeAssistantError(
+                f"No MADA controller for device {call.data[ATTR_DEVICE_ID]}"
+            )
+        
+        history: MadaHistory = entries[next(iter(entry_ids))]["coordinator"].history
+        resolution = call.data[ATTR_RESOLUTION]
+        channels = call.data.get(ATTR_CHANNELS)
+        since = call.data.get(ATTR_SINCE)
+        since = dt_util.as_timestamp(since) if since else None
+        
+        if resolution == RESOLUTION_RAW:
+            series = {
+                name: [
+                    {"time": _isoformat(timestamp), "value": value}
+                    for timestamp, value in points
+                ]
+                for name, points in history.raw(channels, since).items()
+            }
+        else:
+            series = {
+                name: [{**bucket, "start": _isoformat(bucket["start"])} for bucket in buckets]
+                for name, buckets in history.buckets(resolution, channels, since).items()
+            }
+        
+        return {"resolution": resolution, "series": series}
+    
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _isoformat(timestamp: float) -> str:
+    """Format an epoch timestamp for service responses."""
+    return dt_util.utc_from_timestamp(timestamp).isoformat()
+
+
+def _async_get_fleet(hass: HomeAssistant) -> MadaFleetScheduler:
+    """Return the shared fleet scheduler, starting it on first use."""
+    if DATA_FLEET not in hass.data:
+        fleet = MadaFleetScheduler(SCAN_INTERVAL)
+        task = hass.async_create_background_task(
+            fleet.async_run(), "mada fleet scheduler"
+        )
+        hass.data[DATA_FLEET] = (fleet, task)
+    
+    return hass.data[DATA_FLEET][0]
+
+
+def _async_release_fleet(hass: HomeAssistant, coordinator) -> None:
+    """Remove a coordinator and stop the scheduler with the last one."""
+    fleet, task = hass.data[DATA_FLEET]
+    fleet.unregister(coordinator)
+    
+    if not len(fleet):
+        task.cancel()
+        hass.data.pop(DATA_FLEET)
+
+
 class MadaDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching MADA data."""
 
-    def __init__(self, hass: HomeAssistant, host: str) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        fleet: MadaFleetScheduler,
+        adaptive: AdaptivePollInterval,
+        transport: MadaTransport,
+        instrumentation: MadaInstrumentation,
+        device: MadaDevice,
+    ) -> None:
         """Initialize."""
         self.host = host
-        self.session = async_get_clientsession(hass)
+        # Statische Geraetedaten, geteilt von allen Entities
+        self.device = device
+        # Eigene Session: Polls und Befehle teilen sich eine Verbindung zum Geraet
+        self.transport = transport
+        self.session = transport.session
+        self.fleet = fleet
+        self.adaptive = adaptive
+        self.push: MadaPushChannel | None = None
+        self.commands = MadaCommandQueue(
+            self.async_send_command,
+            self.async_request_refresh,
+            self.async_send_batch,
+            on_result=self._journal_result,
+        )
+        # Journal unzustellbarer Befehle, Eintraege unter der Geraete-ID (Entry)
+        self.journal: CommandJournal | None = None
+        # Letzter Status auf Platte; restored = Zeitstempel solange data daraus stammt
+        self.snapshots: StatusSnapshots | None = None
+        self.restored: float | None = None
+        # Stundenwerte der Messwert-Sensoren, None ohne Option
+        self.longterm: LongTermStatistics | None = None
+        
+        # Geraet kann mada.Batch (aus /mada)
+        self.supports_batch = False
+        
+        # Laufender/frischer Status-Request, geteilt von allen Refreshes
+        self.status_flight = SingleFlight(cancelled_error=UpdateFailed)
+        
+        # Verlauf der Messwerte, fester Speicher pro Geraet
+        self.history = MadaHistory()
+        
+        # Latenzen/Zaehler, ohne Option nur eine bool-Pruefung pro Aufruf
+        self.instrumentation = instrumentation
+        
+        # Nach Fehlerserie seltene Proben statt 10 s Timeout in jedem Zyklus
+        self.breaker = CircuitBreaker()
+        
+        # Zone des Bewaesserungs-Schedulers, None ohne Option
+        self.zone: IrrigationZone | None = None
+        
+        # Trend der Bodenfeuchte und Schwelle, ab der gegossen wird
+        self.trend = MoistureTrend()
+        self.moisture_min: float = DEFAULT_MOISTURE_MIN
+        
+        # Zaehler fuer zugestellte/unterdrueckte Entity-Updates
+        self.update_stats = {"delivered": 0, "suppressed": 0}
         
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=SCAN_INTERVAL,
+            update_interval=None,
+        )
+
+    @property
+    def poll_interval(self) -> timedelta:
+        """Interval for the fleet scheduler (the own timer is disabled)."""
+        # Unerreichbar -> nur noch Proben mit Backoff
+        if self.breaker.is_open:
+            return self.breaker.retry_delay
+        
+        if self.push is not None and self.push.active:
+            return timedelta(seconds=PUSH_SILENCE_TIMEOUT)
+        
+        return self.adaptive.interval
+
+    @property
+    def watering_in(self) -> float | None:
+        """Predicted seconds until the moisture falls below moisture_min."""
+        return self.trend.time_to(self.moisture_min, time.monotonic())
+
+    @callback
+    def async_should_update(self, watch: ValueWatch) -> bool:
+        """Return True if the entity behind watch needs a state write."""
+        if watch.changed(self.data, self.last_update_success):
+            self.update_stats["delivered"] += 1
+            return True
+        
+        self.update_stats["suppressed"] += 1
+        return False
+
+    def restore_snapshot(self) -> bool:
+        """Show the status saved before the restart until the first live one."""
+        if self.snapshots is None:
+            return False
+        snapshot = self.snapshots.get(self.device.entry_id, time.time())
+        if snapshot is None:
+            return False
+        
+        # Nicht durch _handle_status - Trend, Verlauf und Intervall nur aus Live-Daten
+        self.restored, self.data = snapshot
+        return True
+
+    def apply_capabilities(self, info: dict) -> None:
+        """Use the optional features announced in /mada (or its cached copy)."""
+        self.supports_batch = bool(info.get("batch"))
+
+    @callback
+    def async_write_state(self, entity) -> None:
+        """Write the state of one of our entities, timed if instrumented."""
+        start = self.instrumentation.start()
+        entity.async_write_ha_state()
+        self.instrumentation.state_written(entity.entity_id, start)
+
+    @callback
+    def irrigate(self, on: bool) -> None:
+        """Switch the pump for the irrigation scheduler via the command queue."""
+        route = self.device.routes[IRRIGATION_SWITCH]
+        self.commands.submit(
+            route.method, route.params(on), route.key, None if on else STOP_TTL
         )
 
-    async def fetch_entity_metadata(self):
-        """Fetch entity metadata from ESP32 /mada endpoint."""
+    @callback
+    def _journal_result(
+        self, key: str, method: str, params: dict, ttl: float | None, ok: bool
+    ) -> None:
+        """Keep undelivered commands, forget delivered ones."""
+        if self.journal is None:
+            return
+        if ok:
+            self.journal.clear(self.device.entry_id, key)
+        else:
+            _LOGGER.warning(f"{method} not delivered to {self.host}, replaying when it answers")
+            self.journal.record(self.device.entry_id, key, method, params, time.time(), ttl)
+
+    async def fetch_device_info(
+        self, etag: str | None = None, session: aiohttp.ClientSession | None = None
+    ):
+        """Fetch /mada, conditionally if the ETag of a cached copy is known.
+        
+        Returns (etag, data), NOT_MODIFIED if unchanged or None on errors.
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        session = session or self.session
+        # Eigene Geraeteverbindung zuerst belegen, dann erst einen Fleet-Slot
+        connection = (
+            self.transport.connection() if session is self.session else contextlib.nullcontext()
+        )
+        
         try:
-            async with async_timeout.timeout(10):
+            async with connection, self.fleet.semaphore, async_timeout.timeout(10):
                 url = f"http://{self.host}/mada"
-                async with self.session.get(url) as response:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        return NOT_MODIFIED
+                    
                     if response.status != 200:
                         _LOGGER.warning(f"Could not fetch entity metadata: {response.status}")
-                        return {}
+                        return None
                     
                     data = await response.json()
-                    entities = data.get("entities", [])
-                    
-                    _LOGGER.info(f"Loaded {len(entities)} entity definitions from ESP32")
-                    
-                    # Konvertiere zu Dictionary für schnellen Zugriff
-                    metadata = {}
-                    for entity in entities:
-                        entity_id = entity.get("id")
-                        if entity_id:
-                            metadata[entity_id] = entity
-                    
-                    return metadata
+                    return response.headers.get("ETag"), data
                     
         except asyncio.TimeoutError:
             _LOGGER.warning(f"Timeout fetching metadata from {self.host}")
-            return {}
+            return None
         except aiohttp.ClientError as err:
             _LOGGER.warning(f"Error fetching metadata from {self.host}: {err}")
-            return {}
+            return None
         except Exception as err:
             _LOGGER.error(f"Unexpected error fetching metadata: {err}")
+            return None
+
+    async def fetch_entity_metadata(
+        self,
+        cache: MadaMetadataCache,
+        mac: str | None,
+        version: str | None,
+        session: aiohttp.ClientSession | None = None,
+    ) -> dict:
+        """Fetch entity metadata from ESP32 /mada endpoint and cache it."""
+        start = self.instrumentation.start()
+        result = await self.fetch_device_info(session=session)
+        self.instrumentation.stop(TIMER_METADATA, start)
+        if not isinstance(result, tuple):
             return {}
+        
+        etag, data = result
+        entities = data.get("entities", [])
+        
+        _LOGGER.info(f"Loaded {len(entities)} entity definitions from ESP32")
+        
+        # Gleicher Schluessel wie beim Lookup, Versionswechsel erkennt die Revalidierung
+        if mac:
+            cache.set(mac, version, etag, data)
+        
+        self.apply_capabilities(data)
+        
+        return index_entities(entities)
 
-    async def _async_update_data(self):
-        """Fetch data from MADA device."""
+    async def async_request_refresh(self) -> None:
+        """Request a refresh unless the device counts as unreachable.
+        
+        While the breaker is open only the fleet scheduler's probes reach
+        the device; a manual or post-command refresh would wait for the
+        full timeout.
+        """
+        if self.breaker.is_open:
+            _LOGGER.debug(f"{self.host} unreachable, refresh skipped until the next probe")
+            return
+        await super().async_request_refresh()
+
+    async def async_send_command(self, method: str, params: dict) -> bool:
+        """Post one RPC call (e.g. Pump.Set) to the device."""
+        # Unerreichbar -> sofort fehlschlagen, das Journal spielt den Befehl spaeter nach
+        if self.breaker.is_open:
+            _LOGGER.warning(f"{self.host} unreachable, {method} not sent")
+            self.instrumentation.error(TIMER_COMMAND)
+            return False
+        
+        url = f"http://{self.host}/rpc/{method}"
+        _LOGGER.debug(f"Sending POST to {url} with payload {params}")
+        # Status von vor dem Befehl nicht mehr wiederverwenden
+        self.status_flight.invalidate()
+        start = self.instrumentation.start()
+        
         try:
-            async with async_timeout.timeout(10):
-                url = f"http://{self.host}/rpc/mada.GetStatus"
-                async with self.session.get(url) as response:
+            async with self.transport.connection(), async_timeout.timeout(self.breaker.timeout):
+                async with self.session.post(
+                    url,
+                    json=params,
+                    headers={"Content-Type": "application/json"},
+                ) as response:
+                    response_text = await response.text()
+                    
                     if response.status != 200:
-                        raise UpdateFailed(f"Error fetching data: {response.status}")
+                        _LOGGER.error(
+                            "Failed to send %s to %s: HTTP %s - %s",
+                            method,
+                            self.host,
+                            response.status,
+                            response_text,
+                        )
+                        self.instrumentation.error(TIMER_COMMAND)
+                        return False
                     
-                    data = await response.json()
-                    return data
+                    self.instrumentation.stop(TIMER_COMMAND, start)
+                    return True
+                    
+        except asyncio.TimeoutError:
+            _LOGGER.error("Timeout sending %s to %s", method, self.host)
+            self.instrumentation.timeout(TIMER_COMMAND)
+            return False
+        except aiohttp.ClientError as err:
+            _LOGGER.error("Error sending %s to %s: %s", method, self.host, err)
+        except Exception as err:
+            _LOGGER.error("Unexpected error sending %s to %s: %s", method, self.host, err)
+        
+        self.instrumentation.error(TIMER_COMMAND)
+        return False
+
+    async def async_send_batch(self, calls: list[tuple[str, dict]]) -> bool | None:
+        """Send RPC calls plus mada.GetStatus in one request.
+        
+        Returns None if the device has no batch support (use single calls).
+        """
+        if not self.supports_batch:
+            return None
+        
+        if self.breaker.is_open:
+            _LOGGER.warning(f"{self.host} unreachable, batch of {len(calls)} calls not sent")
+            self.instrumentation.error(TIMER_COMMAND)
+            return False
+        
+        url = f"http://{self.host}/rpc/mada.Batch"
+        payload = {
+            "calls": [{"method": method, "params": params} for method, params in calls]
+            + [{"method": "mada.GetStatus"}]
+        }
+        _LOGGER.debug(f"Sending POST to {url} with payload {payload}")
+        self.status_flight.invalidate()
+        start = self.instrumentation.start()
+        
+        try:
+            async with self.transport.connection(), async_timeout.timeout(self.breaker.timeout):
+                async with self.session.post(url, json=payload) as response:
+                    if response.status == 404:
+                        # Aeltere Firmware - zurueck zu Einzel-Requests
+                        self.supports_batch = False
+                        return None
+                    
+                    if response.status != 200:
+                        _LOGGER.error(
+                            "Failed to send batch to %s: HTTP %s", self.host, response.status
+                        )
+                        self.instrumentation.error(TIMER_COMMAND)
+                        return False
+                    
+                    body = await response.read()
+                    self.instrumentation.payload(TIMER_COMMAND, len(body))
+                    results = json.loads(body).get("results", [])
+                    
+        except asyncio.TimeoutError:
+            _LOGGER.error("Timeout sending batch to %s", self.host)
+            self.instrumentation.timeout(TIMER_COMMAND)
+            return False
+        except aiohttp.ClientError as err:
+            _LOGGER.error("Error sending batch to %s: %s", self.host, err)
+            self.instrumentation.error(TIMER_COMMAND)
+            return False
+        except Exception as err:
+            _LOGGER.error("Unexpected error sending batch to %s: %s", self.host, err)
+            self.instrumentation.error(TIMER_COMMAND)
+            return False
+        
+        self.instrumentation.stop(TIMER_COMMAND, start)
+        
+        ok = len(results) == len(payload["calls"])
+        for (method, _), result in zip(calls, results):
+            if not isinstance(result, dict) or "error" in result:
+                _LOGGER.error("Failed to send %s to %s: %s", method, self.host, result)
+                ok = False
+        
+        # Letztes Ergebnis ist der aktuelle Status - kein extra GetStatus noetig
+        if results and isinstance(results[-1], dict) and "error" not in results[-1]:
+            self.async_set_status(results[-1])
+        
+        return ok
+
+    async def async_subscribe_push(self, url: str, heartbeat: int) -> bool:
+        """Ask the device to post status deltas to url."""
+        try:
+            async with self.transport.connection(), async_timeout.timeout(10):
+                async with self.session.post(
+                    f"http://{self.host}/rpc/mada.SetPush",
+                    json={"url": url, "heartbeat": heartbeat},
+                ) as response:
+                    if response.status != 200:
+                        _LOGGER.debug(f"Push subscription rejected by {self.host}: {response.status}")
+                        return False
+                    return True
+                    
+        except (asyncio.TimeoutError, aiohttp.ClientError) as err:
+            _LOGGER.debug(f"Push subscription to {self.host} failed: {err!r}")
+            return False
+
+    async def _async_update_data(self):
+        """Fetch data from MADA device."""
+        # Push-Kanal aktiv -> kein Poll noetig
+        if self.push is not None and self.push.active and self.data is not None:
+            return self.data
+        
+        # Fleet, Befehls-Queue und Entities koennen gleichzeitig anfragen -> ein Request
+        return await self.status_flight.run(self._async_poll_status)
+
+    async def _async_poll_status(self) -> dict:
+        """Fetch and process one status, tracking reachability."""
+        try:
+            data = await self._async_fetch_status()
+        except UpdateFailed:
+            if self.breaker.record_failure():
+                _LOGGER.warning(
+                    f"{self.host} unreachable after {self.breaker.failures} attempts, "
+                    f"retrying in {self.breaker.retry_delay.total_seconds():.0f} s"
+                )
+            raise
+        
+        if self.breaker.record_success():
+            _LOGGER.info(f"{self.host} reachable again")
+        
+        # Geraet antwortet - liegengebliebene Befehle in Reihenfolge nachholen
+        if self.journal is not None and self.journal.has(self.device.entry_id):
+            self.commands.replay(self.journal.pending(self.device.entry_id, time.time()))
+        
+        return self._handle_status(data)
+
+    async def _async_get(self, method: str) -> tuple[int, bytes]:
+        """GET one RPC method, return status code and raw body."""
+        async with self.session.get(f"http://{self.host}/rpc/{method}") as response:
+            return response.status, await response.read()
+
+    async def _async_fetch_status(self) -> dict:
+        """GET mada.GetStatus and decode it.
+        
+        Raises UpdateFailed on errors.
+        """
+        instrumentation = self.instrumentation
+        
+        try:
+            # Erst die Geraeteverbindung, dann ein Fleet-Slot - ein langsames Geraet
+            # blockiert so keinen Slot; kurzer Timeout fuer Proben
+            async with (
+                self.transport.connection(),
+                self.fleet.semaphore,
+                async_timeout.timeout(self.breaker.timeout),
+            ):
+                start = instrumentation.start()
+                status, body = await self._async_get("mada.GetStatus")
+                
+                if status != 200:
+                    raise UpdateFailed(f"Error fetching data: {status}")
                     
         except asyncio.TimeoutError as err:
+            instrumentation.timeout(TIMER_UPDATE)
             raise UpdateFailed(f"Timeout fetching data from {self.host}") from err
         except aiohttp.ClientError as err:
+            instrumentation.error(TIMER_UPDATE)
             raise UpdateFailed(f"Error fetching data from {self.host}: {err}") from err
+        except UpdateFailed:
+            instrumentation.error(TIMER_UPDATE)
+            raise
         except Exception as err:
+            instrumentation.error(TIMER_UPDATE)
             raise UpdateFailed(f"Unexpected error: {err}") from err
+        
+        instrumentation.stop(TIMER_UPDATE, start)
+        instrumentation.payload(TIMER_UPDATE, len(body))
+        
+        # Dekodierung getrennt messen - laeuft im Event-Loop
+        start = instrumentation.start()
+        try:
+            data = json.loads(body)
+        except ValueError as err:
+            instrumentation.error(TIMER_DECODE)
+            raise UpdateFailed(f"Invalid status from {self.host}: {err}") from err
+        instrumentation.stop(TIMER_DECODE, start)
+        
+        return data
+
+    @callback
+    def async_set_status(self, data: dict) -> None:
+        """Publish a status that arrived outside of a poll (batch, push)."""
+        data = self._handle_status(data)
+        self.status_flight.set(data)
+        self.async_set_updated_data(data)
+
+    @callback
+    def _async_import_statistics(self) -> None:
+        """Import the finished hours as external statistics, one call per sensor."""
+        rows = self.longterm.pop_rows()
+        if "recorder" not in self.hass.config.components:
+            return
+        
+        for object_id, (name, unit, hours) in rows.items():
+            async_add_external_statistics(
+                self.hass,
+                StatisticMetaData(
+                    has_mean=True,
+                    has_sum=False,
+                    name=name,
+                    source=DOMAIN,
+                    statistic_id=f"{DOMAIN}:{object_id}",
+                    unit_of_measurement=unit,
+                ),
+                [
+                    StatisticData(
+                        start=dt_util.utc_from_timestamp(start), mean=mean, min=low, max=high
+                    )
+                    for start, mean, low, high in hours
+                ],
+            )
+
+    def _handle_status(self, data: dict) -> dict:
+        """Process a fresh GetStatus payload, however it was fetched."""
+        now = time.monotonic()
+        # Live-Daten ersetzen den Snapshot
+        self.restored = None
+        self.trend.update(data, now)
+        # Naechstes Intervall aus Pumpe, Bodenfeuchte und Trend ableiten
+        self.adaptive.update(data, now, self.trend.time_to(self.moisture_min, now))
+        timestamp = time.time()
+        self.history.add(timestamp, data)
+        if self.snapshots is not None:
+            self.snapshots.set(self.device.entry_id, timestamp, data)
+        if self.longterm is not None and self.longterm.add(timestamp, data):
+            self._async_import_statistics()
+        if self.zone is not None:
+            self.zone.update(data, now, self.trend.rising)
+        return data
@@ -0,0 +1,101 @@
+"""Circuit breaker for unreachable MADA controllers."""
+# V1.1 Backoff beginnt bei 2 min statt beim Poll-Intervall, Jitter nur noch -25 %
+# V1.0 Initial - Nach Fehlerserie nur noch Proben mit Backoff + Jitter und kurzem Timeout
+
+from __future__ import annotations
+
+import random
+from datetime import timedelta
+
+# Aufeinanderfolgende Fehler bis der Breaker oeffnet
+FAILURE_THRESHOLD = 3
+
+# Timeout fuer Requests an erreichbare Geraete (Sekunden)
+REQUEST_TIMEOUT = 10
+# Timeout fuer Proben bei offenem Breaker - tote Geraete blockieren kaum
+PROBE_TIMEOUT = 3
+
+# Abstand der Proben, verdoppelt sich pro Fehlschlag - erste Probe deutlich nach
+# dem regulaeren Poll-Intervall (30 s), sonst bremst der Breaker nichts
+BACKOFF_MIN = timedelta(minutes=2)
+BACKOFF_MAX = timedelta(minutes=15)
+
+# Zustaende
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+
+
+class CircuitBreaker:
+    """Track consecutive failures of one controller and space out retries."""
+
+    __slots__ = (
+        "threshold",
+        "backoff_min",
+        "backoff_max",
+        "state",
+        "failures",
+        "retry_delay",
+        "stats",
+        "_backoff",
+    )
+
+    def __init__(
+        self,
+        threshold: int = FAILURE_THRESHOLD,
+        backoff_min: timedelta = BACKOFF_MIN,
+        backoff_max: timedelta = BACKOFF_MAX,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.threshold = threshold
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.retry_delay = backoff_min
+        self.stats = {"opened": 0, "probes": 0}
+        self._backoff = backoff_min
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while the controller counts as unreachable."""
+        return self.state == STATE_OPEN
+
+    @property
+    def timeout(self) -> float:
+        """Return the request timeout for the next call."""
+        return PROBE_TIMEOUT if self.is_open else REQUEST_TIMEOUT
+
+    def record_success(self) -> bool:
+        """Close the breaker, return True if it was open."""
+        was_open = self.is_open
+        if was_open:
+            self.stats["probes"] += 1
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._backoff = self.backoff_min
+        self.retry_delay = self.backoff_min
+        return was_open
+
+    def record_failure(self) -> bool:
+        """Count a failure, return True if the breaker just opened."""
+        self.failures += 1
+
+        if self.is_open:
+            # Probe fehlgeschlagen - naechster Versuch spaeter
+            self.stats["probes"] += 1
+            self._backoff = min(self._backoff * 2, self.backoff_max)
+            self.retry_delay = self._jitter(self._backoff)
+            return False
+
+        if self.failures < self.threshold:
+            return False
+
+        self.state = STATE_OPEN
+        self.stats["opened"] += 1
+        self._backoff = self.backoff_min
+        self.retry_delay = self._jitter(self._backoff)
+        return True
+
+    def _jitter(self, delay: timedelta) -> timedelta:
+        """Spread retries of devices that failed together (e.g. WLAN outage)."""
+        return delay * random.uniform(0.75, 1.0)
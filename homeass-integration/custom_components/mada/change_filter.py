@@ -0,0 +1,52 @@
+"""Change detection for MADA entities."""
+# V1.0 Initial - State nur schreiben wenn sich der Wert bewegt hat
+
+from __future__ import annotations
+
+from typing import Any
+
+from .resolver import MISSING, Resolver
+
+
+def parse_deadband(value: Any) -> float:
+    """Return the deadband from the /mada metadata, 0 if missing or invalid."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        return 0.0
+    return float(value)
+
+
+class ValueWatch:
+    """Remember the last delivered value of one data_path."""
+
+    __slots__ = ("resolve", "deadband", "value", "available")
+
+    def __init__(self, resolve: Resolver, deadband: float = 0.0) -> None:
+        """Initialize the watch."""
+        self.resolve = resolve
+        self.deadband = deadband
+        self.value: Any = MISSING
+        self.available: bool | None = None
+
+    def changed(self, data: Any, available: bool) -> bool:
+        """Return True (and remember the value) if it moved since the last delivery."""
+        value = self.resolve(data) if available else MISSING
+
+        if available is self.available and not self._moved(value):
+            return False
+
+        self.value = value
+        self.available = available
+        return True
+
+    def _moved(self, value: Any) -> bool:
+        """Compare against the last delivered value, honouring the deadband."""
+        last = self.value
+        if (
+            self.deadband
+            and type(value) in (int, float)
+            and type(last) in (int, float)
+        ):
+            # Kleine Schwankungen (z.B. 0.5 % Bodenfeuchte) nicht melden
+            return abs(value - last) >= self.deadband
+
+        return value != last or type(value) is not type(last)
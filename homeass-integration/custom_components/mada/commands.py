@@ -0,0 +1,190 @@
+"""Per-device command queue for MADA switch and number writes."""
+# V1.4 Worker-Referenz im finally freigeben - auch nach Abbruch
+# V1.3 Ergebnis pro Befehl an das Journal, Replay unzustellbarer Befehle
+# V1.2 Zusammenfassen pro Key statt pro Methode (mehrere Ventile hinter einer Methode)
+# V1.1 Optional Batch-RPC: ganzer Burst + Status in einem Request
+# V1.0 Initial - Befehle pro Geraet serialisieren, zusammenfassen, ein Refresh pro Burst
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+# Wartezeit auf weitere Befehle (z.B. Slider ziehen) in Sekunden
+COMMAND_DEBOUNCE = 0.3
+# Ruhezeit nach dem letzten Befehl bis zum Status-Refresh in Sekunden
+REFRESH_SETTLE = 1.0
+
+
+class MadaCommandQueue:
+    """Coalesce writes per actuator and send them one at a time."""
+
+    def __init__(
+        self,
+        send: Callable[[str, dict], Awaitable[bool]],
+        refresh: Callable[[], Awaitable[None]],
+        send_batch: Callable[[list[tuple[str, dict]]], Awaitable[bool | None]]
+        | None = None,
+        debounce: float = COMMAND_DEBOUNCE,
+        settle: float = REFRESH_SETTLE,
+        on_result: Callable[[str, str, dict, float | None, bool], None] | None = None,
+    ) -> None:
+        """Initialize the queue.
+
+        send posts one RPC call to the device, refresh fetches the status
+        once a burst of commands has settled. send_batch posts all pending
+        calls together with a status read and returns None if the device
+        has no batch support. on_result(key, method, params, ttl, ok) is
+        called for every sent command (journal).
+        """
+        self.stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "sent": 0,
+            "failed": 0,
+            "batches": 0,
+            "replayed": 0,
+        }
+        self._send = send
+        self._send_batch = send_batch
+        self._refresh = refresh
+        self._debounce = debounce
+        self._settle = settle
+        self._on_result = on_result
+        # key -> (method, params)
+        self._pending: dict[str, tuple[str, dict]] = {}
+        # key -> Ablaufzeit im Journal, falls der Befehl nicht ankommt (None: Standard)
+        self._ttl: dict[str, float | None] = {}
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._sending = False
+        # Status kam mit dem letzten Batch - kein Refresh noetig
+        self._status_fresh = False
+
+    @property
+    def busy(self) -> bool:
+        """Return True while commands are waiting or being sent."""
+        return self._sending or bool(self._pending)
+
+    def submit(
+        self,
+        method: str,
+        params: dict,
+        key: str | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        """Queue an RPC call; a pending call with the same key is replaced.
+
+        The key defaults to the method; actuators sharing a method with
+        different fixed params (e.g. several valves) pass their own key.
+        ttl is how long an undelivered call may be replayed.
+        """
+        key = key or method
+        self.stats["submitted"] += 1
+        if key in self._pending:
+            self.stats["coalesced"] += 1
+
+        # Nur der letzte Wert zaehlt, Position in der Queue bleibt
+        self._pending[key] = (method, params)
+        self._ttl[key] = ttl
+        self._wakeup.set()
+
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._async_run())
+
+    def replay(self, calls: list[tuple[str, str, dict]]) -> None:
+        """Queue journaled (key, method, params) calls in their original order.
+
+        Keys with a newer pending write are skipped; nothing is queued while
+        a burst is being sent, its results update the journal first.
+        """
+        if self._sending:
+            return
+        for key, method, params in calls:
+            if key not in self._pending:
+                self.stats["replayed"] += 1
+                self.submit(method, params, key)
+
+    def cancel(self) -> None:
+        """Drop pending commands and stop the worker."""
+        self._pending.clear()
+        self._ttl.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    async def _async_drain(self) -> None:
+        """Send all pending commands in order."""
+        self._sending = True
+        try:
+            if self._send_batch is not None and self._pending:
+                pending = dict(self._pending)
+                self._pending.clear()
+
+                result = await self._send_batch(list(pending.values()))
+                if result is not None:
+                    self.stats["batches"] += 1
+                    self.stats["sent" if result else "failed"] += len(pending)
+                    self._status_fresh = result
+                    for key, (method, params) in pending.items():
+                        self._report(key, method, params, result)
+                    return
+
+                # Keine Batch-Unterstuetzung - einzeln senden, neuere Werte gewinnen
+                pending.update(self._pending)
+                self._pending = pending
+
+            self._status_fresh = False
+            while self._pending:
+                key = next(iter(self._pending))
+                method, params = self._pending.pop(key)
+
+                ok = await self._send(method, params)
+                self.stats["sent" if ok else "failed"] += 1
+                self._report(key, method, params, ok)
+        finally:
+            self._sending = False
+
+    def _report(self, key: str, method: str, params: dict, ok: bool) -> None:
+        """Pass the result of a sent call to the journal."""
+        ttl = self._ttl.get(key)
+        # Inzwischen neu eingereihter Wert des Keys braucht seine ttl noch
+        if key not in self._pending:
+            self._ttl.pop(key, None)
+        if self._on_result is not None:
+            self._on_result(key, method, params, ttl, ok)
+
+    async def _async_run(self) -> None:
+        """Send bursts until the device has settled, then refresh once."""
+        try:
+            while True:
+                await asyncio.sleep(self._debounce)
+                self._wakeup.clear()
+                await self._async_drain()
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._settle)
+                except asyncio.TimeoutError:
+                    pass
+                else:
+                    # Weitere Befehle im selben Burst
+                    continue
+
+                if not self._status_fresh:
+                    await self._refresh()
+                self._status_fresh = False
+
+                # Kein await zwischen Pruefung und Reset - submit startet sonst keinen Worker
+                if not self._pending:
+                    return
+
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected error in command queue")
+        finally:
+            # Auch bei Abbruch (z.B. CancelledError aus dem Refresh) - sonst startet
+            # submit nie wieder einen Worker; ein nach cancel() neu gestarteter bleibt
+            if self._worker is asyncio.current_task():
+                self._worker = None
@@ -1,4 +1,5 @@
 """Config flow for HiGrow integration."""
+import asyncio
 import logging
 from typing import Any
 
@@ -7,23 +8,54 @@ import async_timeout
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.components import zeroconf
-from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
-from homeassistant.data_entry_flow import FlowResult
+from homeassistant.components import webhook, zeroconf
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.data_entry_flow import FlowResult, FlowResultType
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
+from . import DOMAIN
+from .discovery import (
+    DATA_DISCOVERY_FILTER,
+    DiscoveryFilter,
+    HostRejected,
+    is_candidate,
+)
+from .instrumentation import CONF_INSTRUMENTATION
+from .irrigation import (
+    CONF_IRRIGATION,
+    CONF_MAX_RUNTIME,
+    CONF_MOISTURE_MIN,
+    CONF_MOISTURE_TARGET,
+    DEFAULT_MAX_RUNTIME,
+    DEFAULT_MOISTURE_MIN,
+    DEFAULT_MOISTURE_TARGET,
+)
+from .longterm import CONF_EXTERNAL_STATISTICS
+from .metadata_cache import async_get_metadata_cache
+from .polling import (
+    CONF_BATTERY_POWERED,
+    CONF_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    SCAN_INTERVAL_LIMIT,
+)
+from .push import CONF_PUSH_MODE, CONF_WEBHOOK_ID
+from .sweep import DEFAULT_PORT, NetworkTooLarge, async_sweep
+
 _LOGGER = logging.getLogger(__name__)
 
-DOMAIN = "higrow"
+# Netz fuer den Sweep, z.B. 192.168.4.0/22
+CONF_NETWORK = "network"
 
 
-async def validate_host(hass: HomeAssistant, host: str) -> dict[str, Any]:
+async def validate_host(
+    hass: HomeAssistant, host: str, timeout: float = 10
+) -> dict[str, Any]:
     """Validate the host by connecting to the device."""
     session = async_get_clientsession(hass)
     
     try:
-        async with async_timeout.timeout(10):
+        async with async_timeout.timeout(timeout):
             url = f"http://{host}/mada"
             async with session.get(url) as response:
                 if response.status != 200:
@@ -40,6 +72,9 @@ async def validate_host(hass: HomeAssistant, host: str) -> dict[str, Any]:
                     "model": data.get("model", "Unknown"),
                     "mac": data.get("mac", "Unknown"),
                     "version": data.get("version", "Unknown"),
+                    # Fuer den Metadaten-Cache - Setup muss /mada nicht erneut laden
+                    "etag": response.headers.get("ETag"),
+                    "metadata": data,
                 }
                 
     except aiohttp.ClientError as err:
@@ -57,10 +92,24 @@ class HiGrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self.discovery_info = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Return the options flow."""
+        return HiGrowOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle the initial step."""
+        """Let the user add one controller or sweep a whole network."""
+        return self.async_show_menu(step_id="user", menu_options=["host", "sweep"])
+
+    async def async_step_host(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Add one controller by IP address or hostname."""
         errors = {}
 
         if user_input is not None:
@@ -80,6 +129,8 @@ class HiGrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(info["mac"])
                 self._abort_if_unique_id_configured()
                 
+                await self._async_cache_metadata(info)
+                
                 return self.async_create_entry(
                     title=info["title"],
                     data={
@@ -90,13 +141,94 @@ class HiGrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="host",
             data_schema=vol.Schema({
                 vol.Required(CONF_HOST, default="higrow.local"): str,
             }),
             errors=errors,
         )
 
+    async def async_step_sweep(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Probe a whole network and add every new controller."""
+        errors = {}
+        
+        if user_input is not None:
+            try:
+                found = await async_sweep(
+                    user_input[CONF_NETWORK],
+                    user_input[CONF_PORT],
+                    known=self._async_current_ids(),
+                )
+            except NetworkTooLarge:
+                errors[CONF_NETWORK] = "network_too_large"
+            except ValueError:
+                errors[CONF_NETWORK] = "invalid_network"
+            else:
+                if found:
+                    # Ein Flow pro Geraet legt den Eintrag an (Unique-ID, Metadaten-Cache) -
+                    # abwarten, damit die Meldung zaehlt, was wirklich angelegt wurde
+                    results = await asyncio.gather(
+                        *(
+                            self.hass.config_entries.flow.async_init(
+                                DOMAIN,
+                                context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                                data=info,
+                            )
+                            for info in found
+                        ),
+                        return_exceptions=True,
+                    )
+                    added = 0
+                    for info, result in zip(found, results):
+                        if isinstance(result, Exception):
+                            _LOGGER.warning(f"Could not add {info['host']}: {result}")
+                        elif result["type"] == FlowResultType.CREATE_ENTRY:
+                            added += 1
+                    return self.async_abort(
+                        reason="sweep_complete",
+                        description_placeholders={
+                            "count": str(added),
+                            "found": str(len(found)),
+                        },
+                    )
+                errors["base"] = "no_devices_found"
+        
+        user_input = user_input or {}
+        return self.async_show_form(
+            step_id="sweep",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_NETWORK, default=user_input.get(CONF_NETWORK, "192.168.1.0/24")
+                ): str,
+                vol.Required(
+                    CONF_PORT, default=user_input.get(CONF_PORT, DEFAULT_PORT)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=65535)),
+            }),
+            errors=errors,
+        )
+
+    async def async_step_integration_discovery(
+        self, discovery_info: dict[str, Any]
+    ) -> FlowResult:
+        """Add a controller found by the sweep without asking again."""
+        host = discovery_info["host"]
+        
+        await self.async_set_unique_id(discovery_info["mac"])
+        self._abort_if_unique_id_configured(updates={CONF_HOST: host})
+        
+        await self._async_cache_metadata(discovery_info)
+        
+        return self.async_create_entry(
+            title=discovery_info["title"],
+            data={
+                CONF_HOST: host,
+                "model": discovery_info["model"],
+                "version": discovery_info["version"],
+            },
+        )
+
     async def async_step_zeroconf(
         self, discovery_info: zeroconf.ZeroconfServiceInfo
     ) -> FlowResult:
@@ -110,10 +242,28 @@ class HiGrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             "name": discovery_info.name,
         }
         
-        # Validate it's a HiGrow device
+        # Bekanntes Geraet (MAC im TXT-Record) -> nur Host aktualisieren, kein /mada Request
+        if mac := discovery_info.properties.get("mac"):
+            await self.async_set_unique_id(mac)
+            self._abort_if_unique_id_configured(updates={CONF_HOST: host})
+        
+        # Drucker, NAS etc. ohne Request aussortieren (TXT-Record bzw. Service-Name)
+        discovery = _async_get_discovery_filter(self.hass)
+        if not is_candidate(discovery_info.name, discovery_info.properties):
+            discovery.stats["filtered"] += 1
+            return self.async_abort(reason="not_mada_device")
+        
+        # Kuerzlich fehlgeschlagener Host -> nicht erneut pruefen
+        if discovery.is_rejected(host):
+            discovery.stats["cached"] += 1
+            return self.async_abort(reason="cannot_connect")
+        
+        # Validate it's a HiGrow device (kurzer Timeout, begrenzt parallel)
         try:
-            info = await validate_host(self.hass, host)
-        except (CannotConnect, InvalidDevice):
+            info = await discovery.async_validate(
+                host, lambda host, timeout: validate_host(self.hass, host, timeout)
+            )
+        except (CannotConnect, InvalidDevice, HostRejected):
             return self.async_abort(reason="cannot_connect")
         
         # Create unique ID from MAC
@@ -125,11 +275,18 @@ class HiGrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         
         return await self.async_step_discovery_confirm()
 
+    async def _async_cache_metadata(self, info: dict[str, Any]) -> None:
+        """Seed the metadata cache with the /mada response of the validation."""
+        cache = await async_get_metadata_cache(self.hass)
+        cache.set(info["mac"], info["version"], info["etag"], info["metadata"])
+
     async def async_step_discovery_confirm(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Confirm discovery."""
         if user_input is not None:
+            await self._async_cache_metadata(self.discovery_info)
+            
             return self.async_create_entry(
                 title=self.discovery_info["title"],
                 data={
@@ -149,6 +306,83 @@ class HiGrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+@callback
+def _async_get_discovery_filter(hass: HomeAssistant) -> DiscoveryFilter:
+    """Return the discovery filter shared by all zeroconf flows."""
+    if DATA_DISCOVERY_FILTER not in hass.data:
+        hass.data[DATA_DISCOVERY_FILTER] = DiscoveryFilter()
+    return hass.data[DATA_DISCOVERY_FILTER]
+
+
+class HiGrowOptionsFlow(config_entries.OptionsFlow):
+    """Handle HiGrow options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling options."""
+        options = self._entry.options
+        
+        if user_input is not None:
+            # Webhook-ID einmalig erzeugen, bleibt auch bei deaktiviertem Push
+            user_input[CONF_WEBHOOK_ID] = options.get(
+                CONF_WEBHOOK_ID, webhook.async_generate_id()
+            )
+            return self.async_create_entry(title="", data=user_input)
+        
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=options.get(
+                        CONF_MAX_SCAN_INTERVAL,
+                        int(DEFAULT_MAX_SCAN_INTERVAL.total_seconds()),
+                    ),
+                ): vol.All(
+                    vol.Coerce(int),
+                    vol.Range(min=30, max=int(SCAN_INTERVAL_LIMIT.total_seconds())),
+                ),
+                vol.Required(
+                    CONF_BATTERY_POWERED,
+                    default=options.get(CONF_BATTERY_POWERED, False),
+                ): bool,
+                vol.Required(
+                    CONF_PUSH_MODE,
+                    default=options.get(CONF_PUSH_MODE, False),
+                ): bool,
+                vol.Required(
+                    CONF_INSTRUMENTATION,
+                    default=options.get(CONF_INSTRUMENTATION, False),
+                ): bool,
+                vol.Required(
+                    CONF_EXTERNAL_STATISTICS,
+                    default=options.get(CONF_EXTERNAL_STATISTICS, False),
+                ): bool,
+                vol.Required(
+                    CONF_IRRIGATION,
+                    default=options.get(CONF_IRRIGATION, False),
+                ): bool,
+                vol.Required(
+                    CONF_MOISTURE_MIN,
+                    default=options.get(CONF_MOISTURE_MIN, DEFAULT_MOISTURE_MIN),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+                vol.Required(
+                    CONF_MOISTURE_TARGET,
+                    default=options.get(CONF_MOISTURE_TARGET, DEFAULT_MOISTURE_TARGET),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+                vol.Required(
+                    CONF_MAX_RUNTIME,
+                    default=options.get(CONF_MAX_RUNTIME, DEFAULT_MAX_RUNTIME),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=120)),
+            }),
+        )
+
+
 class CannotConnect(Exception):
     """Error to indicate we cannot connect."""
 
@@ -0,0 +1,115 @@
+"""Static data of one MADA controller, shared by all of its entities."""
+# V1.2 Entry-ID am Geraet (Schluessel im Befehls-Journal)
+# V1.1 Befehls-Routing aus "command" der Entity-Metadaten, beim Setup kompiliert
+# V1.0 Initial - Geraete-Info und Befehls-Endpoints einmal pro Geraet statt pro Entity
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fallback fuer Firmware ohne "command" in /mada (vor 1.6-HA):
+# RPC-Endpoint pro Switch: pumpe -> Pump (nicht Pumpe!), sonst entity_id.capitalize()
+SWITCH_ENDPOINTS = {"pumpe": "Pump"}
+
+# RPC-Methode und Parameter-Key pro Number (Teilstring der entity_id),
+# sonst <Entity>.Set mit "value"
+NUMBER_COMMANDS = {"pumpenleistung": ("Pump.SetPWM", "pwm")}
+
+# Entity-Typen mit Befehlen
+COMMAND_TYPES = ("switch", "number")
+
+
+class CommandRoute(NamedTuple):
+    """RPC method and payload schema of one actuator."""
+
+    method: str
+    param: str
+    # Feste Parameter, z.B. {"valve": 2} bei mehreren Ventilen hinter einer Methode
+    fixed: dict[str, Any] | None
+    # Key fuer die Befehls-Queue: Methode + feste Parameter
+    key: str
+
+    def params(self, value: Any) -> dict[str, Any]:
+        """Return the RPC params for a new value."""
+        if self.fixed:
+            return {**self.fixed, self.param: value}
+        return {self.param: value}
+
+
+def compile_route(entity_id: str, metadata: dict) -> CommandRoute | None:
+    """Build the route of an actuator from its metadata, None if unusable.
+
+    /mada announces {"method": "Valve.Set", "param": "on", "params": {...}}
+    as "command"; entities of older firmware use the former hard-coded map.
+    """
+    command = metadata.get("command")
+    if command is None:
+        return _legacy_route(entity_id, metadata.get("type"))
+
+    method = command.get("method") if isinstance(command, dict) else None
+    param = command.get("param") if isinstance(command, dict) else None
+    fixed = command.get("params") if isinstance(command, dict) else None
+    if (
+        not isinstance(method, str)
+        or not method
+        or not isinstance(param, str)
+        or not param
+        or not isinstance(fixed, (dict, type(None)))
+    ):
+        _LOGGER.warning(f"Invalid command for {entity_id}: {command!r}")
+        return None
+
+    if not fixed:
+        return CommandRoute(method, param, None, method)
+    return CommandRoute(method, param, fixed, f"{method} {json.dumps(fixed, sort_keys=True)}")
+
+
+def _legacy_route(entity_id: str, entity_type: str | None) -> CommandRoute | None:
+    """Guess the route like the integration did before /mada had commands."""
+    if entity_type == "switch":
+        method = f"{SWITCH_ENDPOINTS.get(entity_id, entity_id.capitalize())}.Set"
+        return CommandRoute(method, "on", None, method)
+
+    if entity_type == "number":
+        lowered = entity_id.lower()
+        for key, (method, param) in NUMBER_COMMANDS.items():
+            if key in lowered:
+                return CommandRoute(method, param, None, method)
+        method = f"{entity_id.capitalize()}.Set"
+        return CommandRoute(method, "value", None, method)
+
+    return None
+
+
+class MadaDevice:
+    """Device registry info and command routes of one controller."""
+
+    __slots__ = ("entry_id", "device_info", "routes")
+
+    def __init__(self, domain: str, entry_id: str, model: str, version: str) -> None:
+        """Initialize the device."""
+        self.entry_id = entry_id
+        # Ein Dict fuer alle Entities des Geraets
+        self.device_info = {
+            "identifiers": {(domain, entry_id)},
+            "name": "MADA Bewässerung",
+            "manufacturer": "Custom",
+            "model": model,
+            "sw_version": version,
+        }
+        # entity_id -> CommandRoute, aus den Metadaten beim Setup
+        self.routes: dict[str, CommandRoute] = {}
+
+    def compile_routes(self, entity_metadata: dict[str, dict]) -> None:
+        """Build the routing table for all actuators of the device."""
+        self.routes = {}
+        for entity_id, metadata in entity_metadata.items():
+            if metadata.get("type") not in COMMAND_TYPES:
+                continue
+            route = compile_route(entity_id, metadata)
+            if route is not None:
+                self.routes[entity_id] = route
@@ -0,0 +1,97 @@
+"""Diagnostics support for MADA."""
+# V1.7 Zaehler der externen Langzeitstatistik
+# V1.6 Zeitpunkt des wiederhergestellten Snapshots
+# V1.5 Befehls-Journal (unzustellbare Befehle dieses Geraets)
+# V1.4 Zaehler der Status-Requests (abgeholt, geteilt, wiederverwendet)
+# V1.3 Trend der Bodenfeuchte (Steigung, Zeit bis zur Schwelle)
+# V1.2 Zone des Bewaesserungs-Schedulers
+# V1.1 Zustand des Circuit-Breakers
+# V1.0 Initial - Zaehler, Verbindungs- und Instrumentierungsdaten im Diagnose-Download
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from . import DOMAIN
+from .push import CONF_WEBHOOK_ID
+
+TO_REDACT = {CONF_HOST, CONF_WEBHOOK_ID, "mac"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "restored": coordinator.restored,
+            "poll_interval": coordinator.poll_interval.total_seconds(),
+            "supports_batch": coordinator.supports_batch,
+            "breaker": {
+                "state": coordinator.breaker.state,
+                "failures": coordinator.breaker.failures,
+                "retry_delay": coordinator.breaker.retry_delay.total_seconds(),
+                **coordinator.breaker.stats,
+            },
+            "update_stats": coordinator.update_stats,
+            "status_fetches": coordinator.status_flight.stats,
+            "command_stats": coordinator.commands.stats,
+            "command_journal": (
+                {
+                    "pending": [
+                        {"method": method, "params": params}
+                        for _, method, params in coordinator.journal.pending(
+                            entry.entry_id, time.time()
+                        )
+                    ],
+                    **coordinator.journal.stats,
+                }
+                if coordinator.journal is not None
+                else None
+            ),
+            "push": (
+                {"state": coordinator.push.state, **coordinator.push.stats}
+                if coordinator.push is not None
+                else None
+            ),
+        },
+        "transport": {
+            **coordinator.transport.stats,
+            "reuse_ratio": coordinator.transport.reuse_ratio,
+            "handshake_time": coordinator.transport.handshake_time,
+            "queue_time": coordinator.transport.queue_time,
+        },
+        "instrumentation": coordinator.instrumentation.as_dict(),
+        "moisture_trend": {
+            "samples": coordinator.trend.samples,
+            "slope_per_hour": (
+                None if coordinator.trend.slope is None else coordinator.trend.slope * 3600
+            ),
+            "moisture_min": coordinator.moisture_min,
+            "watering_in": coordinator.watering_in,
+        },
+        "external_statistics": (
+            {"channels": list(coordinator.longterm.channels), **coordinator.longterm.stats}
+            if coordinator.longterm is not None
+            else None
+        ),
+        "irrigation": (
+            coordinator.zone.as_dict(time.monotonic())
+            if coordinator.zone is not None
+            else None
+        ),
+        "data": coordinator.data,
+    }
@@ -0,0 +1,101 @@
+"""Filtering and bounded validation of zeroconf discoveries."""
+# V1.1 Vorfilter prueft den Service-Namen wie der Matcher im Manifest (nicht den Hostnamen)
+# V1.0 Initial - TXT/Hostname-Vorfilter, Negativ-Cache pro Host, begrenzte parallele Pruefung
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# TXT-Record der Firmware: MDNS.addServiceTxt("http", "tcp", "type", "irrigation")
+TXT_TYPE = "irrigation"
+# Praefix des Service-Namens, wie der zeroconf-Matcher "name": "higrow*" in manifest.json
+# (die Firmware meldet MDNS_HOSTNAME als Instanzname)
+SERVICE_NAME_PREFIXES = ("higrow",)
+
+# Timeout fuer /mada bei Discovery - ein MADA antwortet im LAN in < 1 s
+DISCOVERY_TIMEOUT = 3
+# Gleichzeitige Pruefungen
+MAX_CONCURRENT_VALIDATIONS = 4
+# Wie lange ein Host nach fehlgeschlagener Pruefung ignoriert wird (Sekunden)
+NEGATIVE_CACHE_TTL = 30 * 60
+
+# hass.data Key fuer den gemeinsamen Filter aller Discovery-Flows
+DATA_DISCOVERY_FILTER = "mada_discovery_filter"
+
+
+def is_candidate(name: str | None, properties: Mapping[str, Any]) -> bool:
+    """Return True if a zeroconf announcement may come from a MADA controller.
+
+    Checks the same fields as the zeroconf matchers in manifest.json: the
+    TXT record type or the service name, e.g. "higrow._http._tcp.local.".
+    """
+    if properties.get("type") == TXT_TYPE:
+        return True
+
+    # Wie HA: Service-Name ohne Gross-/Kleinschreibung
+    return (name or "").lower().startswith(SERVICE_NAME_PREFIXES)
+
+
+class DiscoveryFilter:
+    """Shared state of all zeroconf flows: negative cache and concurrency limit."""
+
+    def __init__(
+        self,
+        timeout: float = DISCOVERY_TIMEOUT,
+        max_concurrent: int = MAX_CONCURRENT_VALIDATIONS,
+        negative_ttl: float = NEGATIVE_CACHE_TTL,
+    ) -> None:
+        """Initialize an empty cache."""
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._rejected: dict[str, float] = {}
+        self.stats = {"filtered": 0, "cached": 0, "validated": 0, "rejected": 0}
+
+    def is_rejected(self, host: str) -> bool:
+        """Return True if the host failed validation within the TTL."""
+        expires = self._rejected.get(host)
+        if expires is None:
+            return False
+        if expires <= time.monotonic():
+            del self._rejected[host]
+            return False
+        return True
+
+    def reject(self, host: str) -> None:
+        """Remember a failed validation."""
+        self._rejected[host] = time.monotonic() + self.negative_ttl
+
+    async def async_validate(
+        self,
+        host: str,
+        validate: Callable[[str, float], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """Run validate(host, timeout) within the concurrency limit.
+
+        Exceptions of validate are passed on; the host is then skipped by
+        further discoveries until the negative cache entry expires.
+        """
+        async with self._semaphore:
+            # Waehrend des Wartens kann ein anderer Flow den Host abgelehnt haben
+            if self.is_rejected(host):
+                self.stats["cached"] += 1
+                raise HostRejected(host)
+
+            self.stats["validated"] += 1
+            try:
+                return await validate(host, self.timeout)
+            except Exception:
+                self.stats["rejected"] += 1
+                self.reject(host)
+                raise
+
+
+class HostRejected(Exception):
+    """Error to indicate the host recently failed validation."""
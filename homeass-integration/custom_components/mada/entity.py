@@ -0,0 +1,97 @@
+"""Base class of the MADA entities created from ESP32 entity metadata."""
+# V1.3 MadaComputedEntity: berechnete Werte (Diagnose, Vorhersage) ebenfalls ueber ValueWatch
+# V1.2 Ohne __slots__ - Entity aus HA hat ein __dict__, die Slots sparten nichts
+# V1.1 Werte aus dem Snapshot (nach Neustart) als "restored" markiert
+# V1.0 Initial - Gemeinsame Basis, Geraete-Info geteilt, Metadaten nur im Konstruktor
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .change_filter import ValueWatch, parse_deadband
+from .resolver import MISSING, compile_data_path
+
+# Attribute solange der Wert aus dem Snapshot vor dem Neustart stammt
+ATTR_RESTORED = "restored"
+ATTR_LAST_SEEN = "last_seen"
+
+
+class MadaEntity(CoordinatorEntity):
+    """Entity backed by one data_path of the coordinator's status.
+
+    The metadata dict from /mada is only read here; entities keep the
+    compiled accessor, the change watch and their HA attributes.
+    """
+
+    def __init__(self, coordinator, entry_id: str, entity_id: str, metadata: dict) -> None:
+        """Initialize the entity from its metadata."""
+        super().__init__(coordinator)
+
+        self._entity_id = entity_id
+        self._resolve = compile_data_path(entity_id, metadata.get("data_path"))
+        self._watch = ValueWatch(self._resolve, parse_deadband(metadata.get("deadband")))
+
+        # Unique ID und Name
+        self._attr_unique_id = f"{entry_id}_{entity_id}"
+        self._attr_name = f"MADA {metadata.get('name', entity_id)}"
+
+        # Device info - ein Dict pro Geraet
+        self._attr_device_info = coordinator.device.device_info
+
+        # Icon (optional aus ESP32 Metadaten, sonst Default der Plattform)
+        icon = metadata.get("icon")
+        if icon:
+            self._attr_icon = icon
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the value moved beyond the deadband."""
+        if self.coordinator.async_should_update(self._watch):
+            self.coordinator.async_write_state(self)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Mark values restored from the snapshot until the first live status."""
+        restored = self.coordinator.restored
+        if restored is None:
+            return None
+        return {
+            ATTR_RESTORED: True,
+            ATTR_LAST_SEEN: dt_util.utc_from_timestamp(restored).isoformat(),
+        }
+
+    def _current_value(self) -> Any:
+        """Return the value at data_path, None if missing."""
+        value = self._resolve(self.coordinator.data)
+        if value is MISSING:
+            return None
+
+        return value
+
+
+class MadaComputedEntity(CoordinatorEntity):
+    """Entity whose value is computed from the coordinator, not read from a data_path.
+
+    Goes through the same change filter as MadaEntity, so a poll that
+    leaves the value unchanged writes no state.
+    """
+
+    def __init__(self, coordinator) -> None:
+        """Initialize the entity and its change watch."""
+        super().__init__(coordinator)
+
+        self._watch = ValueWatch(self._watched_value)
+
+    def _watched_value(self, data: Any) -> Any:
+        """Return the value the change watch compares (the state)."""
+        return self.native_value
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the computed value changed."""
+        if self.coordinator.async_should_update(self._watch):
+            self.coordinator.async_write_state(self)
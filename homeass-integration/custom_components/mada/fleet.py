@@ -0,0 +1,132 @@
+"""Fleet-wide poll scheduler for MADA controllers."""
+# V1.3 Ohne Live-Fetch im Setup (Snapshot) kommt der erste Poll sofort; laufende Polls belegen ihren Slot
+# V1.2 Neues Mitglied bekommt die groesste freie Luecke, bestehende Termine bleiben
+# V1.1 Naechster Poll wird nach Abschluss mit aktuellem Intervall geplant
+# V1.0 Initial - Ein Scheduler fuer alle Controller, Polls gleichmaessig verteilt
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from datetime import timedelta
+from typing import Any, Protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximal gleichzeitige HTTP-Requests ueber alle Controller
+MAX_CONCURRENT_POLLS = 8
+
+
+class FleetMember(Protocol):
+    """What the scheduler needs from a per-device coordinator."""
+
+    poll_interval: timedelta
+
+    async def async_refresh(self) -> None:
+        """Fetch fresh data from the device."""
+
+
+class MadaFleetScheduler:
+    """Poll all registered controllers, staggered and with bounded concurrency."""
+
+    def __init__(
+        self,
+        interval: timedelta,
+        max_concurrent: int = MAX_CONCURRENT_POLLS,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.interval = interval
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self._due: dict[Any, float] = {}
+        self._polls: dict[Any, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        """Return the number of registered controllers."""
+        return len(self._due)
+
+    def register(self, member: FleetMember, polled: bool = True) -> None:
+        """Add a controller in the largest free gap of the next interval.
+
+        polled is False if setup did not fetch live data (restored snapshot);
+        a controller alone in the schedule is then polled right away.
+        """
+        # Bestehende Termine (adaptiv, Circuit-Breaker) bleiben unangetastet
+        self._due[member] = self._free_slot(asyncio.get_running_loop().time(), polled)
+        self._wakeup.set()
+
+    def unregister(self, member: FleetMember) -> None:
+        """Remove a controller from the schedule."""
+        self._due.pop(member, None)
+
+    def _free_slot(self, now: float, polled: bool = True) -> float:
+        """Return the middle of the largest gap between the polls due within one interval."""
+        interval = self.interval.total_seconds()
+        # Laufende (inf) und faellige Polls zaehlen als jetzt - sonst landen mehrere
+        # Neuzugaenge ohne Live-Poll alle auf "sofort"
+        phases = sorted(
+            0.0 if due == math.inf else max(due - now, 0.0)
+            for due in self._due.values()
+            if due == math.inf or due <= now + interval
+        )
+
+        # Allein im Zeitplan: hat das Setup schon live abgefragt, erst nach einem
+        # Intervall - sonst (nur Snapshot) sofort, die Werte sind evtl. alt
+        if not phases:
+            return now + interval if polled else now
+
+        # Zyklisch: die Luecke ueber das Intervallende hinweg zaehlt mit
+        gaps = [(phases[0] + interval - phases[-1], phases[-1])]
+        gaps += [(end - start, start) for start, end in zip(phases, phases[1:])]
+        width, start = max(gaps)
+        return now + ((start + width / 2) % interval or interval)
+
+    def _poll(self, member: FleetMember) -> None:
+        """Start a poll; the next one is scheduled when it has finished."""
+        self._due[member] = math.inf
+
+        task = asyncio.get_running_loop().create_task(self._async_poll(member))
+        self._polls[member] = task
+        task.add_done_callback(lambda _: self._polls.pop(member, None))
+
+    async def _async_poll(self, member: FleetMember) -> None:
+        """Refresh one controller and reschedule it with its current interval."""
+        try:
+            await member.async_refresh()
+        finally:
+            # Intervall erst nach dem Poll lesen - es kann sich adaptiv geaendert haben
+            if member in self._due:
+                self._due[member] = (
+                    asyncio.get_running_loop().time()
+                    + member.poll_interval.total_seconds()
+                )
+                self._wakeup.set()
+
+    async def async_run(self) -> None:
+        """Run the schedule until cancelled."""
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True:
+                now = loop.time()
+                for member, due in list(self._due.items()):
+                    if due <= now:
+                        self._poll(member)
+
+                next_due = min(self._due.values(), default=math.inf)
+                self._wakeup.clear()
+
+                try:
+                    if next_due == math.inf:
+                        await self._wakeup.wait()
+                    else:
+                        await asyncio.wait_for(
+                            self._wakeup.wait(), max(next_due - loop.time(), 0)
+                        )
+                except asyncio.TimeoutError:
+                    pass
+
+        finally:
+            for task in list(self._polls.values()):
+                task.cancel()
@@ -0,0 +1,214 @@
+"""In-memory time series of the MADA readings with downsampled buckets."""
+# V1.0 Initial - Ringpuffer mit festem Speicher pro Geraet, min/max/mean je 1 min / 15 min / 1 h
+
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Any
+
+from .resolver import MISSING, compile_data_path
+
+# Aufgezeichnete Kanaele: Name -> Pfad im GetStatus Payload
+HISTORY_CHANNELS = {
+    "moisture": ["soil", "moisture"],
+    "salt": ["soil", "salt"],
+    "battery": ["battery", "percent"],
+    "temperature": ["temperature", "value"],
+    "humidity": ["humidity", "value"],
+    "light": ["light", "lux"],
+}
+
+# Rohwerte: 720 Polls = 1 h bei 5 s (Pumpe laeuft), 6 h bei 30 s
+RAW_CAPACITY = 720
+
+# Aufloesung -> (Bucket-Breite in Sekunden, Anzahl Buckets)
+RESOLUTIONS = {
+    "1min": (60, 240),  # 4 Stunden
+    "15min": (900, 192),  # 2 Tage
+    "1h": (3600, 168),  # 7 Tage
+}
+
+_NAN = float("nan")
+
+
+class _BucketRing:
+    """Fixed number of min/max/sum/count buckets of one width."""
+
+    __slots__ = ("width", "capacity", "channels", "start", "min", "max", "sum", "count", "head", "size")
+
+    def __init__(self, width: int, capacity: int, channels: int) -> None:
+        """Allocate all arrays up front."""
+        self.width = width
+        self.capacity = capacity
+        self.channels = channels
+        # Slot i, Kanal c liegt bei i * channels + c
+        self.start = array("d", bytes(8 * capacity))
+        self.min = array("f", bytes(4 * capacity * channels))
+        self.max = array("f", bytes(4 * capacity * channels))
+        self.sum = array("d", bytes(8 * capacity * channels))
+        self.count = array("I", bytes(4 * capacity * channels))
+        self.head = -1
+        self.size = 0
+
+    def add(self, timestamp: float, values: list[float]) -> None:
+        """Fold one sample into its bucket."""
+        bucket = timestamp - timestamp % self.width
+
+        # Neuer Bucket nur vorwaerts - Uhr-Spruenge landen im aktuellen
+        if self.size == 0 or bucket > self.start[self.head]:
+            self.head = (self.head + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+            self.start[self.head] = bucket
+            base = self.head * self.channels
+            for index in range(base, base + self.channels):
+                self.count[index] = 0
+                self.sum[index] = 0.0
+
+        base = self.head * self.channels
+        for channel, value in enumerate(values):
+            if value != value:  # NaN - Wert fehlte im Payload
+                continue
+            index = base + channel
+            if self.count[index]:
+                if value < self.min[index]:
+                    self.min[index] = value
+                if value > self.max[index]:
+                    self.max[index] = value
+            else:
+                self.min[index] = value
+                self.max[index] = value
+            self.sum[index] += value
+            self.count[index] += 1
+
+    def slots(self):
+        """Yield slot indices from oldest to newest."""
+        for offset in range(self.size - 1, -1, -1):
+            yield (self.head - offset) % self.capacity
+
+
+class MadaHistory:
+    """Raw readings and downsampled aggregates of one controller."""
+
+    def __init__(
+        self,
+        raw_capacity: int = RAW_CAPACITY,
+        resolutions: dict[str, tuple[int, int]] = RESOLUTIONS,
+    ) -> None:
+        """Initialize the buffers; memory does not grow afterwards."""
+        self.channels = list(HISTORY_CHANNELS)
+        self._resolvers = [
+            compile_data_path(f"history_{name}", path)
+            for name, path in HISTORY_CHANNELS.items()
+        ]
+        width = len(self.channels)
+
+        self._raw_capacity = raw_capacity
+        self._raw_time = array("d", bytes(8 * raw_capacity))
+        self._raw_values = array("f", bytes(4 * raw_capacity * width))
+        self._raw_head = -1
+        self._raw_size = 0
+
+        self._rings = {
+            name: _BucketRing(bucket_width, capacity, width)
+            for name, (bucket_width, capacity) in resolutions.items()
+        }
+
+    @property
+    def resolutions(self) -> list[str]:
+        """Return the available bucket resolutions."""
+        return list(self._rings)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the buffers."""
+        total = _nbytes(self._raw_time, self._raw_values)
+        for ring in self._rings.values():
+            total += _nbytes(ring.start, ring.min, ring.max, ring.sum, ring.count)
+        return total
+
+    def add(self, timestamp: float, data: Any) -> None:
+        """Record the numeric values of one GetStatus payload."""
+        values = []
+        for resolve in self._resolvers:
+            value = resolve(data)
+            if value is MISSING or isinstance(value, bool) or not isinstance(value, (int, float)):
+                value = _NAN
+            values.append(float(value))
+
+        width = len(values)
+        self._raw_head = (self._raw_head + 1) % self._raw_capacity
+        self._raw_size = min(self._raw_size + 1, self._raw_capacity)
+        self._raw_time[self._raw_head] = timestamp
+        self._raw_values[self._raw_head * width : (self._raw_head + 1) * width] = array("f", values)
+
+        for ring in self._rings.values():
+            ring.add(timestamp, values)
+
+    def raw(
+        self, channels: list[str] | None = None, since: float | None = None
+    ) -> dict[str, list[tuple[float, float]]]:
+        """Return (timestamp, value) pairs per channel, oldest first."""
+        selected = self._select(channels)
+        width = len(self.channels)
+        result: dict[str, list[tuple[float, float]]] = {name: [] for name, _ in selected}
+
+        for offset in range(self._raw_size - 1, -1, -1):
+            slot = (self._raw_head - offset) % self._raw_capacity
+            timestamp = self._raw_time[slot]
+            if since is not None and timestamp < since:
+                continue
+            for name, channel in selected:
+                value = self._raw_values[slot * width + channel]
+                if not math.isnan(value):
+                    result[name].append((timestamp, _round(value)))
+
+        return result
+
+    def buckets(
+        self,
+        resolution: str,
+        channels: list[str] | None = None,
+        since: float | None = None,
+    ) -> dict[str, list[dict[str, float]]]:
+        """Return {start, min, max, mean} buckets per channel, oldest first."""
+        ring = self._rings[resolution]
+        selected = self._select(channels)
+        result: dict[str, list[dict[str, float]]] = {name: [] for name, _ in selected}
+
+        for slot in ring.slots():
+            start = ring.start[slot]
+            if since is not None and start + ring.width <= since:
+                continue
+            base = slot * ring.channels
+            for name, channel in selected:
+                index = base + channel
+                count = ring.count[index]
+                if not count:
+                    continue
+                result[name].append(
+                    {
+                        "start": start,
+                        "min": _round(ring.min[index]),
+                        "max": _round(ring.max[index]),
+                        "mean": _round(ring.sum[index] / count),
+                    }
+                )
+
+        return result
+
+    def _select(self, channels: list[str] | None) -> list[tuple[str, int]]:
+        """Map channel names to their column, unknown names are ignored."""
+        if not channels:
+            return list(zip(self.channels, range(len(self.channels))))
+        return [(name, self.channels.index(name)) for name in channels if name in self.channels]
+
+
+def _round(value: float) -> float:
+    """Round float32 artefacts away (42.099998 -> 42.1)."""
+    return round(value, 2)
+
+
+def _nbytes(*arrays: array) -> int:
+    """Return the buffer size of some arrays."""
+    return sum(len(item) * item.itemsize for item in arrays)
@@ -0,0 +1,145 @@
+"""Instrumentation of MADA HTTP calls and entity updates."""
+# V1.0 Initial - Latenz-Histogramme, Timeouts, Payload-Bytes, Updates pro Entity (abschaltbar)
+
+from __future__ import annotations
+
+import bisect
+import time
+from collections import Counter
+
+# Options-Key (OptionsFlow)
+CONF_INSTRUMENTATION = "instrumentation"
+
+# Obergrenzen der Histogramm-Buckets in Millisekunden, letzter Bucket ist offen
+LATENCY_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Gemessene Abschnitte
+TIMER_UPDATE = "update"  # _async_update_data: Request bis Antwort gelesen
+TIMER_DECODE = "decode"  # JSON-Dekodierung von GetStatus
+TIMER_METADATA = "metadata"  # fetch_entity_metadata
+TIMER_COMMAND = "command"  # RPC-Befehl bzw. Batch
+TIMER_STATE_WRITE = "state_write"  # async_write_ha_state einer Entity
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize empty buckets."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, millis: float) -> None:
+        """Add one measurement."""
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, millis)] += 1
+        self.count += 1
+        self.total += millis
+        if millis > self.max:
+            self.max = millis
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the upper bucket bound below which fraction of the values lie."""
+        if not self.count:
+            return None
+
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                # Offener letzter Bucket -> groesster gemessener Wert
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    def as_dict(self) -> dict:
+        """Return the histogram for diagnostics."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max, 2),
+            "buckets_ms": {
+                f"<={bound}": count for bound, count in zip(LATENCY_BUCKETS, self.counts)
+            }
+            | {f">{LATENCY_BUCKETS[-1]}": self.counts[-1]},
+        }
+
+
+class MadaInstrumentation:
+    """Collect timings and counters of one coordinator.
+
+    Disabled instances only pay for the enabled check: start() returns 0
+    and the recording methods return immediately.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """Initialize the collectors."""
+        self.enabled = enabled
+        self.histograms: dict[str, Histogram] = {}
+        self.timeouts: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.payload_bytes: Counter[str] = Counter()
+        self.entity_updates: Counter[str] = Counter()
+        self.entity_commands: Counter[str] = Counter()
+
+    def start(self) -> float:
+        """Return a start timestamp, 0 if disabled."""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, timer: str, start: float) -> None:
+        """Record the time since start."""
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(timer)
+        if histogram is None:
+            histogram = self.histograms[timer] = Histogram()
+        histogram.observe((time.perf_counter() - start) * 1000)
+
+    def state_written(self, entity_id: str, start: float) -> None:
+        """Record one state write of an entity."""
+        if not self.enabled:
+            return
+        self.stop(TIMER_STATE_WRITE, start)
+        self.entity_updates[entity_id] += 1
+
+    def command(self, entity_id: str) -> None:
+        """Count a command issued by an entity."""
+        if self.enabled:
+            self.entity_commands[entity_id] += 1
+
+    def timeout(self, timer: str) -> None:
+        """Count a timeout."""
+        if self.enabled:
+            self.timeouts[timer] += 1
+
+    def error(self, timer: str) -> None:
+        """Count a failed call."""
+        if self.enabled:
+            self.errors[timer] += 1
+
+    def payload(self, timer: str, size: int) -> None:
+        """Count received payload bytes."""
+        if self.enabled:
+            self.payload_bytes[timer] += size
+
+    def percentile(self, timer: str, fraction: float) -> float | None:
+        """Return a percentile of a timer in ms, None without data."""
+        histogram = self.histograms.get(timer)
+        return histogram.percentile(fraction) if histogram else None
+
+    def as_dict(self) -> dict:
+        """Return all measurements for the diagnostics download."""
+        return {
+            "enabled": self.enabled,
+            "timers": {name: histogram.as_dict() for name, histogram in self.histograms.items()},
+            "timeouts": dict(self.timeouts),
+            "errors": dict(self.errors),
+            "payload_bytes": dict(self.payload_bytes),
+            "entity_updates": dict(self.entity_updates),
+            "entity_commands": dict(self.entity_commands),
+        }
@@ -0,0 +1,201 @@
+"""Multi-zone irrigation scheduler for MADA controllers."""
+# V1.1 Kein Start bei steigender Bodenfeuchte (Regen), Trend aus prediction.py
+# V1.0 Initial - Giessen nach Bodenfeuchte, globales Limit fuer laufende Pumpen, virtuelle Uhr
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+from .resolver import compile_data_path
+
+_LOGGER = logging.getLogger(__name__)
+
+# Options-Keys (OptionsFlow)
+CONF_IRRIGATION = "irrigation"
+CONF_MOISTURE_MIN = "moisture_min"
+CONF_MOISTURE_TARGET = "moisture_target"
+CONF_MAX_RUNTIME = "max_runtime"
+
+# Giessen unter MOISTURE_MIN %, stoppen ab MOISTURE_TARGET %
+DEFAULT_MOISTURE_MIN = 30
+DEFAULT_MOISTURE_TARGET = 45
+# Laengste Laufzeit pro Giessvorgang (Minuten)
+DEFAULT_MAX_RUNTIME = 10
+
+# Gleichzeitig laufende Pumpen ueber alle Controller (Wasserversorgung, Netzteil)
+MAX_RUNNING_ZONES = 2
+# Pause nach einem Giessvorgang - Wasser muss erst einsickern (Sekunden)
+MIN_PAUSE = 30 * 60
+# Aelter als das (Sekunden) gilt ein Messwert nicht fuer einen Start
+STALE_READING = 15 * 60
+# Planungstakt in Home Assistant
+SCHEDULE_INTERVAL = timedelta(seconds=30)
+
+_pump_running = compile_data_path("pump", ["pump", "running"])
+_soil_moisture = compile_data_path("soil_moisture", ["soil", "moisture"])
+
+
+class IrrigationZone:
+    """Moisture reading, limits and pump state of one watered zone."""
+
+    __slots__ = (
+        "name",
+        "send",
+        "moisture_min",
+        "moisture_target",
+        "max_runtime",
+        "moisture",
+        "pump_running",
+        "reading_time",
+        "rising",
+        "started",
+        "pause_until",
+        "stats",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        send: Callable[[bool], None],
+        moisture_min: float = DEFAULT_MOISTURE_MIN,
+        moisture_target: float = DEFAULT_MOISTURE_TARGET,
+        max_runtime: float = DEFAULT_MAX_RUNTIME * 60,
+    ) -> None:
+        """Initialize the zone; send(on) queues the pump command."""
+        self.name = name
+        self.send = send
+        self.moisture_min = moisture_min
+        self.moisture_target = max(moisture_target, moisture_min)
+        self.max_runtime = max_runtime
+        self.moisture: float | None = None
+        self.pump_running = False
+        self.reading_time: float | None = None
+        # Bodenfeuchte steigt laut Trend (Regen) - Giessen unnoetig
+        self.rising = False
+        # Startzeit, solange der Scheduler die Pumpe laufen laesst
+        self.started: float | None = None
+        self.pause_until = 0.0
+        self.stats = {"starts": 0, "stops": 0, "runtime": 0.0}
+
+    def update(self, data: Any, now: float, rising: bool = False) -> None:
+        """Take moisture and pump state from a GetStatus payload."""
+        moisture = _soil_moisture(data)
+        if not isinstance(moisture, bool) and isinstance(moisture, (int, float)):
+            self.moisture = moisture
+            self.reading_time = now
+        self.pump_running = _pump_running(data) is True
+        self.rising = rising
+
+    @property
+    def busy(self) -> bool:
+        """Return True if the pump runs, started by us or by hand."""
+        return self.started is not None or self.pump_running
+
+    def as_dict(self, now: float) -> dict:
+        """Return the zone state for diagnostics."""
+        return {
+            "moisture": self.moisture,
+            "pump_running": self.pump_running,
+            "rising": self.rising,
+            "running_for": None if self.started is None else round(now - self.started),
+            "pause_remaining": max(round(self.pause_until - now), 0),
+            **self.stats,
+        }
+
+
+class IrrigationScheduler:
+    """Plan watering across all zones under a global pump limit.
+
+    The scheduler has no clock of its own: tick(now) is called by Home
+    Assistant with time.monotonic() and by the simulation with a virtual
+    clock, so a week of watering can be replayed in seconds.
+    """
+
+    def __init__(self, max_running: int = MAX_RUNNING_ZONES, min_pause: float = MIN_PAUSE) -> None:
+        """Initialize without zones."""
+        self.max_running = max_running
+        self.min_pause = min_pause
+        self.zones: dict[str, IrrigationZone] = {}
+        # Starts, die wegen des Limits warten mussten
+        self.stats = {"deferred": 0}
+
+    def __len__(self) -> int:
+        """Return the number of zones."""
+        return len(self.zones)
+
+    def add_zone(self, key: str, zone: IrrigationZone) -> None:
+        """Add a zone (one per controller)."""
+        self.zones[key] = zone
+
+    def remove_zone(self, key: str) -> None:
+        """Remove a zone, stopping its pump if we started it."""
+        zone = self.zones.pop(key, None)
+        if zone is not None and zone.started is not None:
+            zone.send(False)
+
+    def plan(self, now: float) -> list[tuple[IrrigationZone, bool]]:
+        """Return the (zone, on) commands due at now and update the zone state."""
+        actions: list[tuple[IrrigationZone, bool]] = []
+
+        # Zuerst stoppen - gibt Platz im Limit frei
+        for zone in self.zones.values():
+            if zone.started is None:
+                continue
+            wet = zone.moisture is not None and zone.moisture >= zone.moisture_target
+            if wet or now - zone.started >= zone.max_runtime:
+                zone.stats["stops"] += 1
+                zone.stats["runtime"] += now - zone.started
+                zone.started = None
+                zone.pump_running = False
+                zone.pause_until = now + self.min_pause
+                actions.append((zone, False))
+
+        # Trockenste Zone zuerst
+        dry = sorted(
+            (
+                zone
+                for zone in self.zones.values()
+                if not zone.busy
+                and zone.moisture is not None
+                and zone.moisture < zone.moisture_min
+                and not zone.rising
+                and now - zone.reading_time <= STALE_READING
+                and now >= zone.pause_until
+            ),
+            key=lambda zone: zone.moisture,
+        )
+        free = self.max_running - sum(zone.busy for zone in self.zones.values())
+
+        for index, zone in enumerate(dry):
+            if index >= free:
+                self.stats["deferred"] += len(dry) - index
+                break
+            zone.stats["starts"] += 1
+            zone.started = now
+            zone.pump_running = True
+            actions.append((zone, True))
+
+        return actions
+
+    def tick(self, now: float) -> int:
+        """Plan and dispatch all due commands in one go, return their number."""
+        actions = self.plan(now)
+
+        # Befehle eines Takts landen gemeinsam in den Queues der Controller
+        # (ein mada.Batch pro Controller, Stopps vor Starts)
+        for zone, on in actions:
+            _LOGGER.info(f"Irrigation {zone.name}: pump {'on' if on else 'off'} at {zone.moisture} %")
+            zone.send(on)
+
+        return len(actions)
+
+    def as_dict(self) -> dict:
+        """Return the scheduler state for diagnostics."""
+        return {
+            "max_running": self.max_running,
+            "running": sum(zone.busy for zone in self.zones.values()),
+            **self.stats,
+        }
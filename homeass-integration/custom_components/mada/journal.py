@@ -0,0 +1,127 @@
+"""Persistent journal of undelivered MADA commands."""
+# V1.0 Initial - Fehlgeschlagene Befehle pro Geraet, nur der letzte Wert pro Aktor, Ablaufzeit, Replay
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "mada.commands"
+
+# hass.data Key fuer das geladene Journal
+DATA_COMMAND_JOURNAL = "mada_command_journal"
+
+# Verzoegerung beim Speichern - viele Befehle in einem Schreibvorgang
+JOURNAL_SAVE_DELAY = 5
+
+# So lange (Sekunden) wird ein Befehl nachgeholt: Einschalten/Werte kurz,
+# Ausschalten lange - eine Pumpe soll nicht Stunden spaeter anlaufen, aber sicher stoppen
+COMMAND_TTL = 10 * 60
+STOP_TTL = 24 * 3600
+
+# Felder eines Eintrags (Liste, kompakt im JSON)
+_SEQ, _METHOD, _PARAMS, _EXPIRES = range(4)
+
+
+class CommandJournal:
+    """Undelivered commands of all controllers, the latest one per actuator.
+
+    Entries are collapsed per route key, so a device that is offline for
+    hours holds at most one entry per actuator. Sequence numbers keep the
+    order of the original commands for the replay. The dict is persisted
+    by a delayed save callback; clearing a key that has no entry (the
+    normal case for delivered commands) costs one dict lookup.
+    """
+
+    def __init__(self, save: Callable[[], None]) -> None:
+        """Initialize an empty journal; save schedules a write of as_dict()."""
+        self._save = save
+        # device -> key -> [seq, method, params, expires]
+        self._devices: dict[str, dict[str, list]] = {}
+        self._seq = 0
+        self.stats = {"recorded": 0, "collapsed": 0, "cleared": 0, "expired": 0}
+
+    def load(self, data: dict | None) -> None:
+        """Restore the journal from its stored form."""
+        if not data:
+            return
+        self._seq = data.get("seq", 0)
+        self._devices = {
+            device: entries for device, entries in data.get("devices", {}).items() if entries
+        }
+
+    def as_dict(self) -> dict:
+        """Return the stored form of the journal."""
+        return {"seq": self._seq, "devices": self._devices}
+
+    def __len__(self) -> int:
+        """Return the number of undelivered commands."""
+        return sum(len(entries) for entries in self._devices.values())
+
+    def has(self, device: str) -> bool:
+        """Return True if commands wait for this device."""
+        return device in self._devices
+
+    def record(
+        self,
+        device: str,
+        key: str,
+        method: str,
+        params: dict,
+        now: float,
+        ttl: float | None = None,
+    ) -> None:
+        """Keep a failed command until it is delivered or expires."""
+        entries = self._devices.setdefault(device, {})
+        entry = entries.get(key)
+        if entry is not None:
+            if entry[_METHOD] == method and entry[_PARAMS] == params:
+                # Erneut fehlgeschlagenes Replay - Reihenfolge und Ablaufzeit bleiben
+                return
+            self.stats["collapsed"] += 1
+            # Neuer Wert kommt ans Ende der Reihenfolge
+            del entries[key]
+
+        self._seq += 1
+        entries[key] = [self._seq, method, params, now + (COMMAND_TTL if ttl is None else ttl)]
+        self.stats["recorded"] += 1
+        self._save()
+
+    def clear(self, device: str, key: str) -> None:
+        """Forget the entry of an actuator after a delivered command."""
+        entries = self._devices.get(device)
+        if entries is None or entries.pop(key, None) is None:
+            return
+        if not entries:
+            del self._devices[device]
+        self.stats["cleared"] += 1
+        self._save()
+
+    def pending(self, device: str, now: float) -> list[tuple[str, str, dict]]:
+        """Return the (key, method, params) to replay in order, dropping expired ones."""
+        entries = self._devices.get(device)
+        if not entries:
+            return []
+
+        expired = [key for key, entry in entries.items() if entry[_EXPIRES] <= now]
+        for key in expired:
+            _LOGGER.info(f"Dropping expired command {entries[key][_METHOD]} for {device}")
+            del entries[key]
+        if expired:
+            self.stats["expired"] += len(expired)
+            if not entries:
+                del self._devices[device]
+            self._save()
+
+        return [
+            (key, entry[_METHOD], entry[_PARAMS])
+            for key, entry in sorted(entries.items(), key=lambda item: item[1][_SEQ])
+        ]
+
+    def remove_device(self, device: str) -> None:
+        """Forget all commands of a removed device."""
+        if self._devices.pop(device, None) is not None:
+            self._save()
@@ -0,0 +1,164 @@
+"""Hourly long-term statistics of MADA measurement sensors, aggregated in the integration."""
+# V1.0 Initial - Zeitgewichteter Mittelwert, Min/Max pro Stunde und data_path, Import in Bloecken
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from .resolver import MISSING, compile_data_path
+
+# Options-Key (OptionsFlow)
+CONF_EXTERNAL_STATISTICS = "external_statistics"
+
+# Messwert-Sensoren schreiben ihren State hoechstens so oft (Sekunden)
+STATE_WRITE_INTERVAL = 15 * 60
+# Laengere Luecken (Geraet offline) werden nicht mit dem letzten Wert gefuellt
+MAX_GAP = 15 * 60
+
+HOUR = 3600
+
+_INVALID_ID_CHARS = re.compile(r"[^a-z0-9_]+")
+
+
+def statistic_object_id(device: str, entity_id: str) -> str:
+    """Return the object id part of an external statistic (lowercase, a-z0-9_)."""
+    slug = _INVALID_ID_CHARS.sub("_", f"{device}_{entity_id}".lower())
+    return re.sub("_+", "_", slug).strip("_")
+
+
+class _Channel:
+    """Running hour of one data_path."""
+
+    __slots__ = (
+        "resolve",
+        "name",
+        "unit",
+        "hour",
+        "area",
+        "duration",
+        "low",
+        "high",
+        "last_time",
+        "last_value",
+        "rows",
+    )
+
+    def __init__(self, resolve, name: str, unit: str | None) -> None:
+        self.resolve = resolve
+        self.name = name
+        self.unit = unit
+        self.hour: float | None = None
+        self.area = 0.0
+        self.duration = 0.0
+        self.low = self.high = 0.0
+        self.last_time: float | None = None
+        self.last_value: float | None = None
+        # Abgeschlossene Stunden: (Start, Mittel, Min, Max)
+        self.rows: list[tuple[float, float, float, float]] = []
+
+    def add(self, now: float, value: float | None) -> None:
+        """Integrate the previous value up to now, then take the new one."""
+        last_time, last_value = self.last_time, self.last_value
+        if last_value is not None and 0 < now - last_time <= MAX_GAP:
+            # Letzter Wert gilt bis jetzt - ueber Stundengrenzen aufteilen
+            cursor = last_time
+            while cursor < now:
+                end = min(self.hour + HOUR, now)
+                self.area += last_value * (end - cursor)
+                self.duration += end - cursor
+                cursor = end
+                if cursor == self.hour + HOUR:
+                    # Stunde fertig, der gehaltene Wert beginnt die naechste
+                    self._close()
+                    self._open(cursor, last_value)
+        elif self.hour is not None and now >= self.hour + HOUR:
+            self._close()
+            self.hour = None
+
+        self.last_time = now
+        self.last_value = value
+        if value is None:
+            return
+        if self.hour is None or now >= self.hour + HOUR:
+            self._open(now - now % HOUR, value)
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+
+    def _open(self, hour: float, value: float) -> None:
+        self.hour = hour
+        self.area = self.duration = 0.0
+        self.low = self.high = value
+
+    def _close(self) -> None:
+        if self.hour is None:
+            return
+        if self.duration > 0:
+            mean = self.area / self.duration
+        else:
+            # Nur ein Messwert in der Stunde
+            mean = (self.low + self.high) / 2
+        self.rows.append((self.hour, mean, self.low, self.high))
+
+
+class LongTermStatistics:
+    """Aggregate the measurement sensors of one controller per hour.
+
+    The coordinator feeds every processed status; finished hours are
+    taken with pop_rows() and imported as external statistics in one go.
+    window_open tells the throttled sensors when to write their state.
+    """
+
+    def __init__(self, device: str, title: str) -> None:
+        """Initialize without channels; device is part of the statistic ids."""
+        self.device = device
+        self.title = title
+        self.channels: dict[str, _Channel] = {}
+        self.window_open = True
+        self._window_time: float | None = None
+        self.stats = {"samples": 0, "rows": 0}
+
+    def add_channels(self, entity_metadata: dict[str, dict]) -> None:
+        """Track every sensor with state_class measurement."""
+        for entity_id, metadata in entity_metadata.items():
+            if metadata.get("type") != "sensor" or metadata.get("state_class") != "measurement":
+                continue
+            self.channels[entity_id] = _Channel(
+                compile_data_path(entity_id, metadata.get("data_path")),
+                metadata.get("name", entity_id),
+                metadata.get("unit"),
+            )
+
+    def add(self, now: float, data: Any) -> bool:
+        """Add one status (wall clock time), return True if hours were finished."""
+        # Schreibfenster fuer die gedrosselten Sensoren
+        self.window_open = (
+            self._window_time is None or now - self._window_time >= STATE_WRITE_INTERVAL
+        )
+        if self.window_open:
+            self._window_time = now
+
+        finished = False
+        for channel in self.channels.values():
+            value = channel.resolve(data)
+            if value is MISSING or isinstance(value, bool) or not isinstance(value, (int, float)):
+                value = None
+            count = len(channel.rows)
+            channel.add(now, value)
+            finished = finished or len(channel.rows) > count
+        self.stats["samples"] += 1
+        return finished
+
+    def pop_rows(self) -> dict[str, tuple[str, str | None, list[tuple[float, float, float, float]]]]:
+        """Return and forget (name, unit, [(start, mean, min, max)]) per statistic object id."""
+        rows = {}
+        for entity_id, channel in self.channels.items():
+            if channel.rows:
+                rows[statistic_object_id(self.device, entity_id)] = (
+                    f"{self.title} {channel.name}",
+                    channel.unit,
+                    channel.rows,
+                )
+                self.stats["rows"] += len(channel.rows)
+                channel.rows = []
+        return rows
@@ -0,0 +1,90 @@
+"""Persistent cache of the /mada entity metadata."""
+# V1.3 Kein Layout des kompakten Status mehr (Format entfernt)
+# V1.2 Merkt sich das Layout des kompakten Status
+# V1.1 Merkt sich Batch-RPC-Unterstuetzung des Geraets
+# V1.0 Initial - Metadaten pro MAC + Firmware-Version, Revalidierung per ETag
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "mada.metadata"
+
+# hass.data Key fuer den geladenen Cache
+DATA_METADATA_CACHE = "mada_metadata_cache"
+
+# Verzoegerung beim Speichern - mehrere Geraete in einem Schreibvorgang
+SAVE_DELAY = 10
+
+# Antwort auf einen bedingten Request: Metadaten unveraendert (HTTP 304)
+NOT_MODIFIED: Any = object()
+
+
+def index_entities(entities: list[dict]) -> dict[str, dict]:
+    """Convert the /mada entity list to a dict keyed by entity id."""
+    # Konvertiere zu Dictionary für schnellen Zugriff
+    metadata = {}
+    for entity in entities:
+        entity_id = entity.get("id")
+        if entity_id:
+            metadata[entity_id] = entity
+
+    return metadata
+
+
+class MadaMetadataCache:
+    """Entity metadata of all controllers, keyed by MAC and firmware version."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: dict[str, dict] = {}
+
+    async def async_load(self) -> None:
+        """Load the cache from disk."""
+        self._data = await self._store.async_load() or {}
+
+    def get(self, mac: str, version: str) -> dict | None:
+        """Return {"etag", "entities", "batch"} for a device or None."""
+        return self._data.get(f"{mac}_{version}")
+
+    def set(self, mac: str, version: str, etag: str | None, info: dict) -> None:
+        """Remember the /mada response of a device, replacing older firmware versions."""
+        self._drop(mac)
+        self._data[f"{mac}_{version}"] = {
+            "mac": mac,
+            "etag": etag,
+            "entities": info.get("entities", []),
+            "batch": bool(info.get("batch")),
+        }
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    def remove(self, mac: str) -> None:
+        """Forget a device."""
+        if self._drop(mac):
+            self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    def _drop(self, mac: str) -> bool:
+        """Remove all cached versions of a device."""
+        stale = [key for key, value in self._data.items() if value.get("mac") == mac]
+        for key in stale:
+            del self._data[key]
+        return bool(stale)
+
+
+async def async_get_metadata_cache(hass: HomeAssistant) -> MadaMetadataCache:
+    """Return the shared metadata cache, loading it on first use."""
+    if DATA_METADATA_CACHE not in hass.data:
+        cache = MadaMetadataCache(hass)
+        await cache.async_load()
+        # Parallele Setups: der erste geladene Cache gewinnt
+        hass.data.setdefault(DATA_METADATA_CACHE, cache)
+
+    return hass.data[DATA_METADATA_CACHE]
@@ -1,4 +1,11 @@
 """Number platform for MADA integration using ESP32 entity metadata."""
+# V2.2 __slots__ entfernt (Basis MadaEntity ohne Slots)
+# V2.1 Befehl aus der Routing-Tabelle des Geraets (command in /mada), kein Raten der URL
+# V2.0 Gemeinsame Basis MadaEntity, Befehls-Mapping im Geraete-Objekt, Metadaten nicht gehalten
+# V1.9 State-Writes und Befehle ueber die Instrumentierung des Coordinators
+# V1.8 Befehle ueber die Queue des Coordinators, optimistischer Zustand
+# V1.7 State-Write nur bei Wertaenderung (change_filter.py)
+# V1.6 data_path wird beim Setup vorkompiliert (resolver.py)
 # V1.5 Nutzt data_path aus Entity-Metadaten - automatisches Mapping!
 # V1.4 Verbessertes Mapping
 # V1.3 Nutzt Entity-Metadaten vom ESP32
@@ -9,17 +16,14 @@ from __future__ import annotations
 
 import logging
 
-import aiohttp
-import async_timeout
-
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import DOMAIN
+from .entity import MadaEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -52,7 +56,7 @@ async def async_setup_entry(
             numbers.append(
                 MadaNumberFromMetadata(
                     coordinator=coordinator,
-                    entry=entry,
+                    entry_id=entry.entry_id,
                     entity_id=entity_id,
                     metadata=metadata,
                 )
@@ -62,112 +66,71 @@ async def async_setup_entry(
     async_add_entities(numbers)
 
 
-class MadaNumberFromMetadata(CoordinatorEntity, NumberEntity):
+class MadaNumberFromMetadata(MadaEntity, NumberEntity):
     """Number entity created from ESP32 entity metadata."""
 
+    # Icon falls die Metadaten keins liefern
+    _attr_icon = "mdi:numeric"
+    _attr_mode = NumberMode.SLIDER
+
     def __init__(
         self,
         coordinator,
-        entry: ConfigEntry,
+        entry_id: str,
         entity_id: str,
         metadata: dict,
     ) -> None:
         """Initialize the number entity."""
-        super().__init__(coordinator)
-        
-        self._entity_id = entity_id
-        self._metadata = metadata
-        self._data_path = metadata.get("data_path", [])
-        self._host = entry.data["host"]
-        self._session = async_get_clientsession(coordinator.hass)
+        super().__init__(coordinator, entry_id, entity_id, metadata)
         
-        # Unique ID und Name
-        self._attr_unique_id = f"{entry.entry_id}_{entity_id}"
-        self._attr_name = f"MADA {metadata.get('name', entity_id)}"
-        
-        # Device info
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": "MADA Bewässerung",
-            "manufacturer": "Custom",
-            "model": entry.data.get("model", "HiGrow"),
-            "sw_version": entry.data.get("version", "1.4"),
-        }
+        self._optimistic_value: float | None = None
+        self._route = coordinator.device.routes.get(entity_id)
         
         # Number-Eigenschaften (aus ESP32 Metadaten)
         self._attr_native_min_value = metadata.get("min", 0)
         self._attr_native_max_value = metadata.get("max", 100)
         self._attr_native_step = metadata.get("step", 1)
         self._attr_native_unit_of_measurement = metadata.get("unit")
-        self._attr_mode = NumberMode.SLIDER
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the value moved beyond the deadband."""
+        if self._optimistic_value is not None:
+            # Optimistischen Wert erst verwerfen wenn die Queue gesendet hat
+            if self.coordinator.commands.busy:
+                return
+            self._optimistic_value = None
+            self.coordinator.async_should_update(self._watch)
+            self.coordinator.async_write_state(self)
+            return
         
-        # Icon (aus Metadaten oder default)
-        self._attr_icon = metadata.get("icon", "mdi:numeric")
+        if self.coordinator.async_should_update(self._watch):
+            self.coordinator.async_write_state(self)
 
     @property
     def native_value(self) -> float | None:
         """Return the current value."""
-        if self.coordinator.data is None:
-            return None
-        
-        # Verwende data_path aus Metadaten
-        if not self._data_path or len(self._data_path) < 2:
-            _LOGGER.warning(f"No valid data_path for {self._entity_id}")
-            return None
+        if self._optimistic_value is not None:
+            return self._optimistic_value
         
-        try:
-            # Navigate durch JSON mit data_path
-            value = self.coordinator.data
-            for key in self._data_path:
-                value = value.get(key, {})
-                if value == {}:
-                    return None
-            
-            return value
-            
-        except (KeyError, TypeError, AttributeError) as e:
-            _LOGGER.debug(f"Could not get value for {self._entity_id} from {self._data_path}: {e}")
-            return None
+        return self._current_value()
 
     async def async_set_native_value(self, value: float) -> None:
-        """Set new value."""
-        try:
-            async with async_timeout.timeout(10):
-                # Endpoint basierend auf entity_id
-                # pumpenleistung -> /rpc/Pump.SetPWM
-                if "pumpenleistung" in self._entity_id.lower():
-                    url = f"http://{self._host}/rpc/Pump.SetPWM"
-                    payload_key = "pwm"
-                else:
-                    endpoint_name = self._entity_id.capitalize()
-                    url = f"http://{self._host}/rpc/{endpoint_name}.Set"
-                    payload_key = "value"
-                
-                # Integer oder Float basierend auf step
-                if self._attr_native_step == 1:
-                    payload_value = int(value)
-                else:
-                    payload_value = value
-                
-                payload = {payload_key: payload_value}
-                
-                _LOGGER.debug(f"Sending {payload} to {url}")
-                
-                async with self._session.post(
-                    url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                ) as response:
-                    if response.status == 200:
-                        await self.coordinator.async_request_refresh()
-                    else:
-                        _LOGGER.error(
-                            "Failed to set %s: HTTP %s",
-                            self._attr_name,
-                            response.status,
-                        )
-                        
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Error setting %s: %s", self._attr_name, err)
-        except Exception as err:
-            _LOGGER.error("Unexpected error setting %s: %s", self._attr_name, err)
+        """Set new value via the device command queue."""
+        route = self._route
+        if route is None:
+            raise HomeAssistantError(f"No command announced for {self._entity_id}")
+        
+        # Integer oder Float basierend auf step
+        if self._attr_native_step == 1:
+            payload_value = int(value)
+        else:
+            payload_value = value
+        
+        # Slider-Bewegungen werden in der Queue auf den letzten Wert zusammengefasst
+        self.coordinator.commands.submit(route.method, route.params(payload_value), route.key)
+        self.coordinator.instrumentation.command(self.entity_id)
+        
+        # Optimistisch anzeigen bis der Refresh nach dem Burst kommt
+        self._optimistic_value = payload_value
+        self.coordinator.async_write_state(self)
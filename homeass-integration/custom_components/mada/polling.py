@@ -0,0 +1,115 @@
+"""Adaptive poll interval for MADA controllers."""
+# V1.2 Rate ueber mindestens 3 Minuten, Sprung um eine Stufe gilt als Rauschen
+# V1.1 Vorhersage der Bodenfeuchte: lange Intervalle, solange die Schwelle weit entfernt ist
+# V1.0 Initial - Intervall abhaengig von Pumpe und Bodenfeuchte-Aenderung
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import timedelta
+from typing import Any
+
+from .resolver import compile_data_path
+
+# Options-Keys (OptionsFlow)
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_BATTERY_POWERED = "battery_powered"
+
+# Pumpe laeuft: schnell pollen
+MIN_SCAN_INTERVAL = timedelta(seconds=5)
+# Bodenfeuchte aendert sich schnell
+FAST_SCAN_INTERVAL = timedelta(seconds=10)
+# Obergrenze fuer den Backoff (per Option einstellbar)
+DEFAULT_MAX_SCAN_INTERVAL = timedelta(minutes=10)
+# Groesste erlaubte Obergrenze im OptionsFlow
+SCAN_INTERVAL_LIMIT = timedelta(hours=2)
+
+# Ab dieser Aenderung (% pro Minute) gilt die Bodenfeuchte als volatil
+FAST_MOISTURE_RATE = 1.0
+# Darunter gilt die Bodenfeuchte als stabil
+STABLE_MOISTURE_DELTA = 0.5
+# Sensor-Rauschen: eine Stufe der ganzzahligen Bodenfeuchte ist keine schnelle Aenderung
+MOISTURE_NOISE = 1.0
+# Die Rate wird ueber mindestens dieses Fenster (Sekunden) gemessen - Jitter von
+# +-1 % (Spanne 2 %) bleibt so unter FAST_MOISTURE_RATE
+RATE_WINDOW = 180
+# Weiter entfernt (Sekunden) gilt eine vorhergesagte Schwelle als ruhig - Backoff trotz Aenderung
+QUIET_HORIZON = 6 * 3600
+# So viele Polls mindestens vor der vorhergesagten Schwelle
+POLLS_BEFORE_THRESHOLD = 4
+
+_pump_running = compile_data_path("pump", ["pump", "running"])
+_soil_moisture = compile_data_path("soil_moisture", ["soil", "moisture"])
+
+
+class AdaptivePollInterval:
+    """Derive the next poll interval from the latest GetStatus payload."""
+
+    __slots__ = ("base", "ceiling", "battery_powered", "interval", "_samples")
+
+    def __init__(
+        self,
+        base: timedelta,
+        ceiling: timedelta = DEFAULT_MAX_SCAN_INTERVAL,
+        battery_powered: bool = False,
+    ) -> None:
+        """Initialize with the regular interval and the backoff ceiling."""
+        self.base = base
+        self.ceiling = max(ceiling, base)
+        self.battery_powered = battery_powered
+        self.interval = base
+        # (Zeit, Bodenfeuchte) der letzten RATE_WINDOW Sekunden plus eine aeltere als Basis
+        self._samples: deque[tuple[float, float]] = deque()
+
+    def update(self, data: Any, now: float, horizon: float | None = None) -> timedelta:
+        """Return the interval to wait before the next poll.
+
+        horizon is the predicted time (seconds) until the moisture falls
+        below the watering threshold, None if unknown.
+        """
+        moisture = _soil_moisture(data)
+        if isinstance(moisture, bool) or not isinstance(moisture, (int, float)):
+            moisture = None
+
+        samples = self._samples
+        delta = change = rate = None
+        if moisture is None:
+            samples.clear()
+        else:
+            if samples and now > samples[-1][0]:
+                delta = abs(moisture - samples[-1][1])
+                # Aenderung gegen den aeltesten Wert, Rate nie ueber weniger als RATE_WINDOW -
+                # eine Stufe hin und her zwischen zwei Polls ist Rauschen, kein Giessen
+                start, reference = samples[0]
+                change = abs(moisture - reference)
+                rate = change / max(now - start, RATE_WINDOW) * 60
+            samples.append((now, moisture))
+            while len(samples) > 2 and samples[1][0] <= now - RATE_WINDOW:
+                samples.popleft()
+
+        if _pump_running(data) is True:
+            self.interval = MIN_SCAN_INTERVAL
+        elif rate is not None and change > MOISTURE_NOISE and rate >= FAST_MOISTURE_RATE:
+            self.interval = FAST_SCAN_INTERVAL
+        elif (
+            self.battery_powered
+            or (delta is not None and delta < STABLE_MOISTURE_DELTA)
+            # Gleichmaessiges Austrocknen, Schwelle weit weg: Sprung um 1 % ist kein Grund zu pollen
+            or (horizon is not None and horizon >= QUIET_HORIZON)
+        ):
+            # Exponentieller Backoff, beginnend beim regulaeren Intervall
+            if self.interval < self.base:
+                self.interval = self.base
+            else:
+                self.interval = min(self.interval * 2, self.ceiling)
+        else:
+            self.interval = self.base
+
+        # Nicht ueber die vorhergesagte Schwelle hinweg schlafen
+        if horizon is not None:
+            self.interval = min(
+                self.interval,
+                max(timedelta(seconds=horizon / POLLS_BEFORE_THRESHOLD), self.base),
+            )
+
+        return self.interval
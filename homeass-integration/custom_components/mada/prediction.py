@@ -0,0 +1,127 @@
+"""Soil moisture trend of a MADA controller."""
+# V1.0 Initial - Exponentiell gewichtete Regression, Vorhersage der Zeit bis zur Trockenheit
+
+from __future__ import annotations
+
+from typing import Any
+
+from .resolver import compile_data_path
+
+# Halbwertszeit der Gewichte (Sekunden) - aeltere Messwerte zaehlen weniger
+HALF_LIFE = 6 * 3600
+# Mindestens so lange (Sekunden) und so viele Messwerte seit dem letzten Reset
+MIN_SPAN = 30 * 60
+MIN_SAMPLES = 5
+# Anstieg um mehr als das (%) ist Giessen oder Regen - Trend beginnt neu
+RESET_JUMP = 3.0
+# Langsamer als das (% pro Sekunde) gilt nicht als Austrocknen (0.1 % pro Tag)
+MIN_DRYING_RATE = 0.1 / 86400
+# Vorhersagen weiter als das (Sekunden) werden abgeschnitten
+MAX_HORIZON = 14 * 86400
+
+_pump_running = compile_data_path("pump", ["pump", "running"])
+_soil_moisture = compile_data_path("soil_moisture", ["soil", "moisture"])
+
+
+class MoistureTrend:
+    """Exponentially weighted linear regression of moisture over time.
+
+    Updates are O(1): the weighted sums are decayed and shifted to the
+    newest sample, so timestamps stay small and no history is kept.
+    """
+
+    __slots__ = (
+        "half_life",
+        "samples",
+        "_start",
+        "_last",
+        "_moisture",
+        "_w",
+        "_t",
+        "_m",
+        "_tt",
+        "_tm",
+    )
+
+    def __init__(self, half_life: float = HALF_LIFE) -> None:
+        """Initialize an empty trend."""
+        self.half_life = half_life
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        self.samples = 0
+        self._start: float | None = None
+        self._last: float | None = None
+        self._moisture: float | None = None
+        # Gewichtete Summen, Zeit relativ zum letzten Messwert
+        self._w = self._t = self._m = self._tt = self._tm = 0.0
+
+    def update(self, data: Any, now: float) -> None:
+        """Add the moisture of a GetStatus payload."""
+        moisture = _soil_moisture(data)
+        if isinstance(moisture, bool) or not isinstance(moisture, (int, float)):
+            return
+
+        # Giessen veraendert den Verlauf - danach neu lernen
+        if _pump_running(data) is True or (
+            self._moisture is not None and moisture - self._moisture > RESET_JUMP
+        ):
+            self.reset()
+            return
+
+        self.add(now, moisture)
+
+    def add(self, now: float, moisture: float) -> None:
+        """Add one sample."""
+        if self._last is None:
+            self._start = now
+        elif now > self._last:
+            # Gewichte abklingen lassen und Zeitachse auf den neuen Messwert schieben
+            shift = now - self._last
+            decay = 0.5 ** (shift / self.half_life)
+            w, t, m = self._w * decay, self._t * decay, self._m * decay
+            tt, tm = self._tt * decay, self._tm * decay
+            self._w = w
+            self._t = t - shift * w
+            self._m = m
+            self._tt = tt - 2 * shift * t + shift * shift * w
+            self._tm = tm - shift * m
+
+        self._w += 1.0
+        self._m += moisture
+        self._last = now
+        self._moisture = moisture
+        self.samples += 1
+
+    @property
+    def slope(self) -> float | None:
+        """Return the moisture change in % per second, None until enough data."""
+        if (
+            self.samples < MIN_SAMPLES
+            or self._last - self._start < MIN_SPAN
+        ):
+            return None
+
+        mean_t = self._t / self._w
+        variance = self._tt / self._w - mean_t * mean_t
+        if variance <= 0:
+            return None
+        return (self._tm / self._w - mean_t * self._m / self._w) / variance
+
+    @property
+    def rising(self) -> bool:
+        """Return True if the soil gets wetter (e.g. rain)."""
+        slope = self.slope
+        return slope is not None and slope > MIN_DRYING_RATE
+
+    def time_to(self, threshold: float, now: float) -> float | None:
+        """Return seconds until moisture falls below threshold, None if not drying."""
+        slope = self.slope
+        if slope is None or slope > -MIN_DRYING_RATE:
+            return None
+
+        # Regressionsgerade am Zeitpunkt now
+        mean_t = self._t / self._w
+        level = self._m / self._w + slope * (now - self._last - mean_t)
+        return min(max((level - threshold) / -slope, 0.0), MAX_HORIZON)
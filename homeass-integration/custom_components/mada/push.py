@@ -0,0 +1,157 @@
+"""Push channel: the ESP32 posts status deltas to a Home Assistant webhook."""
+# V1.0 Initial - Webhook-Empfaenger mit Reconnect/Backoff, Polling nur als Fallback
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+# Options-Keys (OptionsFlow)
+CONF_PUSH_MODE = "push_mode"
+CONF_WEBHOOK_ID = "webhook_id"
+
+# Heartbeat des Geraets ohne Aenderungen (Sekunden)
+PUSH_HEARTBEAT = 60
+# Nach dieser Stille gilt der Kanal als tot -> Polling
+PUSH_SILENCE_TIMEOUT = 3 * PUSH_HEARTBEAT
+
+# Backoff fuer erneutes Abonnieren (Sekunden)
+PUSH_BACKOFF_MIN = 5
+PUSH_BACKOFF_MAX = 600
+
+# Zustaende der Push-Verbindung
+STATE_SUBSCRIBING = "subscribing"
+STATE_ACTIVE = "active"
+STATE_SILENT = "silent"
+STATE_BACKOFF = "backoff"
+
+
+def merge_delta(data: dict | None, delta: dict) -> dict:
+    """Return a new status dict with the delta applied section by section."""
+    merged = dict(data) if data else {}
+    for section, values in delta.items():
+        current = merged.get(section)
+        if isinstance(values, dict) and isinstance(current, dict):
+            merged[section] = {**current, **values}
+        else:
+            merged[section] = values
+    return merged
+
+
+class MadaPushChannel:
+    """Receive status deltas from one controller and keep the subscription alive."""
+
+    def __init__(
+        self,
+        url: str,
+        subscribe: Callable[[str, int], Awaitable[bool]],
+        get_data: Callable[[], dict | None],
+        set_data: Callable[[dict], None],
+    ) -> None:
+        """Initialize the channel.
+
+        subscribe posts the webhook url to the device, get_data/set_data read
+        and publish the merged GetStatus payload.
+        """
+        self.url = url
+        self.state = STATE_SUBSCRIBING
+        self.stats = {"messages": 0, "gaps": 0, "subscribes": 0}
+        self._subscribe = subscribe
+        self._get_data = get_data
+        self._set_data = set_data
+        self._seq: int | None = None
+        self._last_message = 0.0
+        self._resync = asyncio.Event()
+
+    @property
+    def active(self) -> bool:
+        """Return True while the device pushes and polling can be skipped."""
+        return self.state == STATE_ACTIVE
+
+    def ingest(self, payload: dict) -> bool:
+        """Apply one message from the device, return False if it was rejected."""
+        delta = payload.get("delta")
+        seq = payload.get("seq")
+        if not isinstance(delta, dict) or not isinstance(seq, int):
+            return False
+
+        self._last_message = asyncio.get_running_loop().time()
+        self.stats["messages"] += 1
+
+        if payload.get("full"):
+            # Vollstaendiger Status nach dem Abonnieren
+            self._seq = seq
+            self._set_data(delta)
+            return True
+
+        if self._seq is None or seq != self._seq + 1:
+            # Delta verloren -> neu abonnieren, Geraet schickt den vollen Status
+            self.stats["gaps"] += 1
+            self._resync.set()
+            return True
+
+        self._seq = seq
+        if delta:
+            self._set_data(merge_delta(self._get_data(), delta))
+        return True
+
+    async def async_handle_webhook(
+        self, hass: Any, webhook_id: str, request: web.Request
+    ) -> web.Response:
+        """Handle a webhook POST from the device."""
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        if not isinstance(payload, dict) or not self.ingest(payload):
+            return web.Response(status=400)
+
+        return web.Response(status=200)
+
+    async def async_run(self) -> None:
+        """Subscribe, watch for silence and resubscribe with jittered backoff."""
+        loop = asyncio.get_running_loop()
+        backoff = PUSH_BACKOFF_MIN
+
+        while True:
+            self.state = STATE_SUBSCRIBING
+            self._seq = None
+            self._resync.clear()
+            self.stats["subscribes"] += 1
+
+            if await self._subscribe(self.url, PUSH_HEARTBEAT):
+                self.state = STATE_ACTIVE
+                self._last_message = loop.time()
+                backoff = PUSH_BACKOFF_MIN
+
+                # Watchdog: pro Nachricht nur ein Zeitstempel, kein Timer
+                while (
+                    remaining := self._last_message + PUSH_SILENCE_TIMEOUT - loop.time()
+                ) > 0:
+                    try:
+                        await asyncio.wait_for(self._resync.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        continue
+                    break
+                else:
+                    _LOGGER.warning(
+                        "Push channel silent for %s s, falling back to polling",
+                        PUSH_SILENCE_TIMEOUT,
+                    )
+                    self.state = STATE_SILENT
+
+                if self._resync.is_set():
+                    continue
+            else:
+                self.state = STATE_BACKOFF
+
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+            backoff = min(backoff * 2, PUSH_BACKOFF_MAX)
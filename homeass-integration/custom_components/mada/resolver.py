@@ -0,0 +1,77 @@
+"""Precompiled data_path accessors for MADA entities."""
+# V1.0 Initial - data_path wird einmal beim Setup kompiliert
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Sequence
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sentinel fuer fehlende Werte (0 und False sind gueltige Werte!)
+MISSING: Any = object()
+
+# Mindestlaenge eines data_path, z.B. ["soil", "moisture"]
+MIN_PATH_LENGTH = 2
+
+Resolver = Callable[[Any], Any]
+
+
+def _resolve_missing(data: Any) -> Any:
+    """Resolver for entities without a valid data_path."""
+    return MISSING
+
+
+def validate_data_path(entity_id: str, data_path: Any) -> tuple[str, ...] | None:
+    """Validate a data_path from the /mada metadata once at setup."""
+    if (
+        not isinstance(data_path, Sequence)
+        or isinstance(data_path, str)
+        or len(data_path) < MIN_PATH_LENGTH
+        or not all(isinstance(key, str) and key for key in data_path)
+    ):
+        _LOGGER.warning(f"No valid data_path for {entity_id}: {data_path!r}")
+        return None
+
+    return tuple(data_path)
+
+
+def compile_data_path(entity_id: str, data_path: Any) -> Resolver:
+    """Compile a data_path into a fast accessor returning MISSING on lookup errors."""
+    keys = validate_data_path(entity_id, data_path)
+    if keys is None:
+        return _resolve_missing
+
+    # Spezialfaelle fuer die ueblichen Pfadlaengen - kein Loop pro Zugriff
+    if len(keys) == 2:
+        first, second = keys
+
+        def _resolve(data: Any) -> Any:
+            try:
+                return data[first][second]
+            except (KeyError, TypeError, IndexError):
+                return MISSING
+
+        return _resolve
+
+    if len(keys) == 3:
+        first, second, third = keys
+
+        def _resolve(data: Any) -> Any:
+            try:
+                return data[first][second][third]
+            except (KeyError, TypeError, IndexError):
+                return MISSING
+
+        return _resolve
+
+    def _resolve(data: Any) -> Any:
+        try:
+            for key in keys:
+                data = data[key]
+        except (KeyError, TypeError, IndexError):
+            return MISSING
+        return data
+
+    return _resolve
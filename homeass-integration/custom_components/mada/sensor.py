@@ -1,4 +1,16 @@
 """Sensor platform for MADA integration using ESP32 entity metadata."""
+# V2.7 Diagnose- und Vorhersage-Sensoren schreiben den State nur bei Aenderung
+# V2.6 __slots__ entfernt (Basis MadaEntity ohne Slots)
+# V2.5 Messwert-Sensoren mit externer Langzeitstatistik: State hoechstens alle 15 Minuten, ohne state_class
+# V2.4 Diagnose-Sensor fuer eingesparte Status-Requests (Single-Flight)
+# V2.3 Sensor "Zeit bis Bewässerung" aus dem Trend der Bodenfeuchte
+# V2.2 Gemeinsame Basis MadaEntity, Geraete-Info pro Geraet geteilt, Metadaten nicht gehalten
+# V2.1 Diagnose-Sensor fuer Fehlversuche in Folge (Circuit-Breaker)
+# V2.0 Diagnose-Sensoren der Instrumentierung (Latenz p95, Dekodierung, Timeouts)
+# V1.9 Diagnose-Sensoren fuer Verbindungs-Wiederverwendung und Verbindungsaufbau
+# V1.8 Diagnose-Sensor fuer das adaptive Abfrageintervall
+# V1.7 State-Write nur bei Wertaenderung (change_filter.py)
+# V1.6 data_path wird beim Setup vorkompiliert (resolver.py)
 # V1.5 Nutzt data_path aus Entity-Metadaten - automatisches Mapping!
 # V1.4 Verbessertes Mapping
 # V1.3 Nutzt Entity-Metadaten vom ESP32
@@ -17,14 +29,17 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
+    EntityCategory,
     UnitOfElectricPotential,
     UnitOfTemperature,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import DOMAIN
+from .entity import MadaComputedEntity, MadaEntity
+from .instrumentation import TIMER_DECODE, TIMER_STATE_WRITE, TIMER_UPDATE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,6 +60,104 @@ STATE_CLASS_MAP = {
     "total_increasing": SensorStateClass.TOTAL_INCREASING,
 }
 
+# Diagnose-Sensoren des Coordinators: (key, name, unit, state_class, value_fn)
+DIAGNOSTIC_SENSORS = (
+    (
+        "updates_delivered",
+        "Updates zugestellt",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda coordinator: coordinator.update_stats["delivered"],
+    ),
+    (
+        "updates_suppressed",
+        "Updates unterdrückt",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda coordinator: coordinator.update_stats["suppressed"],
+    ),
+    (
+        "status_deduplicated",
+        "Status-Abfragen eingespart",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda coordinator: coordinator.status_flight.deduplicated,
+    ),
+    (
+        "poll_interval",
+        "Abfrageintervall",
+        UnitOfTime.SECONDS,
+        SensorStateClass.MEASUREMENT,
+        lambda coordinator: coordinator.poll_interval.total_seconds(),
+    ),
+    (
+        "connection_reuse",
+        "Verbindungs-Wiederverwendung",
+        PERCENTAGE,
+        SensorStateClass.MEASUREMENT,
+        lambda coordinator: _percent(coordinator.transport.reuse_ratio),
+    ),
+    (
+        "handshake_time",
+        "Verbindungsaufbau",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        lambda coordinator: _millis(coordinator.transport.handshake_time),
+    ),
+    (
+        "queue_time",
+        "Wartezeit auf Verbindung",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        lambda coordinator: _millis(coordinator.transport.queue_time),
+    ),
+    (
+        "update_latency_p95",
+        "Abfragedauer p95",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        lambda coordinator: coordinator.instrumentation.percentile(TIMER_UPDATE, 0.95),
+    ),
+    (
+        "decode_time_p95",
+        "JSON-Dekodierung p95",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        lambda coordinator: coordinator.instrumentation.percentile(TIMER_DECODE, 0.95),
+    ),
+    (
+        "state_write_p95",
+        "State-Write p95",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        lambda coordinator: coordinator.instrumentation.percentile(TIMER_STATE_WRITE, 0.95),
+    ),
+    (
+        "timeouts",
+        "Timeouts",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda coordinator: sum(coordinator.instrumentation.timeouts.values()),
+    ),
+    (
+        "consecutive_failures",
+        "Fehlversuche in Folge",
+        None,
+        SensorStateClass.MEASUREMENT,
+        lambda coordinator: coordinator.breaker.failures,
+    ),
+)
+
+
+def _percent(ratio: float | None) -> float | None:
+    """Convert a ratio to a rounded percentage."""
+    return None if ratio is None else round(ratio * 100, 1)
+
+
+def _millis(seconds: float | None) -> float | None:
+    """Convert seconds to rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -74,45 +187,49 @@ async def async_setup_entry(
             sensors.append(
                 MadaSensorFromMetadata(
                     coordinator=coordinator,
-                    entry=entry,
+                    entry_id=entry.entry_id,
                     entity_id=entity_id,
                     metadata=metadata,
                 )
             )
     
+    # Diagnose-Sensoren (standardmaessig deaktiviert)
+    for key, name, unit, state_class, value_fn in DIAGNOSTIC_SENSORS:
+        sensors.append(
+            MadaDiagnosticSensor(
+                coordinator=coordinator,
+                entry_id=entry.entry_id,
+                key=key,
+                name=name,
+                unit=unit,
+                state_class=state_class,
+                value_fn=value_fn,
+            )
+        )
+    
+    # Vorhersage aus dem Trend der Bodenfeuchte
+    sensors.append(MadaWateringForecastSensor(coordinator, entry.entry_id))
+    
     _LOGGER.info("Created %d sensors from ESP32 metadata", len(sensors))
     async_add_entities(sensors)
 
 
-class MadaSensorFromMetadata(CoordinatorEntity, SensorEntity):
+class MadaSensorFromMetadata(MadaEntity, SensorEntity):
     """Sensor created from ESP32 entity metadata."""
 
     def __init__(
         self,
         coordinator,
-        entry: ConfigEntry,
+        entry_id: str,
         entity_id: str,
         metadata: dict,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry_id, entity_id, metadata)
         
-        self._entity_id = entity_id
-        self._metadata = metadata
-        self._data_path = metadata.get("data_path", [])
-        
-        # Unique ID und Name
-        self._attr_unique_id = f"{entry.entry_id}_{entity_id}"
-        self._attr_name = f"MADA {metadata.get('name', entity_id)}"
-        
-        # Device info
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": "MADA Bewässerung",
-            "manufacturer": "Custom",
-            "model": entry.data.get("model", "HiGrow"),
-            "sw_version": entry.data.get("version", "1.4"),
-        }
+        # Stundenwerte kommen aus longterm.py - Recorder soll keine eigene Statistik bilden
+        longterm = coordinator.longterm
+        self._throttled = longterm is not None and entity_id in longterm.channels
         
         # Device Class (aus ESP32 Metadaten)
         device_class_str = metadata.get("device_class")
@@ -121,41 +238,90 @@ class MadaSensorFromMetadata(CoordinatorEntity, SensorEntity):
         
         # State Class (aus ESP32 Metadaten)
         state_class_str = metadata.get("state_class")
-        if state_class_str and state_class_str in STATE_CLASS_MAP:
+        if state_class_str and state_class_str in STATE_CLASS_MAP and not self._throttled:
             self._attr_state_class = STATE_CLASS_MAP[state_class_str]
         
         # Unit (aus ESP32 Metadaten)
         unit = metadata.get("unit")
         if unit:
             self._attr_native_unit_of_measurement = unit
-        
-        # Icon (optional aus ESP32 Metadaten)
-        icon = metadata.get("icon")
-        if icon:
-            self._attr_icon = icon
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write throttled sensors only when the statistics window is open."""
+        if (
+            self._throttled
+            and self.coordinator.last_update_success
+            and not self.coordinator.longterm.window_open
+        ):
+            return
+        super()._handle_coordinator_update()
 
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        if self.coordinator.data is None:
-            return None
+        return self._current_value()
+
+
+class MadaDiagnosticSensor(MadaComputedEntity, SensorEntity):
+    """Diagnostic sensor reporting coordinator internals."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator,
+        entry_id: str,
+        key: str,
+        name: str,
+        unit: str | None,
+        state_class: SensorStateClass | None,
+        value_fn,
+    ) -> None:
+        """Initialize the diagnostic sensor."""
+        super().__init__(coordinator)
         
-        # Verwende data_path aus Metadaten
-        if not self._data_path or len(self._data_path) < 2:
-            _LOGGER.warning(f"No valid data_path for {self._entity_id}")
-            return None
+        self._value_fn = value_fn
         
-        try:
-            # Navigate durch JSON mit data_path
-            # z.B. ["soil", "moisture"] -> data["soil"]["moisture"]
-            value = self.coordinator.data
-            for key in self._data_path:
-                value = value.get(key, {})
-                if value == {}:
-                    return None
-            
-            return value
-            
-        except (KeyError, TypeError, AttributeError) as e:
-            _LOGGER.debug(f"Could not get value for {self._entity_id} from {self._data_path}: {e}")
-            return None
+        # Unique ID und Name
+        self._attr_unique_id = f"{entry_id}_{key}"
+        self._attr_name = f"MADA {name}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        
+        # Device info - ein Dict pro Geraet
+        self._attr_device_info = coordinator.device.device_info
+
+    @property
+    def available(self) -> bool:
+        """Diagnostic values are available even if the device is not."""
+        return True
+
+    @property
+    def native_value(self):
+        """Return the diagnostic value."""
+        return self._value_fn(self.coordinator)
+
+
+class MadaWateringForecastSensor(MadaComputedEntity, SensorEntity):
+    """Predicted time until the soil falls below the watering threshold."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.HOURS
+    _attr_icon = "mdi:water-clock"
+
+    def __init__(self, coordinator, entry_id: str) -> None:
+        """Initialize the forecast sensor."""
+        super().__init__(coordinator)
+        
+        self._attr_unique_id = f"{entry_id}_watering_forecast"
+        self._attr_name = "MADA Zeit bis Bewässerung"
+        self._attr_device_info = coordinator.device.device_info
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the predicted hours, None while the soil is not drying."""
+        seconds = self.coordinator.watering_in
+        return None if seconds is None else round(seconds / 3600, 1)
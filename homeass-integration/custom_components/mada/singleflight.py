@@ -0,0 +1,111 @@
+"""Single-flight status fetches for MADA controllers."""
+# V1.1 invalidate() markiert den laufenden Request als veraltet, Abbruch wird zum Fehler
+# V1.0 Initial - Gleichzeitige Abfragen teilen sich einen Request, kurzes Frische-Fenster
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+# So lange (Sekunden) gilt ein abgeholter Status als aktuell
+FRESHNESS_WINDOW = 0.5
+
+
+class SingleFlight:
+    """Share one running fetch and its fresh result between all callers.
+
+    A caller arriving while a fetch runs awaits the same future; a caller
+    arriving within the freshness window gets the last result. Failures
+    are passed to every waiting caller and never cached. If the caller
+    running the fetch is cancelled, the others get cancelled_error
+    instead of the cancellation.
+    """
+
+    __slots__ = (
+        "window",
+        "stats",
+        "_cancelled_error",
+        "_future",
+        "_generation",
+        "_flight_generation",
+        "_result",
+        "_time",
+    )
+
+    def __init__(
+        self,
+        window: float = FRESHNESS_WINDOW,
+        cancelled_error: Callable[[str], Exception] = RuntimeError,
+    ) -> None:
+        """Initialize without a result."""
+        self.window = window
+        # fetched: Requests ans Geraet, shared: an laufenden Request angehaengt,
+        # reused: aus dem Frische-Fenster beantwortet
+        self.stats = {"fetched": 0, "shared": 0, "reused": 0}
+        self._cancelled_error = cancelled_error
+        self._future: asyncio.Future | None = None
+        # invalidate() zaehlt hoch - ein aelterer Request ist danach veraltet
+        self._generation = 0
+        self._flight_generation = 0
+        self._result: Any = None
+        self._time: float | None = None
+
+    @property
+    def deduplicated(self) -> int:
+        """Return the number of calls answered without a request."""
+        return self.stats["shared"] + self.stats["reused"]
+
+    async def run(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result of fetch(), shared with concurrent callers."""
+        if self._future is not None and self._flight_generation == self._generation:
+            self.stats["shared"] += 1
+            # shield: ein abgebrochener Aufrufer bricht den Request der anderen nicht ab
+            return await asyncio.shield(self._future)
+
+        if self._time is not None and time.monotonic() - self._time < self.window:
+            self.stats["reused"] += 1
+            return self._result
+
+        self.stats["fetched"] += 1
+        generation = self._flight_generation = self._generation
+        future = self._future = asyncio.get_running_loop().create_future()
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            # Wartende bekommen einen normalen Fehler - ein CancelledError wuerde
+            # z.B. den Worker der Befehls-Queue beenden
+            future.set_exception(self._cancelled_error("Status fetch cancelled"))
+            future.exception()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            # Keine Warnung "exception never retrieved" ohne weitere Aufrufer
+            future.exception()
+            raise
+        else:
+            # Auch ein veralteter Request beantwortet seine Wartenden, wird aber
+            # nicht fuer spaetere Aufrufer aufgehoben
+            future.set_result(result)
+            if generation == self._generation:
+                self.set(result)
+            return result
+        finally:
+            if self._future is future:
+                self._future = None
+
+    def set(self, result: Any) -> None:
+        """Store a status that arrived another way (batch, push) as fresh."""
+        self._result = result
+        self._time = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Forget the result and mark the running fetch stale (e.g. after a command).
+
+        The stale fetch still answers the callers waiting for it, but the
+        next caller starts a new request and sees the effect of the command.
+        """
+        self._generation += 1
+        self._result = None
+        self._time = None
@@ -0,0 +1,64 @@
+"""Last known status of every MADA controller, kept across restarts."""
+# V1.0 Initial - Letzter GetStatus pro Geraet, hoechstens ein Schreibvorgang pro Verzoegerung
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "mada.snapshots"
+
+# hass.data Key fuer die geladenen Snapshots
+DATA_SNAPSHOTS = "mada_snapshots"
+
+# Hoechstens ein Schreibvorgang pro SAVE_DELAY Sekunden, egal wie oft gepollt wird
+SNAPSHOT_SAVE_DELAY = 5 * 60
+# Aeltere Snapshots werden beim Start nicht angezeigt (Sekunden)
+SNAPSHOT_MAX_AGE = 24 * 3600
+
+
+class StatusSnapshots:
+    """Latest status payload and its wall clock time per device.
+
+    set() only stores a reference; a write is requested once when the
+    data becomes dirty and as_dict() (called by the delayed save) marks
+    it clean again. The save timer is therefore not restarted by every
+    poll and the snapshots reach the disk at least every save delay.
+    """
+
+    def __init__(self, save: Callable[[], None]) -> None:
+        """Initialize without snapshots; save schedules a write of as_dict()."""
+        self._save = save
+        # device -> [Zeitstempel, Status]
+        self._devices: dict[str, list] = {}
+        self._dirty = False
+
+    def load(self, data: dict | None) -> None:
+        """Restore the snapshots from their stored form."""
+        if data:
+            self._devices = data.get("devices", {})
+
+    def as_dict(self) -> dict:
+        """Return the stored form and mark the snapshots clean."""
+        self._dirty = False
+        return {"devices": self._devices}
+
+    def get(self, device: str, now: float) -> tuple[float, dict] | None:
+        """Return (timestamp, status) of a device, None if missing or too old."""
+        snapshot = self._devices.get(device)
+        if snapshot is None or now - snapshot[0] > SNAPSHOT_MAX_AGE:
+            return None
+        return snapshot[0], snapshot[1]
+
+    def set(self, device: str, timestamp: float, data: dict) -> None:
+        """Remember the latest status of a device."""
+        self._devices[device] = [timestamp, data]
+        if not self._dirty:
+            self._dirty = True
+            self._save()
+
+    def remove(self, device: str) -> None:
+        """Forget a removed device."""
+        if self._devices.pop(device, None) is not None and not self._dirty:
+            self._dirty = True
+            self._save()
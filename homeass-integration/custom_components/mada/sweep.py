@@ -0,0 +1,109 @@
+"""Subnet sweep for MADA controllers that zeroconf does not see (other VLANs)."""
+# V1.0 Initial - /mada auf allen Adressen eines Netzes, begrenzt parallel, kurzer Connect-Timeout
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+from collections.abc import Collection
+from typing import Any
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+# Gleichzeitige Proben - tote Adressen warten nur auf den Connect-Timeout
+SWEEP_CONCURRENCY = 128
+# Kein ARP/SYN-ACK innerhalb dieser Zeit (Sekunden) -> kein Geraet
+CONNECT_TIMEOUT = 1.0
+# Gesamtzeit pro Probe inkl. /mada-Antwort (Sekunden)
+PROBE_TIMEOUT = 3.0
+# Groesstes Netz (Adressen) - /22
+MAX_SWEEP_ADDRESSES = 1024
+
+DEFAULT_PORT = 80
+
+
+class NetworkTooLarge(ValueError):
+    """Error to indicate the network has more than MAX_SWEEP_ADDRESSES."""
+
+
+def sweep_hosts(network: str, port: int = DEFAULT_PORT) -> list[str]:
+    """Return the hosts (with port if not 80) of a CIDR network.
+
+    Raises ValueError for invalid networks and NetworkTooLarge above
+    MAX_SWEEP_ADDRESSES.
+    """
+    net = ipaddress.ip_network(network.strip(), strict=False)
+    if net.num_addresses > MAX_SWEEP_ADDRESSES:
+        raise NetworkTooLarge(f"{net} has {net.num_addresses} addresses")
+
+    suffix = "" if port == DEFAULT_PORT else f":{port}"
+    return [f"{address}{suffix}" for address in net.hosts()]
+
+
+async def async_probe(session: aiohttp.ClientSession, host: str) -> dict[str, Any] | None:
+    """Return the device info of a controller at host, None if there is none."""
+    try:
+        async with session.get(f"http://{host}/mada") as response:
+            if response.status != 200:
+                return None
+            data = await response.json(content_type=None)
+            etag = response.headers.get("ETag")
+    except (asyncio.TimeoutError, aiohttp.ClientError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("type") != "irrigation_controller":
+        return None
+    if not data.get("mac"):
+        _LOGGER.debug(f"{host} announces no MAC, skipped")
+        return None
+
+    # Gleiche Felder wie validate_host im Config-Flow
+    return {
+        "host": host,
+        "title": data.get("name", "HiGrow"),
+        "model": data.get("model", "Unknown"),
+        "mac": data["mac"],
+        "version": data.get("version", "Unknown"),
+        "etag": etag,
+        "metadata": data,
+    }
+
+
+async def async_sweep(
+    network: str,
+    port: int = DEFAULT_PORT,
+    known: Collection[str] = (),
+    concurrency: int = SWEEP_CONCURRENCY,
+) -> list[dict[str, Any]]:
+    """Probe every address of network and return the new controllers.
+
+    Controllers whose MAC is in known (configured entries) are skipped, a
+    controller answering on several addresses is returned once.
+    """
+    hosts = sweep_hosts(network, port)
+    semaphore = asyncio.Semaphore(concurrency)
+    timeout = aiohttp.ClientTimeout(total=PROBE_TIMEOUT, sock_connect=CONNECT_TIMEOUT)
+
+    # Eigene Session: keine Keep-Alive-Verbindungen zu hunderten Adressen im Pool
+    async with aiohttp.ClientSession(
+        timeout=timeout,
+        connector=aiohttp.TCPConnector(limit=concurrency, force_close=True),
+    ) as session:
+
+        async def probe(host: str) -> dict[str, Any] | None:
+            # Timeout startet erst mit der Probe, nicht beim Warten auf einen Platz
+            async with semaphore:
+                return await async_probe(session, host)
+
+        results = await asyncio.gather(*(probe(host) for host in hosts))
+
+    found: dict[str, dict[str, Any]] = {}
+    for info in results:
+        if info is not None and info["mac"] not in known:
+            found.setdefault(info["mac"], info)
+
+    _LOGGER.info(f"Sweep of {network}: {len(hosts)} addresses, {len(found)} new controllers")
+    return list(found.values())
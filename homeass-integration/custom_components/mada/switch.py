@@ -1,4 +1,12 @@
 """Switch platform for MADA integration using ESP32 entity metadata."""
+# V2.3 __slots__ entfernt (Basis MadaEntity ohne Slots)
+# V2.2 Ausschalten bleibt im Befehls-Journal bis zu einem Tag gueltig
+# V2.1 Befehl aus der Routing-Tabelle des Geraets (command in /mada), kein Raten der URL
+# V2.0 Gemeinsame Basis MadaEntity, Endpoint-Mapping im Geraete-Objekt, Metadaten nicht gehalten
+# V1.9 State-Writes und Befehle ueber die Instrumentierung des Coordinators
+# V1.8 Befehle ueber die Queue des Coordinators, optimistischer Zustand
+# V1.7 State-Write nur bei Wertaenderung (change_filter.py)
+# V1.6 data_path wird beim Setup vorkompiliert (resolver.py)
 # V1.5 Nutzt data_path aus Entity-Metadaten - automatisches Mapping!
 # V1.4 Verbessertes Mapping
 # V1.3 Nutzt Entity-Metadaten vom ESP32
@@ -10,17 +18,15 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-import aiohttp
-import async_timeout
-
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import DOMAIN
+from .entity import MadaEntity
+from .journal import STOP_TTL
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,7 +59,7 @@ async def async_setup_entry(
             switches.append(
                 MadaSwitchFromMetadata(
                     coordinator=coordinator,
-                    entry=entry,
+                    entry_id=entry.entry_id,
                     entity_id=entity_id,
                     metadata=metadata,
                 )
@@ -63,65 +69,51 @@ async def async_setup_entry(
     async_add_entities(switches)
 
 
-class MadaSwitchFromMetadata(CoordinatorEntity, SwitchEntity):
+class MadaSwitchFromMetadata(MadaEntity, SwitchEntity):
     """Switch created from ESP32 entity metadata."""
 
+    # Icon falls die Metadaten keins liefern
+    _attr_icon = "mdi:toggle-switch"
+
     def __init__(
         self,
         coordinator,
-        entry: ConfigEntry,
+        entry_id: str,
         entity_id: str,
         metadata: dict,
     ) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
-        
-        self._entity_id = entity_id
-        self._metadata = metadata
-        self._data_path = metadata.get("data_path", [])
-        self._host = entry.data["host"]
-        self._session = async_get_clientsession(coordinator.hass)
+        super().__init__(coordinator, entry_id, entity_id, metadata)
         
-        # Unique ID und Name
-        self._attr_unique_id = f"{entry.entry_id}_{entity_id}"
-        self._attr_name = f"MADA {metadata.get('name', entity_id)}"
-        
-        # Device info
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": "MADA Bewässerung",
-            "manufacturer": "Custom",
-            "model": entry.data.get("model", "HiGrow"),
-            "sw_version": entry.data.get("version", "1.4"),
-        }
+        self._optimistic_state: bool | None = None
+        self._route = coordinator.device.routes.get(entity_id)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the value moved beyond the deadband."""
+        if self._optimistic_state is not None:
+            # Optimistischen Wert erst nach dem Refresh der Befehls-Queue verwerfen
+            if self.coordinator.commands.busy:
+                return
+            self._optimistic_state = None
+            self.coordinator.async_should_update(self._watch)
+            self.coordinator.async_write_state(self)
+            return
         
-        # Icon (aus Metadaten oder default)
-        self._attr_icon = metadata.get("icon", "mdi:toggle-switch")
+        if self.coordinator.async_should_update(self._watch):
+            self.coordinator.async_write_state(self)
 
     @property
     def is_on(self) -> bool | None:
         """Return true if switch is on."""
-        if self.coordinator.data is None:
-            return None
+        if self._optimistic_state is not None:
+            return self._optimistic_state
         
-        # Verwende data_path aus Metadaten
-        if not self._data_path or len(self._data_path) < 2:
-            _LOGGER.warning(f"No valid data_path for {self._entity_id}")
+        value = self._current_value()
+        if value is None:
             return None
         
-        try:
-            # Navigate durch JSON mit data_path
-            value = self.coordinator.data
-            for key in self._data_path:
-                value = value.get(key, {})
-                if value == {}:
-                    return None
-            
-            return bool(value)
-            
-        except (KeyError, TypeError, AttributeError) as e:
-            _LOGGER.debug(f"Could not get value for {self._entity_id} from {self._data_path}: {e}")
-            return None
+        return bool(value)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
@@ -132,45 +124,18 @@ class MadaSwitchFromMetadata(CoordinatorEntity, SwitchEntity):
         await self._set_state(False)
 
     async def _set_state(self, state: bool) -> None:
-        """Set switch state via API."""
-        try:
-            async with async_timeout.timeout(10):
-                # Endpoint-Mapping: entity_id -> ESP32 RPC endpoint
-                # pumpe -> Pump (nicht Pumpe!)
-                endpoint_map = {
-                    "pumpe": "Pump",
-                }
-                
-                # Fallback: capitalize
-                if self._entity_id in endpoint_map:
-                    endpoint_name = endpoint_map[self._entity_id]
-                else:
-                    endpoint_name = self._entity_id.capitalize()
-                
-                url = f"http://{self._host}/rpc/{endpoint_name}.Set"
-                payload = {"on": state}
-                
-                _LOGGER.info(f"Switch {self._entity_id}: Sending POST to {url} with payload {payload}")
-                
-                async with self._session.post(
-                    url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                ) as response:
-                    response_text = await response.text()
-                    _LOGGER.info(f"Switch {self._entity_id}: Response HTTP {response.status}: {response_text}")
-                    
-                    if response.status == 200:
-                        await self.coordinator.async_request_refresh()
-                    else:
-                        _LOGGER.error(
-                            "Failed to set %s state: HTTP %s - %s",
-                            self._attr_name,
-                            response.status,
-                            response_text,
-                        )
-                        
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Error setting %s state: %s", self._attr_name, err)
-        except Exception as err:
-            _LOGGER.error("Unexpected error setting %s state: %s", self._attr_name, err)
+        """Set switch state via the device command queue."""
+        route = self._route
+        if route is None:
+            raise HomeAssistantError(f"No command announced for {self._entity_id}")
+        
+        _LOGGER.info(f"Switch {self._entity_id}: Queueing {route.method} on={state}")
+        # Ausschalten wird nach einem Ausfall laenger nachgeholt als Einschalten
+        self.coordinator.commands.submit(
+            route.method, route.params(state), route.key, None if state else STOP_TTL
+        )
+        self.coordinator.instrumentation.command(self.entity_id)
+        
+        # Optimistisch anzeigen bis der Refresh nach dem Burst kommt
+        self._optimistic_state = state
+        self.coordinator.async_write_state(self)
@@ -0,0 +1,113 @@
+"""Dedicated HTTP transport per MADA controller."""
+# V1.1 Verbindung per Lock belegen - Wartende halten keinen Fleet-Slot mehr
+# V1.0 Initial - Eine Keep-Alive-Verbindung pro Geraet, weitere Requests warten (FIFO)
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import aiohttp
+
+# Der AsyncWebServer des ESP32 verkraftet nur wenige Sockets gleichzeitig
+MAX_CONNECTIONS = 1
+
+# Leerlaufzeit bis die Verbindung geschlossen wird (Sekunden)
+KEEPALIVE_TIMEOUT = 15
+
+
+class MadaTransport:
+    """aiohttp session with a single pooled connection to one device.
+
+    Polls, commands and metadata requests share the connection. Each
+    request holds it through connection(); while it is busy further
+    requests wait there in FIFO order instead of opening new sockets on
+    the device, and before they take any fleet-wide resource.
+    """
+
+    def __init__(self, keepalive_timeout: float = KEEPALIVE_TIMEOUT) -> None:
+        """Initialize the transport."""
+        self.stats = {
+            "requests": 0,
+            "connections": 0,
+            "reused": 0,
+            "queued": 0,
+        }
+        self._handshake_total = 0.0
+        self._queue_total = 0.0
+        self._lock = asyncio.Lock()
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_connection_create_start.append(self._on_create_start)
+        trace.on_connection_create_end.append(self._on_create_end)
+        trace.on_connection_reuseconn.append(self._on_reuseconn)
+
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS,
+            keepalive_timeout=keepalive_timeout,
+        )
+        self.session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+
+    @property
+    def reuse_ratio(self) -> float | None:
+        """Return the share of requests served on an existing connection."""
+        total = self.stats["connections"] + self.stats["reused"]
+        if not total:
+            return None
+        return self.stats["reused"] / total
+
+    @property
+    def handshake_time(self) -> float | None:
+        """Return the mean TCP connect time in seconds."""
+        if not self.stats["connections"]:
+            return None
+        return self._handshake_total / self.stats["connections"]
+
+    @property
+    def queue_time(self) -> float | None:
+        """Return the mean wait for the connection in seconds."""
+        if not self.stats["queued"]:
+            return None
+        return self._queue_total / self.stats["queued"]
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[None]:
+        """Hold the device connection for one request."""
+        queued = self._lock.locked()
+        start = asyncio.get_running_loop().time()
+        async with self._lock:
+            if queued:
+                self.stats["queued"] += 1
+                self._queue_total += asyncio.get_running_loop().time() - start
+            yield
+
+    async def async_close(self) -> None:
+        """Close the session and its connection."""
+        await self.session.close()
+
+    # Trace-Callbacks: (session, trace_config_ctx, params), ctx gilt pro Request
+
+    async def _on_request_start(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params
+    ) -> None:
+        self.stats["requests"] += 1
+
+    async def _on_create_start(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params
+    ) -> None:
+        ctx.connect_start = asyncio.get_running_loop().time()
+
+    async def _on_create_end(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params
+    ) -> None:
+        self.stats["connections"] += 1
+        self._handshake_total += asyncio.get_running_loop().time() - ctx.connect_start
+
+    async def _on_reuseconn(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params
+    ) -> None:
+        self.stats["reused"] += 1